@@ -0,0 +1,531 @@
+"""
+Local AWS stand-ins for offline load tests
+
+Thread-safe fakes of the boto3 clients and resources the services call
+(Bedrock runtime, Bedrock agent runtime, DynamoDB, Step Functions), each
+sleeping for a latency drawn from a configurable distribution before
+answering. Register them with install() before the first request.
+
+Latency specs:
+    "0"                          no delay
+    "fixed:<ms>"                 constant delay
+    "lognormal:<p50_ms>:<p99_ms>"  log-normal delay with the given median and p99
+"""
+
+import hashlib
+import io
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+# z-score of the 99th percentile of a standard normal distribution
+Z_P99 = 2.326
+
+DEFAULT_LATENCIES = {
+    "guardrails": "lognormal:120:400",
+    "retrieve": "lognormal:180:600",
+    "invoke_model": "lognormal:1800:5000",
+    "dynamodb": "lognormal:6:25",
+    "sfn_transition": "lognormal:25:80",
+}
+
+
+class LatencyModel:
+    """Samples injected latencies from a latency spec"""
+
+    def __init__(self, spec: str, rng: Optional[random.Random] = None):
+        """
+        Initialize LatencyModel
+
+        Args:
+            spec: Latency spec (see module docstring)
+            rng: Random generator (default: a new unseeded one)
+
+        Raises:
+            ValueError: If the spec is invalid
+        """
+        self.spec = spec
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+
+        parts = spec.split(":")
+        if parts == ["0"]:
+            self.kind, self.median = "fixed", 0.0
+        elif parts[0] == "fixed" and len(parts) == 2:
+            self.kind, self.median = "fixed", float(parts[1]) / 1000
+        elif parts[0] == "lognormal" and len(parts) == 3:
+            median, p99 = float(parts[1]), float(parts[2])
+            if not 0 < median <= p99:
+                raise ValueError(f"Invalid latency spec: {spec}. Need 0 < p50 <= p99")
+            self.kind, self.median = "lognormal", median / 1000
+            self.sigma = (math.log(p99) - math.log(median)) / Z_P99
+        else:
+            raise ValueError(
+                f"Invalid latency spec: {spec}. "
+                "Must be '0', 'fixed:<ms>' or 'lognormal:<p50_ms>:<p99_ms>'"
+            )
+
+    def sample(self) -> float:
+        """Draw one latency in seconds"""
+        if self.kind == "fixed":
+            return self.median
+        with self._lock:
+            return self.rng.lognormvariate(math.log(self.median), self.sigma)
+
+    def sleep(self) -> None:
+        """Sleep for one sampled latency"""
+        delay = self.sample()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _client_error(code: str, operation: str) -> ClientError:
+    """ClientError as raised by botocore"""
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class FakeBedrockRuntime:
+    """bedrock-runtime: invoke_model, streaming and apply_guardrail"""
+
+    def __init__(
+        self,
+        invoke_latency: LatencyModel,
+        guardrails_latency: LatencyModel,
+        answer_words: int = 120,
+    ):
+        """
+        Initialize FakeBedrockRuntime
+
+        Args:
+            invoke_latency: Model invocation latency (whole response)
+            guardrails_latency: ApplyGuardrail latency
+            answer_words: Words per generated answer
+        """
+        self.invoke_latency = invoke_latency
+        self.guardrails_latency = guardrails_latency
+        self.answer_words = answer_words
+
+    def _answer(self, body: Dict[str, Any]) -> str:
+        """Deterministic answer text for a request body"""
+        prompt = json.dumps(body.get("messages", ""))
+        seed = sum(prompt.encode("utf-8")) % 97
+        words = [f"Bedrock{(seed + i) % 13}" for i in range(self.answer_words)]
+        return " ".join(words)
+
+    def invoke_model(self, modelId: str, body: str, **kwargs: Any) -> Dict[str, Any]:
+        request = json.loads(body)
+        if "inputText" in request:
+            digest = hashlib.sha256(request["inputText"].encode("utf-8")).digest()
+            embedding = [
+                digest[i % len(digest)] / 255 - 0.5
+                for i in range(request.get("dimensions", 256))
+            ]
+            return {"body": io.BytesIO(json.dumps({"embedding": embedding}).encode())}
+
+        self.invoke_latency.sleep()
+        text = self._answer(request)
+        response = {
+            "content": [{"type": "text", "text": text}],
+            "usage": {"input_tokens": len(body) // 4, "output_tokens": len(text) // 4},
+            "stop_reason": "end_turn",
+        }
+        return {"body": io.BytesIO(json.dumps(response).encode())}
+
+    def invoke_model_with_response_stream(
+        self, modelId: str, body: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        text = self._answer(json.loads(body))
+        words = text.split(" ")
+        return {
+            "body": _FakeEventStream(words, self.invoke_latency.sample(), len(body))
+        }
+
+    def apply_guardrail(self, **kwargs: Any) -> Dict[str, Any]:
+        self.guardrails_latency.sleep()
+        return {"action": "NONE", "assessments": []}
+
+
+class _FakeEventStream:
+    """Response stream spreading a model latency over its text deltas"""
+
+    def __init__(self, words: List[str], total_seconds: float, prompt_chars: int):
+        self.words = words
+        self.delay = total_seconds / max(len(words), 1)
+        self.prompt_chars = prompt_chars
+        self.closed = False
+
+    def _chunk(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        return {"chunk": {"bytes": json.dumps(event).encode()}}
+
+    def __iter__(self):
+        yield self._chunk(
+            {
+                "type": "message_start",
+                "message": {"usage": {"input_tokens": self.prompt_chars // 4}},
+            }
+        )
+        for word in self.words:
+            if self.closed:
+                return
+            time.sleep(self.delay)
+            yield self._chunk(
+                {
+                    "type": "content_block_delta",
+                    "delta": {"type": "text_delta", "text": word + " "},
+                }
+            )
+        yield self._chunk(
+            {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn"},
+                "usage": {"output_tokens": len(self.words)},
+            }
+        )
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeAgentRuntime:
+    """bedrock-agent-runtime: retrieve"""
+
+    def __init__(self, latency: LatencyModel, documents: int = 20):
+        """
+        Initialize FakeAgentRuntime
+
+        Args:
+            latency: Retrieve latency
+            documents: Distinct source documents in the fake knowledge base
+        """
+        self.latency = latency
+        self.documents = documents
+
+    def retrieve(
+        self,
+        knowledgeBaseId: str,
+        retrievalQuery: Dict[str, Any],
+        retrievalConfiguration: Dict[str, Any],
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        self.latency.sleep()
+        count = retrievalConfiguration["vectorSearchConfiguration"]["numberOfResults"]
+        seed = sum(retrievalQuery["text"].encode("utf-8"))
+        return {
+            "retrievalResults": [
+                {
+                    "content": {
+                        "text": (
+                            f"Chunk {i} of document {(seed + i) % self.documents}: "
+                            "Amazon Bedrock provides foundation models through "
+                            "a single API with knowledge bases and guardrails."
+                        )
+                    },
+                    "score": round(0.9 - i * 0.04, 4),
+                    "metadata": {
+                        "x-amz-bedrock-kb-source-uri": (
+                            f"s3://benchmark-docs/doc-{(seed + i) % self.documents}.txt"
+                        )
+                    },
+                }
+                for i in range(count)
+            ]
+        }
+
+
+class FakeTable:
+    """DynamoDB Table with the writes CacheService and JobService issue"""
+
+    def __init__(self, name: str, latency: LatencyModel):
+        self.name = name
+        self.latency = latency
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_item(self, Key: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        self.latency.sleep()
+        with self._lock:
+            item = self.items.get(Key["query_hash"])
+        return {"Item": dict(item)} if item is not None else {}
+
+    def put_item(self, Item: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        self.latency.sleep()
+        with self._lock:
+            self.items[Item["query_hash"]] = dict(Item)
+        return {}
+
+    def update_item(
+        self,
+        Key: Dict[str, Any],
+        UpdateExpression: str,
+        ExpressionAttributeValues: Dict[str, Any],
+        ConditionExpression: str = "",
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        if Key["query_hash"].startswith("job#"):
+            return self._set_attributes(
+                Key,
+                UpdateExpression,
+                kwargs["ExpressionAttributeNames"],
+                ExpressionAttributeValues,
+            )
+
+        self.latency.sleep()
+        values = ExpressionAttributeValues
+        now = values[":now"]
+        with self._lock:
+            item = self.items.get(Key["query_hash"])
+            has_answer = item is not None and ("answer" in item or "payload" in item)
+
+            if "refresh_owner" in UpdateExpression:
+                if (
+                    not has_answer
+                    or item.get("expires_at", item.get("ttl", 0)) > now
+                    or item.get("refresh_expires_at", 0) > now
+                ):
+                    raise _client_error("ConditionalCheckFailedException", "UpdateItem")
+                item.update(
+                    refresh_owner=values[":owner"],
+                    refresh_expires_at=values[":expires"],
+                )
+                return {}
+
+            if item is not None and (
+                (has_answer and item.get("expires_at", item.get("ttl", 0)) > now)
+                or item.get("lease_expires_at", 0) > now
+            ):
+                raise _client_error("ConditionalCheckFailedException", "UpdateItem")
+            item = {
+                k: v
+                for k, v in (item or {"query_hash": Key["query_hash"]}).items()
+                if k not in ("answer", "payload")
+            }
+            item.update(
+                lease_owner=values[":owner"],
+                lease_expires_at=values[":expires"],
+                ttl=values[":ttl"],
+            )
+            self.items[Key["query_hash"]] = item
+        return {}
+
+    def _set_attributes(
+        self,
+        Key: Dict[str, Any],
+        UpdateExpression: str,
+        names: Dict[str, str],
+        values: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Unconditional "SET a = :a, #b = :b" update (job records)"""
+        self.latency.sleep()
+        with self._lock:
+            item = self.items.setdefault(Key["query_hash"], dict(Key))
+            for assignment in UpdateExpression[len("SET ") :].split(","):
+                name, _, value = (part.strip() for part in assignment.partition("="))
+                item[names.get(name, name)] = values[value]
+        return {}
+
+    def delete_item(
+        self,
+        Key: Dict[str, Any],
+        ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+        ConditionExpression: str = "",
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        self.latency.sleep()
+        with self._lock:
+            item = self.items.get(Key["query_hash"])
+            if ConditionExpression and (
+                item is None
+                or item.get("lease_owner") != ExpressionAttributeValues[":owner"]
+                or "answer" in item
+                or "payload" in item
+            ):
+                raise _client_error("ConditionalCheckFailedException", "DeleteItem")
+            self.items.pop(Key["query_hash"], None)
+        return {}
+
+    def batch_writer(self) -> "_FakeBatchWriter":
+        return _FakeBatchWriter(self)
+
+
+class _FakeBatchWriter:
+    """Context manager buffering puts into one latency per 25 items"""
+
+    def __init__(self, table: FakeTable):
+        self.table = table
+        self.pending: List[Dict[str, Any]] = []
+
+    def __enter__(self) -> "_FakeBatchWriter":
+        return self
+
+    def put_item(self, Item: Dict[str, Any]) -> None:
+        self.pending.append(dict(Item))
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        for start in range(0, len(self.pending), 25):
+            self.table.latency.sleep()
+            with self.table._lock:
+                for item in self.pending[start : start + 25]:
+                    self.table.items[item["query_hash"]] = item
+        return False
+
+
+class FakeDynamoDBResource:
+    """DynamoDB service resource: Table and batch_get_item"""
+
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+        self.tables: Dict[str, FakeTable] = {}
+        self._lock = threading.Lock()
+
+    def Table(self, name: str) -> FakeTable:
+        with self._lock:
+            if name not in self.tables:
+                self.tables[name] = FakeTable(name, self.latency)
+            return self.tables[name]
+
+    def batch_get_item(
+        self, RequestItems: Dict[str, Any], **kwargs: Any
+    ) -> Dict[str, Any]:
+        self.latency.sleep()
+        responses = {}
+        for name, spec in RequestItems.items():
+            table = self.Table(name)
+            with table._lock:
+                responses[name] = [
+                    dict(table.items[key["query_hash"]])
+                    for key in spec["Keys"]
+                    if key["query_hash"] in table.items
+                ]
+        return {"Responses": responses, "UnprocessedKeys": {}}
+
+
+class FakeStepFunctions:
+    """
+    stepfunctions: start_execution / describe_execution / start_sync_execution
+
+    Executions run the state machine's stages in-process (the inline
+    pipeline calls the same four Lambda handlers) on a thread pool, adding
+    one transition latency per state. Executions of async jobs record their
+    outcome in the job record, as the RecordJob* states do.
+    """
+
+    STATE_TRANSITIONS = 5
+
+    def __init__(self, transition_latency: LatencyModel, max_workers: int = 64):
+        """
+        Initialize FakeStepFunctions
+
+        Args:
+            transition_latency: Latency per state transition (Lambda invoke
+                and Step Functions overhead)
+            max_workers: Concurrent executions
+        """
+        self.transition_latency = transition_latency
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="fake-sfn"
+        )
+        self.executions: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _run(self, execution_input: Dict[str, Any]) -> Dict[str, Any]:
+        from src.handlers.pipeline import run_inline_pipeline
+
+        for _ in range(self.STATE_TRANSITIONS):
+            self.transition_latency.sleep()
+        result = run_inline_pipeline(execution_input)
+        if execution_input.get("job_id") is not None:
+            from src.services.clients import get_job_service
+
+            self.transition_latency.sleep()
+            get_job_service().complete(execution_input["job_id"], result)
+        return result
+
+    def start_execution(
+        self, stateMachineArn: str, input: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        arn = f"{stateMachineArn}:execution:{uuid.uuid4()}"
+        future = self.executor.submit(self._run, json.loads(input))
+        with self._lock:
+            self.executions[arn] = future
+        return {"executionArn": arn, "startDate": time.time()}
+
+    def start_sync_execution(
+        self, stateMachineArn: str, input: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        arn = f"{stateMachineArn}:express:{uuid.uuid4()}"
+        future = self.executor.submit(self._run, json.loads(input))
+        return self._describe(arn, future)
+
+    def describe_execution(self, executionArn: str, **kwargs: Any) -> Dict[str, Any]:
+        with self._lock:
+            future = self.executions.get(executionArn)
+        if future is None:
+            raise _client_error("ExecutionDoesNotExist", "DescribeExecution")
+        if not future.done():
+            return {"executionArn": executionArn, "status": "RUNNING"}
+
+        with self._lock:
+            self.executions.pop(executionArn, None)
+        return self._describe(executionArn, future)
+
+    def _describe(self, executionArn: str, future: Any) -> Dict[str, Any]:
+        """Response fields of a finished execution (waits for it)"""
+        try:
+            result = future.result()
+        except Exception as e:
+            return {
+                "executionArn": executionArn,
+                "status": "FAILED",
+                "error": "WorkflowExecutionError",
+                "cause": str(e),
+            }
+        response = {"executionArn": executionArn, "status": result["status"]}
+        if result["status"] == "SUCCEEDED":
+            response["output"] = json.dumps(result["output"], default=str)
+        else:
+            response["error"] = result.get("error")
+            response["cause"] = result.get("cause")
+        return response
+
+
+def install(latencies: Dict[str, str], seed: int = 0) -> Dict[str, Any]:
+    """
+    Register fakes in the client registry, replacing any shared instances
+
+    Args:
+        latencies: Latency spec per name in DEFAULT_LATENCIES (missing: default)
+        seed: Seed of the latency generators
+
+    Returns:
+        Dict of the installed fakes by boto3 service name
+    """
+    from src.services import clients
+
+    rng = random.Random(seed)
+    specs = {**DEFAULT_LATENCIES, **latencies}
+    models = {
+        name: LatencyModel(spec, random.Random(rng.random()))
+        for name, spec in specs.items()
+    }
+
+    fakes = {
+        "bedrock-runtime": FakeBedrockRuntime(
+            models["invoke_model"], models["guardrails"]
+        ),
+        "bedrock-agent-runtime": FakeAgentRuntime(models["retrieve"]),
+        "stepfunctions": FakeStepFunctions(models["sfn_transition"]),
+        "dynamodb": FakeDynamoDBResource(models["dynamodb"]),
+    }
+
+    clients.reset()
+    for name in ("bedrock-runtime", "bedrock-agent-runtime", "stepfunctions"):
+        clients.register_client(name, fakes[name])
+    clients.register_resource("dynamodb", fakes["dynamodb"])
+    return fakes
@@ -0,0 +1,281 @@
+"""
+Cache item encoding benchmark
+
+Compares plain and compressed answer cache items on realistic answers:
+DynamoDB item size, read/write capacity units per request and the CPU cost
+of encoding + (de)serialization.
+
+Offline (default): sizes follow the DynamoDB item size rules; no AWS calls.
+Live (--table): also writes and reads each item against a real table and
+reports ConsumedCapacity and request latency.
+
+Synthetic answers repeat phrases and compress better than real ones; pass
+--answers with JSON lines of captured {"answer", "sources"} for real ratios.
+
+Usage:
+    python -m benchmarks.cache_encoding
+    python -m benchmarks.cache_encoding --answers answers.jsonl
+    python -m benchmarks.cache_encoding --table bedrock-rag-cache-dev --iterations 20
+"""
+
+import argparse
+import base64
+import json
+import math
+import os
+import statistics
+import time
+from decimal import Decimal
+from typing import Any, Dict, List
+
+import boto3
+from boto3.dynamodb.types import Binary, TypeDeserializer, TypeSerializer
+
+from src.services.cache_service import CacheService
+
+SAMPLE_DOCS_DIR = os.path.join(os.path.dirname(__file__), "..", "sample-docs")
+
+JA_SENTENCES = [
+    "Amazon Bedrock は主要な基盤モデルを単一のAPIで利用できるフルマネージドサービスです。",
+    "Knowledge Bases を使うと、S3 に置いた社内文書をベクトル化して検索できます。",
+    "Guardrails は入力と出力の両方に適用でき、有害なコンテンツや個人情報をブロックします。",
+    "検索結果は関連度スコアの高い順にプロンプトへ埋め込まれ、回答の根拠として引用されます。",
+    "Step Functions を使うと、各ステップの再試行やエラー処理を宣言的に定義できます。",
+    "DynamoDB のキャッシュにより、同じ質問への2回目以降の応答は数十ミリ秒で返却されます。",
+    "モデルの最大トークン数を調整することで、回答の長さとコストのバランスを取れます。",
+    "CloudWatch Logs には構造化ログが出力され、リクエストIDで処理を追跡できます。",
+]
+
+
+def item_size(value: Any) -> int:
+    """
+    DynamoDB size of an attribute value in bytes
+
+    Strings and binaries count their length, numbers about one byte per two
+    significant digits plus one, and lists / maps add 3 bytes plus one byte
+    per element.
+    """
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray, Binary)):
+        return len(bytes(getattr(value, "value", value)))
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        digits = len(str(abs(value)).replace(".", "").lstrip("0")) or 1
+        return math.ceil(digits / 2) + 1
+    if isinstance(value, list):
+        return 3 + sum(1 + item_size(v) for v in value)
+    if isinstance(value, dict):
+        return 3 + sum(len(k) + 1 + item_size(v) for k, v in value.items())
+    raise TypeError(f"Unsupported attribute type: {type(value).__name__}")
+
+
+def total_item_size(item: Dict[str, Any]) -> int:
+    """DynamoDB item size: attribute names plus values"""
+    return sum(len(k.encode("utf-8")) + item_size(v) for k, v in item.items())
+
+
+def capacity_units(size: int) -> Dict[str, float]:
+    """RCU (eventually / strongly consistent GetItem) and WCU (PutItem) for an item"""
+    read_units = math.ceil(size / 4096) or 1
+    return {
+        "rcu_eventual": read_units / 2,
+        "rcu_strong": float(read_units),
+        "wcu": float(math.ceil(size / 1024) or 1),
+    }
+
+
+def build_answers() -> Dict[str, Dict[str, Any]]:
+    """
+    Answers shaped like pipeline output: short, typical and long answers with
+    5-10 sources, in English (sample docs) and Japanese
+    """
+    docs = []
+    if os.path.isdir(SAMPLE_DOCS_DIR):
+        for name in sorted(os.listdir(SAMPLE_DOCS_DIR)):
+            with open(os.path.join(SAMPLE_DOCS_DIR, name), encoding="utf-8") as f:
+                docs.append(f.read())
+    english = " ".join(docs) or "Amazon Bedrock is a fully managed service. " * 30
+
+    def sources(count: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "title": f"bedrock-guide-{i}.pdf",
+                "page": i + 1,
+                "uri": f"s3://bedrock-rag-docs-dev/guides/bedrock-guide-{i}.pdf",
+                "score": round(0.92 - i * 0.031, 6),
+            }
+            for i in range(count)
+        ]
+
+    def japanese(sentences: int) -> str:
+        return "".join(
+            f"{i // len(JA_SENTENCES) + 1}. {JA_SENTENCES[(i * 5) % len(JA_SENTENCES)]}"
+            for i in range(sentences)
+        )
+
+    return {
+        "short_en": {"answer": english[:600], "sources": sources(3)},
+        "typical_en": {"answer": english, "sources": sources(5)},
+        "typical_ja": {"answer": japanese(12), "sources": sources(5)},
+        "long_ja": {"answer": japanese(60), "sources": sources(10)},
+    }
+
+
+def load_answers(path: str) -> Dict[str, Dict[str, Any]]:
+    """Captured answers from JSON lines with 'answer' and 'sources'"""
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return {
+        f"answer_{i}": {"answer": r["answer"], "sources": r.get("sources", [])}
+        for i, r in enumerate(records)
+    }
+
+
+def wire_json_default(value: Any) -> Any:
+    """Encode attribute values as in a DynamoDB request (binary as base64)"""
+    if isinstance(value, Binary):
+        return base64.b64encode(value.value).decode("ascii")
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    return str(value)
+
+
+def time_per_call(fn, iterations: int) -> float:
+    """Median wall time of fn in microseconds"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return round(statistics.median(samples), 1)
+
+
+def run_offline(
+    services: Dict[str, CacheService],
+    answers: Dict[str, Dict[str, Any]],
+    iterations: int,
+) -> List[Dict[str, Any]]:
+    """Size, capacity and CPU cost per encoding and answer"""
+    serializer = TypeSerializer()
+    deserializer = TypeDeserializer()
+    rows = []
+
+    for name, data in answers.items():
+        for encoding, service in services.items():
+            item = service._build_item(f"benchmark {name}", data, 86400)
+            wire = {k: serializer.serialize(v) for k, v in item.items()}
+            size = total_item_size(item)
+
+            def write_path():
+                built = service._build_item(f"benchmark {name}", data, 86400)
+                {k: serializer.serialize(v) for k, v in built.items()}
+
+            def read_path():
+                stored = {k: deserializer.deserialize(v) for k, v in wire.items()}
+                service._decode_item(stored)
+
+            rows.append(
+                {
+                    "answer": name,
+                    "encoding": encoding,
+                    "answer_chars": len(data["answer"]),
+                    "item_bytes": size,
+                    "request_json_bytes": len(
+                        json.dumps(wire, default=wire_json_default)
+                    ),
+                    **capacity_units(size),
+                    "write_cpu_us": time_per_call(write_path, iterations),
+                    "read_cpu_us": time_per_call(read_path, iterations),
+                }
+            )
+    return rows
+
+
+def run_live(
+    services: Dict[str, CacheService],
+    answers: Dict[str, Dict[str, Any]],
+    iterations: int,
+) -> List[Dict[str, Any]]:
+    """Consumed capacity and latency against a real table"""
+    rows = []
+    for name, data in answers.items():
+        for encoding, service in services.items():
+            query = f"benchmark {encoding} {name}"
+            item = service._build_item(query, data, 3600)
+            key = {"query_hash": item["query_hash"]}
+            put_ms, get_ms = [], []
+            wcu = rcu = 0.0
+
+            for _ in range(iterations):
+                start = time.perf_counter()
+                response = service.table.put_item(
+                    Item=item, ReturnConsumedCapacity="TOTAL"
+                )
+                put_ms.append((time.perf_counter() - start) * 1000)
+                wcu = response["ConsumedCapacity"]["CapacityUnits"]
+
+                start = time.perf_counter()
+                response = service.table.get_item(
+                    Key=key, ReturnConsumedCapacity="TOTAL"
+                )
+                service._decode_item(response["Item"])
+                get_ms.append((time.perf_counter() - start) * 1000)
+                rcu = response["ConsumedCapacity"]["CapacityUnits"]
+
+            service.table.delete_item(Key=key)
+            rows.append(
+                {
+                    "answer": name,
+                    "encoding": encoding,
+                    "consumed_wcu": wcu,
+                    "consumed_rcu": rcu,
+                    "put_p50_ms": round(statistics.median(put_ms), 2),
+                    "get_p50_ms": round(statistics.median(get_ms), 2),
+                }
+            )
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    """Print rows as an aligned text table"""
+    columns = list(rows[0])
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(widths[c]) for c in columns))
+
+
+def main(argv=None) -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Cache item encoding benchmark")
+    parser.add_argument("--table", default=None, help="Live DynamoDB table (optional)")
+    parser.add_argument("--region", default=os.getenv("AWS_REGION", "ap-northeast-1"))
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--answers", default=None, help="JSON lines of answers")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead")
+    args = parser.parse_args(argv)
+
+    dynamodb = boto3.resource("dynamodb", region_name=args.region)
+    table_name = args.table or "cache-encoding-benchmark"
+    services = {
+        encoding: CacheService(table_name, dynamodb=dynamodb, item_encoding=encoding)
+        for encoding in ("plain", "compressed")
+    }
+    answers = load_answers(args.answers) if args.answers else build_answers()
+
+    results = {"offline": run_offline(services, answers, args.iterations)}
+    if args.table:
+        results["live"] = run_live(services, answers, min(args.iterations, 20))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, rows in results.items():
+        print(f"\n[{name}]")
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Import-time (init phase) profile of the Lambda handlers
+
+Imports each handler module in fresh interpreters with `python -X importtime`
+and reports, per handler, the median total import time and the heaviest
+top-level packages. This is the module-scope part of a Lambda cold start
+(INIT), which runs before the first invocation.
+
+The report is JSON so runs can be compared between commits or bundles.
+
+Usage:
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --no-bytecode     # no .pyc (unpacked zip)
+    python -m benchmarks.import_profile --path build/api_handler
+    python -m benchmarks.import_profile --output before.json
+    python -m benchmarks.import_profile --compare before.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+# Handler modules of the deployed functions (terraform/lambda.tf) and the
+# cache warmer
+HANDLERS = [
+    "src.handlers.api_handler",
+    "src.handlers.guardrails_check",
+    "src.handlers.kb_query",
+    "src.handlers.bedrock_invoke",
+    "src.handlers.cache_response",
+    "src.handlers.batch_handler",
+    "src.handlers.stream_server",
+    "src.handlers.cache_warmer",
+]
+
+# Lambda environment (terraform/lambda.tf) of the child interpreters; the
+# shell's variables take precedence (e.g. PYDANTIC_DISABLE_PLUGINS= to
+# profile with pydantic plugin discovery)
+PROFILE_ENV = {
+    "AWS_REGION": "ap-northeast-1",
+    "LOG_LEVEL": "WARNING",
+    "PYDANTIC_DISABLE_PLUGINS": "__all__",
+}
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """
+    Import time by top-level package in -X importtime output
+
+    Sums each module's self time (excluding its own imports) into its
+    top-level package, so e.g. 'boto3' and 'botocore' are reported apart.
+
+    Args:
+        stderr: Interpreter stderr
+
+    Returns:
+        Dict of top-level package name -> milliseconds
+    """
+    packages: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|", 2)
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(self_us) / 1000
+    return packages
+
+
+def profile_once(module: str, env: Dict[str, str], cwd: str) -> Dict[str, Any]:
+    """
+    Import one handler module in a fresh interpreter
+
+    Args:
+        module: Handler module name
+        env: Environment of the child interpreter
+        cwd: Working directory (first on sys.path, like the Lambda task root)
+
+    Returns:
+        Dict with 'total_ms' (wall time of the import) and 'packages'
+    """
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env,
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return {
+        "total_ms": float(result.stdout.strip().splitlines()[-1]),
+        "packages": parse_importtime(result.stderr),
+    }
+
+
+def profile_handler(
+    module: str, env: Dict[str, str], cwd: str, runs: int, top: int
+) -> Dict[str, Any]:
+    """
+    Median import profile of a handler over several runs
+
+    Args:
+        module: Handler module name
+        env: Environment of the child interpreters
+        cwd: Working directory of the child interpreters
+        runs: Number of fresh interpreters
+        top: Number of heaviest top-level packages to report
+
+    Returns:
+        Dict with 'total_ms' and 'top_packages' (name -> median ms)
+    """
+    samples = [profile_once(module, env, cwd) for _ in range(runs)]
+    names = {name for sample in samples for name in sample["packages"]}
+    medians = {
+        name: round(statistics.median(s["packages"].get(name, 0.0) for s in samples), 2)
+        for name in names
+    }
+    heaviest = sorted(medians.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "total_ms": round(statistics.median(s["total_ms"] for s in samples), 2),
+        "top_packages": dict(heaviest),
+    }
+
+
+def build_env(paths: List[str], bytecode: bool, pycache_dir: str) -> Dict[str, str]:
+    """Environment of the child interpreters"""
+    env = {**PROFILE_ENV, **os.environ}
+    env["PYTHONPATH"] = os.pathsep.join(
+        paths + [p for p in [os.environ.get("PYTHONPATH")] if p]
+    )
+    # The Lambda code directory is read-only: .pyc files are read, never written
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    if not bytecode:
+        # Ignore existing .pyc files too, like a package shipped without them
+        env["PYTHONPYCACHEPREFIX"] = pycache_dir
+    return env
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any]) -> str:
+    """Before/after table of total import time per handler"""
+    lines = [f"{'handler':<18} {'before_ms':>10} {'after_ms':>10} {'delta':>8}"]
+    for module, result in after["handlers"].items():
+        old = before["handlers"].get(module)
+        name = module.rsplit(".", 1)[-1]
+        if old is None:
+            lines.append(f"{name:<18} {'-':>10} {result['total_ms']:>10.1f}")
+            continue
+        delta = (result["total_ms"] - old["total_ms"]) / old["total_ms"] * 100
+        lines.append(
+            f"{name:<18} {old['total_ms']:>10.1f} {result['total_ms']:>10.1f} "
+            f"{delta:>+7.0f}%"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Handler import-time profile")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreters per handler")
+    parser.add_argument("--top", type=int, default=8, help="Packages per handler")
+    parser.add_argument(
+        "--handler",
+        action="append",
+        default=[],
+        help="Handler module (repeatable; default: all)",
+    )
+    parser.add_argument(
+        "--path",
+        action="append",
+        default=[],
+        help="Import from this directory first, e.g. an unpacked bundle",
+    )
+    parser.add_argument(
+        "--no-bytecode",
+        dest="bytecode",
+        action="store_false",
+        help="Ignore .pyc files (cold import from source)",
+    )
+    parser.add_argument("--output", default=None, help="Also write the report here")
+    parser.add_argument(
+        "--compare", default=None, help="Print a before/after table against this report"
+    )
+    args = parser.parse_args(argv)
+
+    paths = [os.path.abspath(p) for p in args.path] or [os.getcwd()]
+    with tempfile.TemporaryDirectory() as pycache_dir:
+        env = build_env(paths, args.bytecode, pycache_dir)
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": sys.version.split()[0],
+            "config": {"runs": args.runs, "bytecode": args.bytecode, "paths": paths},
+            "handlers": {
+                module: profile_handler(module, env, paths[0], args.runs, args.top)
+                for module in args.handler or HANDLERS
+            },
+        }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(compare(json.load(f), report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
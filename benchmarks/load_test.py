@@ -0,0 +1,295 @@
+"""
+Offline load test
+
+Drives api_handler (and, through the workflow, the four Step Functions
+stage handlers) at a target concurrency against the local AWS stand-ins in
+benchmarks.aws_stubs, with injected service latencies. No AWS account or
+network access is needed.
+
+The report is JSON so runs can be compared between commits:
+end-to-end latency percentiles, throughput, cache-hit ratio, per-stage
+latency and cold-start (import + first request) vs warm cache-miss timings.
+
+Usage:
+    python -m benchmarks.load_test --requests 500 --concurrency 20
+    python -m benchmarks.load_test --mode inline --latency invoke_model=fixed:800
+    python -m benchmarks.load_test --prime     # init phase before the first request
+    python -m benchmarks.load_test --output results/$(git rev-parse --short HEAD).json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.aws_stubs import DEFAULT_LATENCIES
+
+# Settings are read at import time, so these are set before importing src
+BENCHMARK_ENV = {
+    "AWS_REGION": "ap-northeast-1",
+    "AWS_ACCESS_KEY_ID": "benchmark",
+    "AWS_SECRET_ACCESS_KEY": "benchmark",
+    "KB_ID": "BENCHMARKKB",
+    "GUARDRAILS_ID": "benchmark-guardrail",
+    "CACHE_TABLE_NAME": "benchmark-cache",
+    "STATE_MACHINE_ARN": (
+        "arn:aws:states:ap-northeast-1:000000000000:stateMachine:benchmark"
+    ),
+    "LOG_LEVEL": "WARNING",
+    "METRICS_SINK": "none",
+    "PYDANTIC_DISABLE_PLUGINS": "__all__",
+}
+
+STAGES = {
+    "guardrails_check": "src.handlers.guardrails_check",
+    "kb_query": "src.handlers.kb_query",
+    "bedrock_invoke": "src.handlers.bedrock_invoke",
+    "cache_response": "src.handlers.cache_response",
+}
+
+
+class Recorder:
+    """Thread-safe latency samples by name"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, ms: float) -> None:
+        with self._lock:
+            self.samples.setdefault(name, []).append(ms)
+
+    def wrap(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """fn, recording the wall time of each call under name"""
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(name, (time.perf_counter() - start) * 1000)
+
+        return timed
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_samples))) - 1, 0)
+    return sorted_samples[min(rank, len(sorted_samples) - 1)]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Count, mean and p50/p95/p99/max of latency samples in ms"""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 2) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 2),
+        "p95_ms": round(percentile(ordered, 95), 2),
+        "p99_ms": round(percentile(ordered, 99), 2),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+def build_queries(total: int, distinct: int, zipf_s: float, seed: int) -> List[str]:
+    """
+    Query mix where query popularity follows a Zipf distribution
+
+    Args:
+        total: Number of requests
+        distinct: Number of distinct queries
+        zipf_s: Zipf exponent (0: uniform; ~1: typical search traffic)
+        seed: Random seed
+
+    Returns:
+        List of query strings, one per request
+    """
+    rng = random.Random(seed)
+    weights = [1 / (rank**zipf_s) for rank in range(1, distinct + 1)]
+    ranks = rng.choices(range(distinct), weights=weights, k=total)
+    return [f"What does Amazon Bedrock feature {rank} do?" for rank in ranks]
+
+
+def measure_import_ms(env: Dict[str, str]) -> float:
+    """Wall time of importing api_handler in a fresh interpreter (cold start)"""
+    code = (
+        "import time; start = time.perf_counter(); "
+        "import src.handlers.api_handler; "
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return round(float(result.stdout.strip().splitlines()[-1]), 2)
+
+
+def git_commit() -> Optional[str]:
+    """Current commit of the working tree (None outside a git checkout)"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the load test and build the report"""
+    latencies = dict(DEFAULT_LATENCIES)
+    for override in args.latency:
+        name, _, spec = override.partition("=")
+        if name not in latencies:
+            raise SystemExit(
+                f"Unknown latency '{name}'. Choose from: {', '.join(latencies)}"
+            )
+        latencies[name] = spec
+
+    env = {
+        **BENCHMARK_ENV,
+        "ORCHESTRATION_MODE": args.mode,
+        "CACHE_ENABLED": "true" if args.cache else "false",
+    }
+    if args.metrics_file:
+        env.update(METRICS_SINK="file", METRICS_FILE_PATH=args.metrics_file)
+    os.environ.update(env)
+    import_ms = measure_import_ms(env)
+
+    from benchmarks.aws_stubs import install
+    from src.handlers import api_handler
+
+    install(latencies, seed=args.seed)
+
+    recorder = Recorder()
+    for stage, module_name in STAGES.items():
+        module = importlib.import_module(module_name)
+        module.lambda_handler = recorder.wrap(stage, module.lambda_handler)
+
+    queries = build_queries(args.requests, args.distinct_queries, args.zipf, args.seed)
+    outcomes = {"cached": 0, "errors": 0, "status": {}}
+    outcomes_lock = threading.Lock()
+
+    def send(index: int, query: str) -> Tuple[float, bool]:
+        context = SimpleNamespace(aws_request_id=f"load-{index}")
+        event = {"body": json.dumps({"query": query})}
+        start = time.perf_counter()
+        response = api_handler.lambda_handler(event, context)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        status = str(response["statusCode"])
+        cached = status == "200" and json.loads(response["body"]).get("cached", False)
+        with outcomes_lock:
+            outcomes["status"][status] = outcomes["status"].get(status, 0) + 1
+            if status != "200":
+                outcomes["errors"] += 1
+            elif cached:
+                outcomes["cached"] += 1
+        return elapsed_ms, cached
+
+    # Init phase as the Lambda INIT would run it, after the stand-ins are
+    # installed (INIT_PRIMING_ENABLED would prime real clients at import)
+    init_ms = None
+    if args.prime:
+        start = time.perf_counter()
+        api_handler.lambda_handler({"warmup": True}, None)
+        init_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    # First request in this process: builds clients and services unless primed
+    first_ms, _ = send(0, queries[0])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(send, range(1, len(queries)), queries[1:]))
+    duration = time.perf_counter() - start
+
+    latencies_ms = [ms for ms, _ in results]
+    measured = len(latencies_ms)
+    misses = summarize([ms for ms, cached in results if not cached])
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {
+            "mode": args.mode,
+            "cache": args.cache,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "distinct_queries": args.distinct_queries,
+            "zipf": args.zipf,
+            "seed": args.seed,
+            "prime": args.prime,
+            "latencies": latencies,
+        },
+        "latency": summarize(latencies_ms),
+        "latency_hit": summarize([ms for ms, cached in results if cached]),
+        "latency_miss": misses,
+        "throughput_rps": round(measured / duration, 2) if duration else 0.0,
+        "duration_s": round(duration, 2),
+        "cache_hit_ratio": round(outcomes["cached"] / len(queries), 4),
+        "errors": outcomes["errors"],
+        "status_codes": outcomes["status"],
+        "stages": {name: summarize(s) for name, s in recorder.samples.items()},
+        "cold": {
+            "import_ms": import_ms,
+            "init_ms": init_ms,
+            "first_request_ms": round(first_ms, 2),
+            "warm_miss_p50_ms": misses["p50_ms"],
+        },
+    }
+
+
+def main(argv=None) -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Offline load test")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--mode", choices=["step_functions", "inline"], default="step_functions"
+    )
+    parser.add_argument("--distinct-queries", type=int, default=100)
+    parser.add_argument("--zipf", type=float, default=1.0, help="Zipf exponent")
+    parser.add_argument(
+        "--no-cache", dest="cache", action="store_false", help="CACHE_ENABLED=false"
+    )
+    parser.add_argument(
+        "--latency",
+        action="append",
+        default=[],
+        metavar="NAME=SPEC",
+        help=f"Latency override, NAME in {', '.join(DEFAULT_LATENCIES)}",
+    )
+    parser.add_argument(
+        "--prime",
+        action="store_true",
+        help="Run the init phase before the first request",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Also write the report here")
+    parser.add_argument(
+        "--metrics-file", default=None, help="Write EMF metrics as JSON lines here"
+    )
+    args = parser.parse_args(argv)
+
+    report = json.dumps(run(args), indent=2)
+    print(report)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
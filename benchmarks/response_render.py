@@ -0,0 +1,106 @@
+"""
+Cache-hit response rendering benchmark
+
+Compares the two ways api_handler can build a cache-hit body:
+
+    model:   QueryResponse(...) -> model_dump() -> success_response (json.dumps)
+    splice:  pre-rendered fragment stored with the item -> splice_cached_body
+
+and checks both produce identical bytes.
+
+Usage:
+    python -m benchmarks.response_render --iterations 5000
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+from benchmarks.cache_encoding import build_answers
+from src.models.response import (
+    QueryResponse,
+    render_body_fragment,
+    splice_cached_body,
+)
+from src.utils.error_handler import success_response, success_response_body
+
+
+def model_path(item: Dict[str, Any], execution_time_ms: int) -> Dict[str, Any]:
+    """Cache-hit response as built from the item through the pydantic model"""
+    response = QueryResponse(
+        query=item["query_text"],
+        answer=item["answer"],
+        sources=item["sources"],
+        cached=True,
+        stale=False,
+        execution_time_ms=execution_time_ms,
+    )
+    return success_response(response.model_dump())
+
+
+def splice_path(item: Dict[str, Any], execution_time_ms: int) -> Dict[str, Any]:
+    """Cache-hit response spliced from the pre-rendered fragment"""
+    return success_response_body(
+        splice_cached_body(item["response_fragment"], False, execution_time_ms)
+    )
+
+
+def measure(fn, item: Dict[str, Any], iterations: int) -> Dict[str, float]:
+    """Median and p99 wall time of fn in microseconds"""
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(item, i % 1000)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "p50_us": round(statistics.median(samples), 2),
+        "p99_us": round(samples[int(len(samples) * 0.99) - 1], 2),
+    }
+
+
+def run(iterations: int) -> List[Dict[str, Any]]:
+    """Benchmark both paths on each sample answer"""
+    rows = []
+    for name, data in build_answers().items():
+        query = f"benchmark question about {name}"
+        item = {
+            "query_text": query,
+            "answer": data["answer"],
+            "sources": data["sources"],
+            "response_fragment": render_body_fragment(
+                query, data["answer"], data["sources"]
+            ),
+        }
+        if model_path(item, 7)["body"] != splice_path(item, 7)["body"]:
+            raise AssertionError(f"Bodies differ for {name}")
+
+        model = measure(model_path, item, iterations)
+        splice = measure(splice_path, item, iterations)
+        rows.append(
+            {
+                "answer": name,
+                "body_bytes": len(splice_path(item, 7)["body"]),
+                "model_p50_us": model["p50_us"],
+                "model_p99_us": model["p99_us"],
+                "splice_p50_us": splice["p50_us"],
+                "splice_p99_us": splice["p99_us"],
+                "speedup": round(model["p50_us"] / max(splice["p50_us"], 0.01), 1),
+            }
+        )
+    return rows
+
+
+def main(argv=None) -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Cache-hit rendering benchmark")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    print(json.dumps(run(args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
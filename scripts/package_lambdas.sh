@@ -3,7 +3,13 @@
 #
 # Lambda Packaging Script
 #
-# Creates a deployment package with all Python code and dependencies
+# Creates one deployment package per Lambda function (build/dist/<handler>.zip)
+# containing the Python code and only the dependencies that handler imports.
+# Bytecode is precompiled (the Lambda code directory is read-only, so modules
+# shipped without .pyc are recompiled on every cold start), and tests, caches
+# and installer metadata are trimmed from the dependencies.
+#
+# PYTHON_BIN must match the Lambda runtime (python3.11) so the bytecode is used.
 #
 
 set -e
@@ -11,34 +17,96 @@ set -e
 PROJECT_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 cd "$PROJECT_ROOT"
 
+PYTHON_BIN="${PYTHON_BIN:-python3.11}"
+
+# Third-party dependencies per handler (names as in requirements.txt)
+# numpy: semantic cache (CACHE_MODE=semantic), reranker and local retrieval
+declare -A HANDLER_DEPS=(
+    [api_handler]="boto3 aws-lambda-powertools pydantic numpy"
+    [guardrails_check]="boto3 aws-lambda-powertools"
+    [kb_query]="boto3 aws-lambda-powertools numpy"
+    [bedrock_invoke]="boto3 aws-lambda-powertools"
+    [cache_response]="boto3 aws-lambda-powertools pydantic numpy"
+    [batch_handler]="boto3 aws-lambda-powertools pydantic numpy"
+    [stream_handler]="boto3 aws-lambda-powertools pydantic numpy"
+)
+
 echo "==================================="
 echo "Lambda Packaging Script"
 echo "==================================="
 echo ""
 
+if ! command -v "$PYTHON_BIN" &> /dev/null; then
+    echo "Error: $PYTHON_BIN not found (set PYTHON_BIN to a Python 3.11 interpreter)"
+    exit 1
+fi
+
+# Requirement specifiers (e.g. "boto3>=1.34.0") for dependency names
+requirement_specs() {
+    local name
+    for name in "$@"; do
+        grep -iE "^${name}([<>=~!; \[]|$)" requirements.txt
+    done
+}
+
+# Remove files the runtime never reads from installed dependencies
+trim_dependencies() {
+    local dir="$1"
+    find "$dir" -depth -type d \( -name tests -o -name test -o -name __pycache__ \) \
+        -exec rm -rf {} +
+    # Keep only METADATA (read by importlib.metadata.version)
+    find "$dir" -path "*.dist-info/*" ! -name METADATA -delete
+    find "$dir" -name "*.pyc" -delete
+    # Console scripts installed by pip
+    rm -rf "$dir/bin"
+}
+
 # Clean previous builds
 echo "[1/5] Cleaning previous builds..."
 rm -rf build/
 rm -f lambda_deployment.zip
-mkdir -p build/package
+mkdir -p build/dist
 
 # Install dependencies
-echo "[2/5] Installing dependencies..."
-pip3 install -r requirements.txt -t build/package/ --upgrade
+echo "[2/5] Installing dependencies per handler..."
+for handler in "${!HANDLER_DEPS[@]}"; do
+    echo "  - $handler: ${HANDLER_DEPS[$handler]}"
+    mkdir -p "build/$handler"
+    # shellcheck disable=SC2046,SC2086
+    "$PYTHON_BIN" -m pip install $(requirement_specs ${HANDLER_DEPS[$handler]}) \
+        -t "build/$handler" --upgrade --quiet
+    trim_dependencies "build/$handler"
+done
 
 # Copy source code
 echo "[3/5] Copying source code..."
-cp -r src/ build/package/
+for handler in "${!HANDLER_DEPS[@]}"; do
+    cp -r src/ "build/$handler/"
+    find "build/$handler/src" -depth -type d -name __pycache__ -exec rm -rf {} +
+done
+# stream_handler runs an HTTP server behind the Lambda Web Adapter (handler: run.sh)
+cat > build/stream_handler/run.sh << 'EOF_RUN'
+#!/bin/bash
+exec python3 -m src.handlers.stream_server
+EOF_RUN
+chmod +x build/stream_handler/run.sh
 
-# Create deployment package
-echo "[4/5] Creating deployment package..."
-cd build/package
-zip -r ../../lambda_deployment.zip . -q
-cd "$PROJECT_ROOT"
+# Precompile bytecode (unchecked-hash: valid regardless of the zip's mtimes)
+echo "[4/5] Precompiling bytecode..."
+for handler in "${!HANDLER_DEPS[@]}"; do
+    "$PYTHON_BIN" -m compileall -q -j 0 --invalidation-mode unchecked-hash "build/$handler"
+done
+
+# Create deployment packages
+echo "[5/5] Creating deployment packages..."
+for handler in "${!HANDLER_DEPS[@]}"; do
+    (cd "build/$handler" && zip -r "../dist/$handler.zip" . -q)
+done
 
-# Display package info
-PACKAGE_SIZE=$(du -h lambda_deployment.zip | cut -f1)
-echo "[5/5] Deployment package created: lambda_deployment.zip ($PACKAGE_SIZE)"
+for handler in $(printf '%s\n' "${!HANDLER_DEPS[@]}" | sort); do
+    PACKAGE_SIZE=$(du -h "build/dist/$handler.zip" | cut -f1)
+    echo "  build/dist/$handler.zip ($PACKAGE_SIZE)"
+done
 
 echo ""
 echo "==================================="
@@ -47,5 +115,7 @@ echo "==================================="
 echo ""
 echo "Next steps:"
 echo "1. Run 'cd terraform && terraform apply' to deploy Lambda functions"
-echo "2. Lambda functions will be updated with the new deployment package"
+echo "2. Lambda functions will be updated with the new deployment packages"
+echo "3. Optional: profile a bundle's init (import) time with"
+echo "   'python -m benchmarks.import_profile --path build/<handler> --handler src.handlers.<handler>'"
 echo ""
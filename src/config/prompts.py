@@ -4,6 +4,10 @@ Prompt Templates
 Contains all prompt templates used for LLM generation.
 """
 
+import functools
+from string import Formatter
+from typing import Optional, Tuple
+
 # RAG Prompt Template for Claude 3
 # This template combines retrieved context with the user's query
 RAG_PROMPT_TEMPLATE = """You are a helpful AI assistant. Answer the user's question based on the provided context from the knowledge base.
@@ -24,10 +28,27 @@ Instructions:
 Answer:"""
 
 
+@functools.lru_cache(maxsize=None)
+def prerender_rag_prompt() -> Tuple[Tuple[str, Optional[str]], ...]:
+    """
+    Split the RAG template into its static text and fields, once per container
+
+    Returns:
+        Tuple of (literal text, field name or None) pairs in template order
+    """
+    return tuple(
+        (literal, field)
+        for literal, field, _, _ in Formatter().parse(RAG_PROMPT_TEMPLATE)
+    )
+
+
 def build_rag_prompt(query: str, context: str) -> str:
     """
     Build RAG prompt from template
 
+    Joins the pre-rendered static text with the values, which is equivalent
+    to RAG_PROMPT_TEMPLATE.format(...) without re-parsing the template.
+
     Args:
         query: User's question
         context: Retrieved context from Knowledge Base
@@ -35,4 +56,8 @@ def build_rag_prompt(query: str, context: str) -> str:
     Returns:
         str: Complete prompt ready for Bedrock invocation
     """
-    return RAG_PROMPT_TEMPLATE.format(query=query, context=context)
+    values = {"query": query, "context": context}
+    return "".join(
+        literal + (values[field] if field is not None else "")
+        for literal, field in prerender_rag_prompt()
+    )
@@ -19,26 +19,186 @@ class Settings:
         "MODEL_ID", "anthropic.claude-3-haiku-20240307-v1:0"
     )
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "1024"))
+    MODEL_CONTEXT_WINDOW: int = int(os.getenv("MODEL_CONTEXT_WINDOW", "200000"))
+
+    # Context packing (budget: context window - MAX_TOKENS - prompt, capped by
+    # CONTEXT_TOKEN_BUDGET when > 0)
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "0"))
+    CONTEXT_DEDUP_THRESHOLD: float = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.8"))
+
+    # Rerank (fetch KB_MAX_RESULTS x RERANK_FETCH_MULTIPLIER, keep KB_MAX_RESULTS)
+    RERANK_ENABLED: bool = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_FETCH_MULTIPLIER: int = int(os.getenv("RERANK_FETCH_MULTIPLIER", "3"))
+    RERANK_LEXICAL_WEIGHT: float = float(os.getenv("RERANK_LEXICAL_WEIGHT", "0.5"))
+    # Optional "module:factory" returning a reranker.CrossEncoder
+    RERANK_CROSS_ENCODER: str = os.getenv("RERANK_CROSS_ENCODER", "")
 
     # Knowledge Base Configuration
     KB_ID: str = os.getenv("KB_ID", "")
     KB_MAX_RESULTS: int = int(os.getenv("KB_MAX_RESULTS", "5"))
+    # Retrieval backend ("bedrock": Knowledge Bases Retrieve API, "local": local index)
+    KB_BACKEND: str = os.getenv("KB_BACKEND", "bedrock")
+    LOCAL_KB_INDEX_PATH: str = os.getenv("LOCAL_KB_INDEX_PATH", "local-kb/index")
+    LOCAL_KB_LEXICAL_WEIGHT: float = float(os.getenv("LOCAL_KB_LEXICAL_WEIGHT", "0.5"))
+    # Bump after each ingestion job (e.g. the job ID) to invalidate cached retrievals
+    KB_INGESTION_VERSION: str = os.getenv("KB_INGESTION_VERSION", "")
+    # Retrieval cache (in-memory; also DynamoDB when KB_RETRIEVAL_CACHE_TABLE_NAME is set)
+    KB_RETRIEVAL_CACHE_ENABLED: bool = (
+        os.getenv("KB_RETRIEVAL_CACHE_ENABLED", "true").lower() == "true"
+    )
+    KB_RETRIEVAL_CACHE_TTL_SECONDS: int = int(
+        os.getenv("KB_RETRIEVAL_CACHE_TTL_SECONDS", "3600")
+    )
+    KB_RETRIEVAL_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("KB_RETRIEVAL_CACHE_MAX_ENTRIES", "256")
+    )
+    KB_RETRIEVAL_CACHE_TABLE_NAME: str = os.getenv("KB_RETRIEVAL_CACHE_TABLE_NAME", "")
 
     # Guardrails Configuration
     GUARDRAILS_ID: str = os.getenv("GUARDRAILS_ID", "")
     GUARDRAILS_VERSION: str = os.getenv("GUARDRAILS_VERSION", "DRAFT")
+    # Output check mode ("full": after generation, "incremental": windowed while streaming)
+    OUTPUT_GUARDRAILS_MODE: str = os.getenv("OUTPUT_GUARDRAILS_MODE", "full")
+    GUARDRAILS_WINDOW_CHARS: int = int(os.getenv("GUARDRAILS_WINDOW_CHARS", "1000"))
+    GUARDRAILS_OVERLAP_CHARS: int = int(os.getenv("GUARDRAILS_OVERLAP_CHARS", "200"))
+    GUARDRAILS_MAX_CONCURRENCY: int = int(os.getenv("GUARDRAILS_MAX_CONCURRENCY", "3"))
+    # Verdict cache (in-memory; also DynamoDB when GUARDRAILS_VERDICT_TABLE_NAME is set)
+    # for published versions; DRAFT verdicts are never cached
+    GUARDRAILS_VERDICT_CACHE_ENABLED: bool = (
+        os.getenv("GUARDRAILS_VERDICT_CACHE_ENABLED", "true").lower() == "true"
+    )
+    GUARDRAILS_VERDICT_CACHE_TTL_SECONDS: int = int(
+        os.getenv("GUARDRAILS_VERDICT_CACHE_TTL_SECONDS", "86400")
+    )
+    GUARDRAILS_VERDICT_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("GUARDRAILS_VERDICT_CACHE_MAX_ENTRIES", "1024")
+    )
+    GUARDRAILS_VERDICT_TABLE_NAME: str = os.getenv("GUARDRAILS_VERDICT_TABLE_NAME", "")
 
     # Cache Configuration
     CACHE_TABLE_NAME: str = os.getenv("CACHE_TABLE_NAME", "")
     CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", "86400"))  # 24 hours
     CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    # Serve expired answers for this long while one request refreshes them
+    # (0: disabled)
+    CACHE_STALE_GRACE_SECONDS: int = int(os.getenv("CACHE_STALE_GRACE_SECONDS", "0"))
+    CACHE_REFRESH_LEASE_SECONDS: int = int(
+        os.getenv("CACHE_REFRESH_LEASE_SECONDS", "60")
+    )
+    # Cache item encoding ("plain": answer/sources attributes,
+    # "compressed": one binary payload attribute; reads accept both)
+    CACHE_ITEM_ENCODING: str = os.getenv("CACHE_ITEM_ENCODING", "plain")
+    # Payload compression ("zlib", or "zstd" if the zstandard package is installed)
+    CACHE_COMPRESSION: str = os.getenv("CACHE_COMPRESSION", "zlib")
+    # Store a pre-rendered response body fragment with each answer so cache
+    # hits skip model validation and JSON serialization
+    CACHE_RESPONSE_FRAGMENT_ENABLED: bool = (
+        os.getenv("CACHE_RESPONSE_FRAGMENT_ENABLED", "true").lower() == "true"
+    )
+
+    # In-memory L1 cache (per Lambda container, in front of DynamoDB)
+    L1_CACHE_ENABLED: bool = os.getenv("L1_CACHE_ENABLED", "true").lower() == "true"
+    L1_CACHE_MAX_ENTRIES: int = int(os.getenv("L1_CACHE_MAX_ENTRIES", "256"))
+    L1_CACHE_MAX_BYTES: int = int(os.getenv("L1_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+    L1_CACHE_MAX_TTL_SECONDS: int = int(os.getenv("L1_CACHE_MAX_TTL_SECONDS", "300"))
+
+    # Semantic cache ("exact": SHA-256 of query text, "semantic": + nearest-neighbour match)
+    CACHE_MODE: str = os.getenv("CACHE_MODE", "exact")
+    SEMANTIC_CACHE_THRESHOLD: float = float(
+        os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9")
+    )
+    SEMANTIC_CACHE_EMBEDDER: str = os.getenv("SEMANTIC_CACHE_EMBEDDER", "hashing")
+    SEMANTIC_CACHE_DIMENSION: int = int(os.getenv("SEMANTIC_CACHE_DIMENSION", "256"))
+    SEMANTIC_CACHE_CAPACITY: int = int(os.getenv("SEMANTIC_CACHE_CAPACITY", "10000"))
+    SEMANTIC_CACHE_INDEX_PATH: str = os.getenv(
+        "SEMANTIC_CACHE_INDEX_PATH", "/tmp/semantic-cache/index"
+    )
+    EMBEDDING_MODEL_ID: str = os.getenv(
+        "EMBEDDING_MODEL_ID", "amazon.titan-embed-text-v2:0"
+    )
 
     # Step Functions Configuration
     STATE_MACHINE_ARN: str = os.getenv("STATE_MACHINE_ARN", "")
+    # "STANDARD": start the execution and poll it, "EXPRESS": StartSyncExecution
+    STATE_MACHINE_TYPE: str = os.getenv("STATE_MACHINE_TYPE", "STANDARD")
+
+    # Orchestration mode ("step_functions": state machine, "inline": in-process pipeline)
+    ORCHESTRATION_MODE: str = os.getenv("ORCHESTRATION_MODE", "step_functions")
+    # Run input guardrails and KB retrieval concurrently (inline mode)
+    PARALLEL_INPUT_STAGE: bool = (
+        os.getenv("PARALLEL_INPUT_STAGE", "false").lower() == "true"
+    )
+    # Function that runs inline-mode async jobs and refreshes, invoked with
+    # InvocationType="Event" (Lambda freezes background threads once the
+    # handler returns); empty outside Lambda: a background thread runs them
+    WORKFLOW_TASK_FUNCTION_NAME: str = os.getenv(
+        "WORKFLOW_TASK_FUNCTION_NAME", os.getenv("AWS_LAMBDA_FUNCTION_NAME", "")
+    )
+    # Concurrent workflow runs per /query/batch request
+    BATCH_MAX_CONCURRENCY: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+
+    # Single-flight: identical concurrent cache misses share one workflow run
+    SINGLE_FLIGHT_ENABLED: bool = (
+        os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    )
+    # In-flight lease duration; must exceed the workflow wait timeout (30s)
+    SINGLE_FLIGHT_LEASE_SECONDS: int = int(
+        os.getenv("SINGLE_FLIGHT_LEASE_SECONDS", "35")
+    )
+    SINGLE_FLIGHT_POLL_INTERVAL: float = float(
+        os.getenv("SINGLE_FLIGHT_POLL_INTERVAL", "0.2")
+    )
+    # Time a request may spend waiting for or running the workflow, counted
+    # from its start (API Gateway times out at 29s)
+    REQUEST_TIME_BUDGET_SECONDS: float = float(
+        os.getenv("REQUEST_TIME_BUDGET_SECONDS", "28")
+    )
+
+    # Async query jobs (src/services/job_service.py): "async" answers every
+    # POST /query with 202 and a job ID ("sync": only with "Prefer: respond-async")
+    QUERY_MODE: str = os.getenv("QUERY_MODE", "sync")
+    JOB_TTL_SECONDS: int = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+    # Long-poll cap of GET /query/{job_id}?wait=N (API Gateway times out at 29s)
+    JOB_MAX_WAIT_SECONDS: float = float(os.getenv("JOB_MAX_WAIT_SECONDS", "20"))
+    JOB_POLL_MAX_INTERVAL: float = float(os.getenv("JOB_POLL_MAX_INTERVAL", "2"))
+
+    # Streaming server (src/handlers/stream_server.py); the Lambda Web Adapter
+    # forwards requests to this port
+    STREAM_SERVER_PORT: int = int(os.getenv("AWS_LWA_PORT", "8080"))
+
+    # Cache warmer (src/handlers/cache_warmer.py)
+    WARMER_CONCURRENCY: int = int(os.getenv("WARMER_CONCURRENCY", "4"))
+    WARMER_RATE_PER_SECOND: float = float(os.getenv("WARMER_RATE_PER_SECOND", "2"))
+
+    # AWS SDK Client Configuration
+    AWS_MAX_POOL_CONNECTIONS: int = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+    AWS_CONNECT_TIMEOUT: float = float(os.getenv("AWS_CONNECT_TIMEOUT", "2"))
+    AWS_READ_TIMEOUT: float = float(os.getenv("AWS_READ_TIMEOUT", "60"))
+    AWS_MAX_RETRY_ATTEMPTS: int = int(os.getenv("AWS_MAX_RETRY_ATTEMPTS", "3"))
+    AWS_RETRY_MODE: str = os.getenv("AWS_RETRY_MODE", "adaptive")
+    AWS_TCP_KEEPALIVE: bool = os.getenv("AWS_TCP_KEEPALIVE", "true").lower() == "true"
+    # Thread pool size behind the async service layer (src/services/async_services.py)
+    ASYNC_MAX_WORKERS: int = int(os.getenv("ASYNC_MAX_WORKERS", "16"))
+
+    # Init phase (src/utils/warmup.py): prime clients, validators and the prompt
+    # template at module scope (default: only when running in Lambda)
+    INIT_PRIMING_ENABLED: bool = (
+        os.getenv(
+            "INIT_PRIMING_ENABLED",
+            "true" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "false",
+        ).lower()
+        == "true"
+    )
 
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 
+    # Metrics Configuration (CloudWatch EMF, see src/utils/metrics.py)
+    # emf (stdout) | file (JSON lines at METRICS_FILE_PATH) | none
+    METRICS_SINK: str = os.getenv("METRICS_SINK", "emf")
+    METRICS_NAMESPACE: str = os.getenv("METRICS_NAMESPACE", "BedrockRAG")
+    METRICS_FILE_PATH: str = os.getenv("METRICS_FILE_PATH", "metrics.jsonl")
+
     @classmethod
     def validate(cls) -> None:
         """
@@ -49,13 +209,13 @@ class Settings:
         """
         missing = []
 
-        if not cls.KB_ID:
+        if cls.KB_BACKEND == "bedrock" and not cls.KB_ID:
             missing.append("KB_ID")
         if not cls.GUARDRAILS_ID:
             missing.append("GUARDRAILS_ID")
         if not cls.CACHE_TABLE_NAME:
             missing.append("CACHE_TABLE_NAME")
-        if not cls.STATE_MACHINE_ARN:
+        if cls.ORCHESTRATION_MODE == "step_functions" and not cls.STATE_MACHINE_ARN:
             missing.append("STATE_MACHINE_ARN")
 
         if missing:
@@ -75,19 +235,60 @@ class Settings:
             "aws_region": cls.AWS_REGION,
             "model_id": cls.MODEL_ID,
             "max_tokens": cls.MAX_TOKENS,
+            "context_token_budget": cls.CONTEXT_TOKEN_BUDGET,
+            "rerank_enabled": cls.RERANK_ENABLED,
             "kb_id": cls.KB_ID[:8] + "..." if cls.KB_ID else "NOT_SET",
             "kb_max_results": cls.KB_MAX_RESULTS,
+            "kb_backend": cls.KB_BACKEND,
+            "kb_ingestion_version": cls.KB_INGESTION_VERSION,
+            "kb_retrieval_cache_enabled": cls.KB_RETRIEVAL_CACHE_ENABLED,
             "guardrails_id": cls.GUARDRAILS_ID[:8] + "..."
             if cls.GUARDRAILS_ID
             else "NOT_SET",
             "guardrails_version": cls.GUARDRAILS_VERSION,
+            "output_guardrails_mode": cls.OUTPUT_GUARDRAILS_MODE,
+            "guardrails_verdict_cache_enabled": cls.GUARDRAILS_VERDICT_CACHE_ENABLED,
             "cache_table_name": cls.CACHE_TABLE_NAME,
             "cache_ttl_seconds": cls.CACHE_TTL_SECONDS,
             "cache_enabled": cls.CACHE_ENABLED,
+            "cache_stale_grace_seconds": cls.CACHE_STALE_GRACE_SECONDS,
+            "cache_item_encoding": cls.CACHE_ITEM_ENCODING,
+            "cache_compression": cls.CACHE_COMPRESSION,
+            "l1_cache_enabled": cls.L1_CACHE_ENABLED,
+            "l1_cache_max_entries": cls.L1_CACHE_MAX_ENTRIES,
+            "l1_cache_max_bytes": cls.L1_CACHE_MAX_BYTES,
+            "l1_cache_max_ttl_seconds": cls.L1_CACHE_MAX_TTL_SECONDS,
+            "cache_mode": cls.CACHE_MODE,
+            "semantic_cache_threshold": cls.SEMANTIC_CACHE_THRESHOLD,
+            "semantic_cache_embedder": cls.SEMANTIC_CACHE_EMBEDDER,
             "state_machine_arn": cls.STATE_MACHINE_ARN[:20] + "..."
             if cls.STATE_MACHINE_ARN
             else "NOT_SET",
+            "state_machine_type": cls.STATE_MACHINE_TYPE,
+            "aws_max_pool_connections": cls.AWS_MAX_POOL_CONNECTIONS,
+            "aws_connect_timeout": cls.AWS_CONNECT_TIMEOUT,
+            "aws_read_timeout": cls.AWS_READ_TIMEOUT,
+            "aws_max_retry_attempts": cls.AWS_MAX_RETRY_ATTEMPTS,
+            "aws_retry_mode": cls.AWS_RETRY_MODE,
+            "aws_tcp_keepalive": cls.AWS_TCP_KEEPALIVE,
+            "async_max_workers": cls.ASYNC_MAX_WORKERS,
+            "init_priming_enabled": cls.INIT_PRIMING_ENABLED,
+            "orchestration_mode": cls.ORCHESTRATION_MODE,
+            "parallel_input_stage": cls.PARALLEL_INPUT_STAGE,
+            "workflow_task_function_name": cls.WORKFLOW_TASK_FUNCTION_NAME or "NOT_SET",
+            "batch_max_concurrency": cls.BATCH_MAX_CONCURRENCY,
+            "single_flight_enabled": cls.SINGLE_FLIGHT_ENABLED,
+            "single_flight_lease_seconds": cls.SINGLE_FLIGHT_LEASE_SECONDS,
+            "request_time_budget_seconds": cls.REQUEST_TIME_BUDGET_SECONDS,
+            "query_mode": cls.QUERY_MODE,
+            "job_ttl_seconds": cls.JOB_TTL_SECONDS,
+            "job_max_wait_seconds": cls.JOB_MAX_WAIT_SECONDS,
+            "stream_server_port": cls.STREAM_SERVER_PORT,
+            "warmer_concurrency": cls.WARMER_CONCURRENCY,
+            "warmer_rate_per_second": cls.WARMER_RATE_PER_SECOND,
             "log_level": cls.LOG_LEVEL,
+            "metrics_sink": cls.METRICS_SINK,
+            "metrics_namespace": cls.METRICS_NAMESPACE,
         }
 
 
@@ -2,32 +2,83 @@
 API Handler
 
 API Gateway Lambda handler - entry point for the RAG system.
-Validates input, checks cache, and initiates Step Functions execution.
+Validates input, checks cache, and runs the RAG workflow (Step Functions
+execution or, in inline orchestration mode, the in-process pipeline).
+
+Requests with the header "X-Debug-Timings: true" get a per-stage latency
+breakdown in the response's 'timings' field.
+
+Async mode (QUERY_MODE=async, or a request with "Prefer: respond-async"):
+a cache miss starts the workflow and returns 202 with a job ID at once;
+GET /query/{job_id} returns the job, long-polling up to ?wait=N seconds.
+In inline orchestration mode async jobs and refreshes of stale cache entries
+run as asynchronous invocations of this function (workflow tasks, see
+src/handlers/workflow.py).
 """
 
 import json
 import time
-from typing import Dict, Any
-import boto3
+import uuid
+from typing import Dict, Any, Optional
 from botocore.exceptions import ClientError
 
 from src.models.request import QueryRequest
-from src.models.response import QueryResponse, ErrorResponse
+from src.models.response import (
+    QueryResponse,
+    ErrorResponse,
+    JobResponse,
+    Source,
+    splice_cached_body,
+)
 from src.utils.logger import get_logger
-from src.utils.error_handler import ValidationError, error_response, success_response
+from src.utils.error_handler import (
+    ValidationError,
+    error_response,
+    success_response,
+    success_response_body,
+)
 from src.utils.validators import validate_query
-from src.services.cache_service import CacheService
+from src.utils.timing import busy_ms, stage_timer
+from src.utils.metrics import put_stage_timings
+from src.utils.warmup import prime_models, register_init, warmup_aware
+from src.services.clients import get_cache_service, get_job_service
+from src.handlers.workflow import (
+    prime_workflow,
+    run_workflow_coalesced,
+    start_background_refresh,
+    start_workflow_job,
+    failure_response_fields,
+    workflow_task_aware,
+)
 from src.config.settings import settings
 
 logger = get_logger(__name__)
 
+DEBUG_TIMINGS_HEADER = "x-debug-timings"
+PREFER_HEADER = "prefer"
 
+
+def init() -> None:
+    """Init phase: build the validators, cache and job services and workflow client"""
+    prime_models(QueryRequest, QueryResponse, JobResponse, Source, ErrorResponse)
+    if settings.CACHE_ENABLED:
+        get_cache_service()
+    get_job_service()
+    prime_workflow()
+
+
+register_init(init)
+
+
+@warmup_aware(init)
+@workflow_task_aware
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     API Gateway Lambda handler
 
     Args:
-        event: API Gateway event with 'body' containing QueryRequest JSON
+        event: API Gateway event: POST with 'body' containing QueryRequest
+            JSON, or GET with the 'job_id' path parameter
         context: Lambda context
 
     Returns:
@@ -35,11 +86,16 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     start_time = time.time()
     request_id = getattr(context, "aws_request_id", "unknown-request")
+    debug_timings = _debug_timings_requested(event)
+    trace: Dict[str, Any] = {}
 
     try:
         # Parse and validate request
         logger.info("Processing API request", extra={"request_id": request_id})
 
+        if event.get("httpMethod") == "GET":
+            return _get_job(event, request_id)
+
         body = json.loads(event.get("body", "{}"))
         request = QueryRequest(**body)
 
@@ -48,32 +104,49 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         # Check cache if enabled
         if settings.CACHE_ENABLED:
-            cache_service = CacheService(settings.CACHE_TABLE_NAME)
-            cached_result = cache_service.get(sanitized_query)
+            cache_service = get_cache_service()
+            with stage_timer(trace, "cache_lookup"):
+                cached_result = cache_service.get(sanitized_query, allow_stale=True)
 
             if cached_result:
+                stale = cached_result.get("stale", False)
+                if stale:
+                    start_background_refresh(sanitized_query, request_id)
+
                 execution_time_ms = int((time.time() - start_time) * 1000)
                 logger.info(
                     "Returning cached response",
                     extra={
                         "request_id": request_id,
                         "execution_time_ms": execution_time_ms,
+                        "stale": stale,
                     },
                 )
 
+                # Fast path: splice into the body pre-rendered at write time
+                # (not for semantic hits, whose fragment holds another query)
+                fragment = cached_result.get("response_fragment")
+                if (
+                    fragment
+                    and not debug_timings
+                    and cached_result.get("query_text") == sanitized_query
+                ):
+                    return success_response_body(
+                        splice_cached_body(fragment, stale, execution_time_ms)
+                    )
+
                 response = QueryResponse(
                     query=sanitized_query,
                     answer=cached_result.get("answer", ""),
                     sources=cached_result.get("sources", []),
                     cached=True,
+                    stale=stale,
                     execution_time_ms=execution_time_ms,
                 )
 
-                return success_response(response.model_dump())
-
-        # Start Step Functions execution
-        sfn_client = boto3.client("stepfunctions")
-        state_machine_arn = settings.STATE_MACHINE_ARN
+                return success_response(
+                    _with_timings(response.model_dump(), trace, debug_timings)
+                )
 
         execution_input = {
             "query": sanitized_query,
@@ -81,74 +154,73 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             "start_time": start_time,
         }
 
+        if _async_requested(event):
+            return _submit_job(execution_input)
+
         try:
-            sfn_response = sfn_client.start_execution(
-                stateMachineArn=state_machine_arn,
-                input=json.dumps(execution_input),
+            with stage_timer(trace, "workflow") as workflow_timing:
+                execution_result = run_workflow_coalesced(execution_input)
+        except ClientError as e:
+            logger.error(
+                f"Step Functions error: {e}",
+                extra={"request_id": request_id},
             )
-
-            execution_arn = sfn_response["executionArn"]
-
-            logger.info(
-                "Started Step Functions execution",
-                extra={"request_id": request_id, "execution_arn": execution_arn},
+            return error_response(
+                error_code="workflow_start_failed",
+                message="Failed to start query processing",
+                request_id=request_id,
+                status_code=500,
             )
 
-            # Wait for execution to complete (with timeout)
-            execution_result = _wait_for_execution(
-                sfn_client, execution_arn, timeout_seconds=30
-            )
+        if execution_result["status"] == "SUCCEEDED":
+            output = execution_result["output"]
 
-            if execution_result["status"] == "SUCCEEDED":
-                output = json.loads(execution_result["output"])
+            # Stage records from the workflow; the rest of the workflow's wall
+            # time is orchestration (state transitions, Lambda invokes, polling)
+            stage_timings = output.get("timings", {})
+            workflow_timing["overhead_ms"] = round(
+                workflow_timing["duration_ms"] - busy_ms(list(stage_timings.values())),
+                2,
+            )
+            trace["timings"] = {**trace["timings"], **stage_timings}
+            _log_timings(request_id, trace["timings"])
 
-                execution_time_ms = int((time.time() - start_time) * 1000)
+            # The workflow cached the answer; index it for paraphrase matching
+            if settings.CACHE_ENABLED:
+                get_cache_service().remember(sanitized_query)
 
-                response = QueryResponse(
-                    query=sanitized_query,
-                    answer=output.get("answer", ""),
-                    sources=output.get("sources", []),
-                    cached=False,
-                    execution_time_ms=execution_time_ms,
-                )
+            execution_time_ms = int((time.time() - start_time) * 1000)
 
-                return success_response(response.model_dump())
+            response = QueryResponse(
+                query=sanitized_query,
+                answer=output.get("answer", ""),
+                sources=output.get("sources", []),
+                cached=execution_result.get("coalesced", False),
+                execution_time_ms=execution_time_ms,
+            )
 
-            else:
-                exec_error = execution_result.get("error")
-                exec_cause = execution_result.get("cause")
-                logger.error(
-                    "Step Functions execution failed",
-                    extra={
-                        "request_id": request_id,
-                        "status": execution_result["status"],
-                        "error": exec_error,
-                    },
-                )
-                if exec_error == "GuardrailsBlocked":
-                    return error_response(
-                        error_code="guardrails_blocked",
-                        message="Content blocked by safety guidelines",
-                        request_id=request_id,
-                        status_code=400,
-                    )
-                return error_response(
-                    error_code="workflow_failed",
-                    message="Query processing failed",
-                    request_id=request_id,
-                    status_code=500,
-                )
+            return success_response(
+                _with_timings(response.model_dump(), trace, debug_timings)
+            )
 
-        except ClientError as e:
+        else:
+            exec_error = execution_result.get("error")
+            exec_cause = execution_result.get("cause")
             logger.error(
-                f"Step Functions error: {e}",
-                extra={"request_id": request_id},
+                "Workflow execution failed",
+                extra={
+                    "request_id": request_id,
+                    "orchestration_mode": settings.ORCHESTRATION_MODE,
+                    "status": execution_result["status"],
+                    "error": exec_error,
+                },
             )
+            error_code, message, status_code = failure_response_fields(exec_error)
             return error_response(
-                error_code="workflow_start_failed",
-                message="Failed to start query processing",
+                error_code=error_code,
+                message=message,
                 request_id=request_id,
-                status_code=500,
+                status_code=status_code,
             )
 
     except ValidationError as e:
@@ -183,34 +255,137 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         )
 
 
-def _wait_for_execution(
-    sfn_client, execution_arn: str, timeout_seconds: int = 30
-) -> Dict[str, Any]:
+def _submit_job(execution_input: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Create an async job and start its workflow without waiting
+
+    Args:
+        execution_input: Workflow input with 'query', 'request_id', 'start_time'
+
+    Returns:
+        202 response with the RUNNING job (Location: /query/{job_id})
+    """
+    request_id = execution_input["request_id"]
+    job_id = str(uuid.uuid4())
+    job_service = get_job_service()
+    job = None
+
+    try:
+        job = job_service.create(job_id, execution_input["query"], request_id)
+        start_workflow_job({**execution_input, "job_id": job_id})
+    except ClientError as e:
+        logger.error(
+            f"Failed to start job: {e}",
+            extra={"request_id": request_id, "job_id": job_id},
+        )
+        if job is not None:
+            job_service.complete(
+                job_id, {"status": "FAILED", "error": "WorkflowExecutionError"}
+            )
+        return error_response(
+            error_code="workflow_start_failed",
+            message="Failed to start query processing",
+            request_id=request_id,
+            status_code=500,
+        )
+
+    logger.info(
+        "Submitted async job", extra={"request_id": request_id, "job_id": job_id}
+    )
+    response = success_response(_job_body(job), status_code=202)
+    response["headers"]["Location"] = f"/query/{job_id}"
+    return response
+
+
+def _get_job(event: Dict[str, Any], request_id: str) -> Dict[str, Any]:
     """
-    Wait for Step Functions execution to complete
+    GET /query/{job_id}: return a job, long-polling while it is running
 
     Args:
-        sfn_client: Step Functions client
-        execution_arn: Execution ARN
-        timeout_seconds: Maximum time to wait
+        event: API Gateway event with the 'job_id' path parameter and an
+            optional 'wait' query parameter (seconds, capped at
+            JOB_MAX_WAIT_SECONDS)
+        request_id: Request ID
 
     Returns:
-        Dict with status and output
+        200 for a finished job, 202 while it is running, 404 if unknown
+
+    Raises:
+        ValidationError: If 'wait' is not a number
     """
-    start = time.time()
+    job_id = (event.get("pathParameters") or {}).get("job_id", "")
+    params = event.get("queryStringParameters") or {}
+    try:
+        wait_seconds = float(params.get("wait", 0))
+    except ValueError:
+        raise ValidationError("wait must be a number of seconds")
+    wait_seconds = min(max(wait_seconds, 0.0), settings.JOB_MAX_WAIT_SECONDS)
 
-    while time.time() - start < timeout_seconds:
-        response = sfn_client.describe_execution(executionArn=execution_arn)
-        status = response["status"]
+    job = get_job_service().wait(job_id, wait_seconds) if job_id else None
+    if job is None:
+        return error_response(
+            error_code="job_not_found",
+            message="Job not found or expired",
+            request_id=request_id,
+            status_code=404,
+        )
 
-        if status in ["SUCCEEDED", "FAILED", "TIMED_OUT", "ABORTED"]:
-            return {
-                "status": status,
-                "output": response.get("output", "{}"),
-                "error": response.get("error"),
-                "cause": response.get("cause"),
-            }
+    status_code = 202 if job["status"] == "RUNNING" else 200
+    return success_response(_job_body(job), status_code=status_code)
 
-        time.sleep(0.5)
 
-    return {"status": "TIMEOUT", "output": "{}", "error": "Timeout", "cause": None}
+def _job_body(job: Dict[str, Any]) -> Dict[str, Any]:
+    """JobResponse body of a job record (FAILED: error code and message)"""
+    fields = {
+        key: job.get(key)
+        for key in ("job_id", "status", "query", "answer", "execution_time_ms")
+    }
+    fields["sources"] = job.get("sources", [])
+    if job["status"] == "FAILED":
+        fields["error"], fields["message"], _ = failure_response_fields(job["error"])
+    return JobResponse(**fields).model_dump()
+
+
+def _header(event: Dict[str, Any], header: str) -> Optional[str]:
+    """Value of a request header (case-insensitive), None if absent"""
+    headers = event.get("headers") or {}
+    for name, value in headers.items():
+        if name.lower() == header:
+            return str(value)
+    return None
+
+
+def _async_requested(event: Dict[str, Any]) -> bool:
+    """True in async mode or if the request prefers it (Prefer: respond-async)"""
+    if settings.QUERY_MODE == "async":
+        return True
+    prefer = _header(event, PREFER_HEADER) or ""
+    return "respond-async" in prefer.lower()
+
+
+def _debug_timings_requested(event: Dict[str, Any]) -> bool:
+    """True if the request opts into the timing breakdown (X-Debug-Timings)"""
+    value = _header(event, DEBUG_TIMINGS_HEADER)
+    return value is not None and value.lower() in ("1", "true")
+
+
+def _with_timings(
+    body: Dict[str, Any], trace: Dict[str, Any], debug_timings: bool
+) -> Dict[str, Any]:
+    """Add the timing breakdown to a response body if it was requested"""
+    if debug_timings:
+        body["timings"] = trace.get("timings", {})
+    return body
+
+
+def _log_timings(request_id: str, timings: Dict[str, Dict[str, Any]]) -> None:
+    """Log and emit as metrics each stage's duration, remote time and retries"""
+    fields: Dict[str, Any] = {"request_id": request_id}
+    for stage, record in timings.items():
+        fields[f"{stage}_ms"] = record["duration_ms"]
+        fields[f"{stage}_remote_ms"] = record["remote_ms"]
+        fields[f"{stage}_retries"] = record["retries"]
+    if "overhead_ms" in timings.get("workflow", {}):
+        fields["orchestration_overhead_ms"] = timings["workflow"]["overhead_ms"]
+    logger.info("Request timings", extra=fields)
+    put_stage_timings(timings)
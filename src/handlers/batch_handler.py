@@ -0,0 +1,296 @@
+"""
+Batch Handler
+
+API Gateway Lambda handler for POST /query/batch. Validates and
+deduplicates a list of queries, resolves cache hits with one bulk lookup
+and runs the RAG workflow for the misses concurrently. In inline
+orchestration mode, stale entries are refreshed by an asynchronous
+invocation of this function (a workflow task, see src/handlers/workflow.py).
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, List
+
+from botocore.exceptions import ClientError
+
+from src.models.request import BatchQueryRequest
+from src.models.response import BatchQueryItem, BatchQueryResponse, Source
+from src.utils.logger import get_logger
+from src.utils.error_handler import ValidationError, error_response, success_response
+from src.utils.validators import validate_query
+from src.utils.warmup import prime_models, register_init, warmup_aware
+from src.services.clients import get_cache_service
+from src.handlers.workflow import (
+    prime_workflow,
+    run_workflow_coalesced,
+    start_background_refresh,
+    failure_response_fields,
+    workflow_task_aware,
+)
+from src.config.settings import settings
+
+logger = get_logger(__name__)
+
+
+def init() -> None:
+    """Init phase: build the batch validators, cache service and workflow client"""
+    prime_models(BatchQueryRequest, BatchQueryItem, BatchQueryResponse, Source)
+    if settings.CACHE_ENABLED:
+        get_cache_service()
+    prime_workflow()
+
+
+register_init(init)
+
+
+@warmup_aware(init)
+@workflow_task_aware
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Batch query Lambda handler
+
+    Args:
+        event: API Gateway event with 'body' containing BatchQueryRequest JSON
+        context: Lambda context
+
+    Returns:
+        API Gateway response; 200 with per-item status codes once the batch
+        itself is valid
+    """
+    start_time = time.time()
+    request_id = getattr(context, "aws_request_id", "unknown-request")
+
+    try:
+        body = json.loads(event.get("body") or "{}")
+        request = BatchQueryRequest(**body)
+
+    except json.JSONDecodeError:
+        logger.warning("Invalid JSON in request body", extra={"request_id": request_id})
+        return error_response(
+            error_code="invalid_json",
+            message="Invalid JSON in request body",
+            request_id=request_id,
+            status_code=400,
+        )
+
+    except Exception as e:
+        logger.warning(f"Invalid batch request: {e}", extra={"request_id": request_id})
+        return error_response(
+            error_code="validation_error",
+            message=str(e),
+            request_id=request_id,
+            status_code=400,
+        )
+
+    try:
+        results: List[Dict[str, Any]] = [{} for _ in request.queries]
+        positions: Dict[str, List[int]] = {}
+
+        # Validate each item; identical sanitized queries are processed once
+        for index, raw_query in enumerate(request.queries):
+            try:
+                query = validate_query(raw_query)
+            except ValidationError as e:
+                results[index] = _error_item(
+                    index, raw_query, "validation_error", str(e), 400
+                )
+                continue
+            positions.setdefault(query, []).append(index)
+
+        unique_queries = list(positions)
+        answers: Dict[str, Dict[str, Any]] = {}
+
+        if settings.CACHE_ENABLED and unique_queries:
+            cached_items = get_cache_service().batch_get(
+                unique_queries, allow_stale=True
+            )
+            for query, item in cached_items.items():
+                stale = item.get("stale", False)
+                if stale:
+                    start_background_refresh(query, request_id)
+                answers[query] = {
+                    "status_code": 200,
+                    "answer": item.get("answer", ""),
+                    "sources": item.get("sources", []),
+                    "cached": True,
+                    "stale": stale,
+                }
+        cache_hits = len(answers)
+
+        misses = [q for q in unique_queries if q not in answers]
+        if misses:
+            answers.update(_run_misses(misses, request_id, start_time))
+
+        for query, indexes in positions.items():
+            for index in indexes:
+                results[index] = {"index": index, "query": query, **answers[query]}
+
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        logger.info(
+            "Batch request completed",
+            extra={
+                "request_id": request_id,
+                "queries": len(request.queries),
+                "unique_queries": len(unique_queries),
+                "cache_hits": cache_hits,
+                "execution_time_ms": execution_time_ms,
+            },
+        )
+
+        response = BatchQueryResponse(
+            results=[BatchQueryItem(**r) for r in results],
+            unique_queries=len(unique_queries),
+            cache_hits=cache_hits,
+            execution_time_ms=execution_time_ms,
+        )
+        return success_response(response.model_dump())
+
+    except Exception as e:
+        logger.error(
+            f"Unexpected error: {e}",
+            extra={"request_id": request_id},
+            exc_info=True,
+        )
+        return error_response(
+            error_code="internal_error",
+            message="Internal server error",
+            request_id=request_id,
+            status_code=500,
+        )
+
+
+def _run_misses(
+    queries: List[str], request_id: str, start_time: float
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run the workflow for cache misses with at most BATCH_MAX_CONCURRENCY at once
+
+    The whole batch shares one deadline (REQUEST_TIME_BUDGET_SECONDS after
+    start_time); queries without an outcome by then get a 'timeout' item.
+
+    Args:
+        queries: Distinct validated queries
+        request_id: Batch request ID (items use "<request_id>-<n>")
+        start_time: Batch start time
+
+    Returns:
+        Dict mapping query to its item fields (status_code, answer/error, ...)
+    """
+    workers = max(1, min(settings.BATCH_MAX_CONCURRENCY, len(queries)))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+    futures = {
+        query: pool.submit(_run_one, query, f"{request_id}-{n}", start_time)
+        for n, query in enumerate(queries)
+    }
+    remaining = start_time + settings.REQUEST_TIME_BUDGET_SECONDS - time.time()
+    wait(futures.values(), timeout=max(remaining, 0))
+    # Queued queries are dropped; running ones are not waited for
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    outcomes: Dict[str, Dict[str, Any]] = {}
+    for query, future in futures.items():
+        if future.done() and not future.cancelled():
+            outcomes[query] = future.result()
+        else:
+            outcomes[query] = _timeout_fields()
+    timed_out = sum(1 for item in outcomes.values() if item.get("error") == "timeout")
+    if timed_out:
+        logger.warning(
+            "Batch deadline reached",
+            extra={"request_id": request_id, "timed_out": timed_out},
+        )
+    return outcomes
+
+
+def _run_one(query: str, item_request_id: str, start_time: float) -> Dict[str, Any]:
+    """
+    Run the workflow for one query and convert the outcome to item fields
+
+    Args:
+        query: Validated query
+        item_request_id: Request ID of this item
+        start_time: Batch start time
+
+    Returns:
+        Dict with status_code and answer/sources/cached or error/message
+    """
+    execution_input = {
+        "query": query,
+        "request_id": item_request_id,
+        "start_time": start_time,
+    }
+
+    try:
+        execution_result = run_workflow_coalesced(execution_input)
+    except ClientError as e:
+        logger.error(
+            f"Step Functions error: {e}", extra={"request_id": item_request_id}
+        )
+        return {
+            "status_code": 500,
+            "error": "workflow_start_failed",
+            "message": "Failed to start query processing",
+        }
+    except Exception as e:
+        logger.error(
+            f"Batch item error: {e}",
+            extra={"request_id": item_request_id},
+            exc_info=True,
+        )
+        return {
+            "status_code": 500,
+            "error": "internal_error",
+            "message": "Internal server error",
+        }
+
+    if execution_result["status"] == "TIMEOUT":
+        return _timeout_fields()
+
+    if execution_result["status"] != "SUCCEEDED":
+        error_code, message, status_code = failure_response_fields(
+            execution_result.get("error")
+        )
+        logger.warning(
+            "Batch item failed",
+            extra={
+                "request_id": item_request_id,
+                "status": execution_result["status"],
+                "error": execution_result.get("error"),
+            },
+        )
+        return {"status_code": status_code, "error": error_code, "message": message}
+
+    if settings.CACHE_ENABLED:
+        get_cache_service().remember(query)
+
+    output = execution_result["output"]
+    return {
+        "status_code": 200,
+        "answer": output.get("answer", ""),
+        "sources": output.get("sources", []),
+        "cached": execution_result.get("coalesced", False),
+    }
+
+
+def _timeout_fields() -> Dict[str, Any]:
+    """Item fields of a query that did not finish within the batch deadline"""
+    return {
+        "status_code": 504,
+        "error": "timeout",
+        "message": "Query processing timed out",
+    }
+
+
+def _error_item(
+    index: int, query: str, error_code: str, message: str, status_code: int
+) -> Dict[str, Any]:
+    """Build a failed item"""
+    return {
+        "index": index,
+        "query": query,
+        "status_code": status_code,
+        "error": error_code,
+        "message": message,
+    }
@@ -4,18 +4,34 @@ Bedrock Invoke Handler
 Step Functions task Lambda - invokes Bedrock model to generate answer.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
-from src.services.bedrock_service import BedrockService
-from src.services.guardrails_service import GuardrailsService
+from src.services.bedrock_service import aborted_stream_usage
+from src.services.clients import get_bedrock_service, get_guardrails_service
+from src.services.incremental_guardrails import create_output_evaluator
 from src.utils.logger import get_logger
+from src.utils.metrics import put_guardrails_verdict, put_token_usage
+from src.utils.timing import timed_stage
+from src.utils.warmup import register_init, warmup_aware
 from src.utils.error_handler import BedrockError, GuardrailsError
 from src.config.settings import settings
-from src.config.prompts import build_rag_prompt
+from src.config.prompts import build_rag_prompt, prerender_rag_prompt
 
 logger = get_logger(__name__)
 
 
+def init() -> None:
+    """Init phase: build the Bedrock / Guardrails services, pre-render the prompt"""
+    get_bedrock_service()
+    get_guardrails_service()
+    prerender_rag_prompt()
+
+
+register_init(init)
+
+
+@warmup_aware(init)
+@timed_stage("bedrock_invoke")
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Bedrock model invocation Lambda handler for Step Functions
@@ -25,7 +41,8 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         context: Lambda context
 
     Returns:
-        Event with added 'answer', 'tokens_used', 'stop_reason' fields
+        Event with added 'answer', 'input_tokens', 'output_tokens',
+        'tokens_used', 'stop_reason' fields
 
     Raises:
         BedrockError: If Bedrock invocation fails
@@ -48,30 +65,41 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # Build prompt
         prompt = build_rag_prompt(query, context_text)
 
-        # Invoke Bedrock
-        bedrock_service = BedrockService(settings.MODEL_ID)
-        result = bedrock_service.invoke_model(prompt, max_tokens=settings.MAX_TOKENS)
+        if settings.OUTPUT_GUARDRAILS_MODE == "incremental":
+            # Generate and check output windows concurrently, abort on block
+            result, guardrails_result = _invoke_with_incremental_guardrails(
+                prompt, request_id
+            )
+            answer = result["answer"]
 
-        answer = result["answer"]
+        else:
+            # Invoke Bedrock
+            bedrock_service = get_bedrock_service()
+            result = bedrock_service.invoke_model(
+                prompt, max_tokens=settings.MAX_TOKENS
+            )
 
-        logger.info(
-            "Bedrock invocation completed",
-            extra={
-                "request_id": request_id,
-                "tokens_used": result["tokens_used"],
-                "stop_reason": result["stop_reason"],
-                "answer_length": len(answer),
-            },
-        )
+            answer = result["answer"]
 
-        # Check output with guardrails
-        guardrails_service = GuardrailsService(
-            settings.GUARDRAILS_ID, settings.GUARDRAILS_VERSION
-        )
+            logger.info(
+                "Bedrock invocation completed",
+                extra={
+                    "request_id": request_id,
+                    "tokens_used": result["tokens_used"],
+                    "stop_reason": result["stop_reason"],
+                    "answer_length": len(answer),
+                },
+            )
 
-        guardrails_result = guardrails_service.check_content(
-            answer, check_type="output"
-        )
+            # Check output with guardrails
+            guardrails_service = get_guardrails_service()
+
+            guardrails_result = guardrails_service.check_content(
+                answer, check_type="output"
+            )
+
+        put_token_usage(result["input_tokens"], result["output_tokens"])
+        put_guardrails_verdict("output", guardrails_result["passed"])
 
         if not guardrails_result["passed"]:
             logger.warning(
@@ -87,9 +115,13 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         # Add result to event
         event["answer"] = answer
+        event["input_tokens"] = result["input_tokens"]
+        event["output_tokens"] = result["output_tokens"]
         event["tokens_used"] = result["tokens_used"]
         event["stop_reason"] = result["stop_reason"]
         event["output_guardrails_passed"] = True
+        if "windows_checked" in guardrails_result:
+            event["output_guardrails_windows"] = guardrails_result["windows_checked"]
 
         return event
 
@@ -104,3 +136,85 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             exc_info=True,
         )
         raise BedrockError(f"Bedrock invocation failed: {str(e)}")
+
+
+def _invoke_with_incremental_guardrails(
+    prompt: str, request_id: str
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Stream the answer while checking it with output Guardrails window by window
+
+    Generation stops at the first blocked window, saving the remaining
+    output tokens.
+
+    Args:
+        prompt: RAG prompt
+        request_id: Request ID for logging
+
+    Returns:
+        Tuple of (result with answer/input_tokens/output_tokens/tokens_used/
+        stop_reason, guardrails result)
+
+    Raises:
+        BedrockError: If Bedrock invocation fails
+        GuardrailsError: If a Guardrails API call fails
+    """
+    evaluator = create_output_evaluator(get_guardrails_service())
+    stream = get_bedrock_service().invoke_model_stream(
+        prompt, max_tokens=settings.MAX_TOKENS
+    )
+
+    answer_parts = []
+    input_tokens = 0
+    usage: Dict[str, Any] = {}
+
+    try:
+        for chunk in stream:
+            if chunk["type"] == "start":
+                input_tokens = chunk["input_tokens"]
+                continue
+            if chunk["type"] == "usage":
+                usage = chunk
+                continue
+
+            answer_parts.append(chunk["text"])
+            if not evaluator.feed(chunk["text"]):
+                logger.warning(
+                    "Aborting generation: output blocked by guardrails",
+                    extra={
+                        "request_id": request_id,
+                        "answer_length": sum(len(p) for p in answer_parts),
+                    },
+                )
+                break
+    finally:
+        stream.close()
+
+    if not usage:  # aborted: the stream ended before its usage event
+        usage = aborted_stream_usage(
+            input_tokens, "".join(answer_parts), "guardrails_abort"
+        )
+
+    guardrails_result = evaluator.finish()
+
+    result = {
+        "answer": "".join(answer_parts).strip(),
+        "input_tokens": usage["input_tokens"],
+        "output_tokens": usage["output_tokens"],
+        "tokens_used": usage["tokens_used"],
+        "stop_reason": usage["stop_reason"],
+    }
+
+    logger.info(
+        "Bedrock invocation completed",
+        extra={
+            "request_id": request_id,
+            "tokens_used": result["tokens_used"],
+            "usage_estimated": usage.get("usage_estimated", False),
+            "stop_reason": result["stop_reason"],
+            "answer_length": len(result["answer"]),
+            "guardrails_windows_checked": guardrails_result["windows_checked"],
+        },
+    )
+
+    return result, guardrails_result
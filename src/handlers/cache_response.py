@@ -5,16 +5,31 @@ Step Functions task Lambda - caches successful query response in DynamoDB.
 """
 
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List
 
-from src.services.cache_service import CacheService
-from src.models.response import Source
+from src.services.clients import get_cache_service
+from src.models.response import QueryResponse, Source
 from src.utils.logger import get_logger
+from src.utils.timing import timed_stage
+from src.utils.warmup import prime_models, register_init, warmup_aware
 from src.config.settings import settings
 
 logger = get_logger(__name__)
 
 
+def init() -> None:
+    """Init phase: build the cache service and the response validators"""
+    # QueryResponse renders the cached body fragment
+    prime_models(Source, QueryResponse)
+    if settings.CACHE_ENABLED:
+        get_cache_service()
+
+
+register_init(init)
+
+
+@warmup_aware(init)
+@timed_stage("cache_response")
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Cache response Lambda handler for Step Functions
@@ -39,15 +54,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
     try:
         # Format sources from KB results
-        sources = []
-        for result in kb_results:
-            metadata = result.get("metadata", {})
-            source = Source(
-                uri=metadata.get("x-amz-bedrock-kb-source-uri", ""),
-                title=metadata.get("x-amz-bedrock-kb-source-title", ""),
-                score=result.get("score", 0.0),
-            )
-            sources.append(source.model_dump())
+        sources = format_sources(kb_results)
 
         # Calculate execution time
         execution_time_ms = int((time.time() - start_time) * 1000)
@@ -61,7 +68,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         # Cache if enabled
         if settings.CACHE_ENABLED:
-            cache_service = CacheService(settings.CACHE_TABLE_NAME)
+            cache_service = get_cache_service()
             cache_success = cache_service.put(
                 query, response_data, ttl_seconds=settings.CACHE_TTL_SECONDS
             )
@@ -95,3 +102,25 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         event["execution_time_ms"] = int((time.time() - start_time) * 1000)
 
         return event
+
+
+def format_sources(kb_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Format KB results as response sources
+
+    Args:
+        kb_results: KB results with 'metadata' and 'score'
+
+    Returns:
+        List of Source dicts
+    """
+    sources = []
+    for result in kb_results:
+        metadata = result.get("metadata", {})
+        source = Source(
+            uri=metadata.get("x-amz-bedrock-kb-source-uri", ""),
+            title=metadata.get("x-amz-bedrock-kb-source-title", ""),
+            score=result.get("score", 0.0),
+        )
+        sources.append(source.model_dump())
+    return sources
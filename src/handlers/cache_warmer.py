@@ -0,0 +1,347 @@
+"""
+Cache Warmer
+
+Precomputes answers for frequent queries so the cache is warm after a
+deploy or a TTL wave. Queries come from a query log (one query per line,
+or JSON lines with "query" and optional "count") or an explicit top-N list.
+
+Queries are deduplicated by cache key, cache hits are skipped, and the
+misses run through the in-process pipeline with bounded concurrency and a
+rate limit. Answers are written with BatchWriteItem. A checkpoint file
+records finished cache keys so an interrupted run can resume.
+
+Usage:
+    python -m src.handlers.cache_warmer queries.log --top-n 200 \\
+        --checkpoint /tmp/warmer.json
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from src.handlers.cache_response import format_sources
+from src.handlers.pipeline import run_inline_pipeline
+from src.services.clients import get_cache_service
+from src.utils.logger import get_logger
+from src.utils.error_handler import ValidationError
+from src.utils.rate_limiter import RateLimiter
+from src.utils.validators import validate_query
+from src.config.settings import settings
+
+logger = get_logger(__name__)
+
+WRITE_BATCH_SIZE = 25  # BatchWriteItem limit
+
+
+def read_query_log(path: str, top_n: Optional[int] = None) -> List[Tuple[str, int]]:
+    """
+    Read queries and their frequencies from a query log
+
+    Args:
+        path: Log file (plain text lines or JSON lines with "query"/"count")
+        top_n: Keep only the top_n most frequent queries
+
+    Returns:
+        List of (query, count), most frequent first
+    """
+    counts: Counter = Counter()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                counts[record["query"]] += int(record.get("count", 1))
+            else:
+                counts[line] += 1
+
+    return counts.most_common(top_n)
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Cache warmer Lambda handler (e.g. an EventBridge schedule after deploys)
+
+    Args:
+        event: {"queries": [str | {"query", "count"}], "top_n": optional int}
+        context: Lambda context
+
+    Returns:
+        Warm-up report (see CacheWarmer.run)
+    """
+    entries = []
+    for entry in event.get("queries", []):
+        if isinstance(entry, dict):
+            entries.append((entry["query"], int(entry.get("count", 1))))
+        else:
+            entries.append((entry, 1))
+
+    top_n = event.get("top_n")
+    if top_n:
+        entries = sorted(entries, key=lambda e: e[1], reverse=True)[:top_n]
+
+    return CacheWarmer().run(entries)
+
+
+class CacheWarmer:
+    """Runs the pipeline for uncached queries and bulk-writes the answers"""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        rate_per_second: Optional[float] = None,
+        checkpoint_path: Optional[str] = None,
+        cache_service: Optional[Any] = None,
+    ):
+        """
+        Initialize CacheWarmer
+
+        Args:
+            concurrency: Concurrent pipeline runs (default: WARMER_CONCURRENCY)
+            rate_per_second: Maximum pipeline starts per second
+                (default: WARMER_RATE_PER_SECOND, <= 0: unlimited)
+            checkpoint_path: JSON checkpoint file (None: no checkpointing)
+            cache_service: CacheService (default: shared registry instance)
+        """
+        self.concurrency = concurrency or settings.WARMER_CONCURRENCY
+        self.rate_limiter = RateLimiter(
+            settings.WARMER_RATE_PER_SECOND
+            if rate_per_second is None
+            else rate_per_second
+        )
+        self.checkpoint_path = checkpoint_path
+        self.cache_service = cache_service or get_cache_service()
+
+        self._lock = threading.Lock()
+        self._pending_writes: List[Tuple[str, Dict[str, Any]]] = []
+        self._checkpoint = self._load_checkpoint()
+
+    def run(self, entries: List[Tuple[str, int]]) -> Dict[str, Any]:
+        """
+        Warm the cache for the given queries
+
+        Args:
+            entries: (query, frequency) pairs; frequency weights the hit rates
+
+        Returns:
+            Dict with counts (unique, already cached, resumed, warmed, failed,
+            blocked), hit_rate_before/after over unique queries and
+            weighted_hit_rate_before/after over the log frequencies
+        """
+        start = time.time()
+        queries, weights = self._dedupe(entries)
+
+        cached_before = set(self.cache_service.batch_get(queries))
+        done = set(self._checkpoint["completed"]) | set(self._checkpoint["blocked"])
+        todo = [
+            q
+            for q in queries
+            if q not in cached_before
+            and self.cache_service._generate_cache_key(q) not in done
+        ]
+
+        logger.info(
+            "Cache warm-up started",
+            extra={
+                "unique_queries": len(queries),
+                "already_cached": len(cached_before),
+                "to_warm": len(todo),
+                "concurrency": self.concurrency,
+            },
+        )
+
+        failed: List[str] = []
+        blocked: List[str] = []
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="warmer"
+        ) as pool:
+            for query, outcome in zip(todo, pool.map(self._warm_one, todo)):
+                if outcome == "failed":
+                    failed.append(query)
+                elif outcome == "blocked":
+                    blocked.append(query)
+        self._flush()
+
+        cached_after = set(self.cache_service.batch_get(queries))
+        report = {
+            "unique_queries": len(queries),
+            "already_cached": len(cached_before),
+            "resumed_skipped": len(queries) - len(cached_before) - len(todo),
+            "warmed": len(todo) - len(failed) - len(blocked),
+            "failed": len(failed),
+            "blocked": len(blocked),
+            "hit_rate_before": _rate(cached_before, queries),
+            "hit_rate_after": _rate(cached_after, queries),
+            "weighted_hit_rate_before": _weighted_rate(cached_before, weights),
+            "weighted_hit_rate_after": _weighted_rate(cached_after, weights),
+            "elapsed_seconds": round(time.time() - start, 2),
+        }
+        logger.info("Cache warm-up completed", extra=report)
+        return report
+
+    def _dedupe(
+        self, entries: List[Tuple[str, int]]
+    ) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Validate queries and merge those with the same cache key
+
+        Args:
+            entries: (query, frequency) pairs
+
+        Returns:
+            Tuple of (distinct queries in input order, frequency per query)
+        """
+        by_key: Dict[str, str] = {}
+        weights: Dict[str, int] = {}
+        for raw_query, count in entries:
+            try:
+                query = validate_query(raw_query)
+            except ValidationError:
+                logger.warning(
+                    "Skipping invalid query", extra={"query": raw_query[:50]}
+                )
+                continue
+
+            cache_key = self.cache_service._generate_cache_key(query)
+            query = by_key.setdefault(cache_key, query)
+            weights[query] = weights.get(query, 0) + count
+
+        return list(by_key.values()), weights
+
+    def _warm_one(self, query: str) -> str:
+        """
+        Run the pipeline for one query and queue its answer for writing
+
+        Args:
+            query: Validated query
+
+        Returns:
+            str: "warmed", "blocked" or "failed"
+        """
+        self.rate_limiter.acquire()
+        start_time = time.time()
+        cache_key = self.cache_service._generate_cache_key(query)
+
+        result = run_inline_pipeline(
+            {
+                "query": query,
+                "request_id": f"warmer-{cache_key[:12]}",
+                "start_time": start_time,
+            },
+            cache_stage=False,
+        )
+
+        if result["status"] != "SUCCEEDED":
+            if result["error"] == "GuardrailsBlocked":
+                # Permanent for this guardrail version; do not retry on resume
+                with self._lock:
+                    self._checkpoint["blocked"].append(cache_key)
+                    self._save_checkpoint()
+                return "blocked"
+            logger.warning(
+                "Warm-up query failed",
+                extra={"query": query[:50], "error": result["error"]},
+            )
+            return "failed"
+
+        output = result["output"]
+        data = {
+            "answer": output.get("answer", ""),
+            "sources": format_sources(output.get("kb_results", [])),
+            "execution_time_ms": int((time.time() - start_time) * 1000),
+        }
+
+        with self._lock:
+            self._pending_writes.append((query, data))
+            if len(self._pending_writes) >= WRITE_BATCH_SIZE:
+                self._flush_locked()
+
+        return "warmed"
+
+    def _flush(self) -> None:
+        """Write queued answers"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        """Write queued answers and checkpoint them (caller holds the lock)"""
+        if not self._pending_writes:
+            return
+
+        entries, self._pending_writes = self._pending_writes, []
+        if not self.cache_service.batch_put(
+            entries, ttl_seconds=settings.CACHE_TTL_SECONDS
+        ):
+            logger.error("Warm-up batch write failed", extra={"items": len(entries)})
+            return
+
+        self._checkpoint["completed"].extend(
+            self.cache_service._generate_cache_key(q) for q, _ in entries
+        )
+        self._save_checkpoint()
+
+    def _load_checkpoint(self) -> Dict[str, List[str]]:
+        """Load the checkpoint file, or start empty"""
+        checkpoint: Dict[str, List[str]] = {"completed": [], "blocked": []}
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint.update(json.load(f))
+            logger.info(
+                "Resuming from checkpoint",
+                extra={
+                    "checkpoint": self.checkpoint_path,
+                    "completed": len(checkpoint["completed"]),
+                },
+            )
+        return checkpoint
+
+    def _save_checkpoint(self) -> None:
+        """Atomically write the checkpoint file"""
+        if not self.checkpoint_path:
+            return
+
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+
+def _rate(cached: Set[str], queries: List[str]) -> float:
+    """Share of queries that are cached"""
+    return round(len(cached) / len(queries), 4) if queries else 0.0
+
+
+def _weighted_rate(cached: Set[str], weights: Dict[str, int]) -> float:
+    """Share of logged requests whose query is cached"""
+    total = sum(weights.values())
+    hits = sum(w for q, w in weights.items() if q in cached)
+    return round(hits / total, 4) if total else 0.0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Warm the answer cache")
+    parser.add_argument("query_log", help="Query log (text or JSON lines)")
+    parser.add_argument("--top-n", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--rate", type=float, default=None, help="Queries per second")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file")
+    args = parser.parse_args(argv)
+
+    warmer = CacheWarmer(
+        concurrency=args.concurrency,
+        rate_per_second=args.rate,
+        checkpoint_path=args.checkpoint,
+    )
+    report = warmer.run(read_query_log(args.query_log, args.top_n))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,26 @@ Step Functions task Lambda - checks input query with Bedrock Guardrails.
 
 from typing import Dict, Any
 
-from src.services.guardrails_service import GuardrailsService
+from src.services.clients import get_guardrails_service
 from src.utils.logger import get_logger
+from src.utils.metrics import put_guardrails_verdict
+from src.utils.timing import timed_stage
+from src.utils.warmup import register_init, warmup_aware
 from src.utils.error_handler import GuardrailsError
-from src.config.settings import settings
 
 logger = get_logger(__name__)
 
 
+def init() -> None:
+    """Init phase: build the Guardrails service and its clients"""
+    get_guardrails_service()
+
+
+register_init(init)
+
+
+@warmup_aware(init)
+@timed_stage("guardrails_check")
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Guardrails check Lambda handler for Step Functions
@@ -37,11 +49,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     )
 
     try:
-        guardrails_service = GuardrailsService(
-            settings.GUARDRAILS_ID, settings.GUARDRAILS_VERSION
-        )
+        guardrails_service = get_guardrails_service()
 
         result = guardrails_service.check_content(query, check_type="input")
+        put_guardrails_verdict("input", result["passed"])
 
         if not result["passed"]:
             logger.warning(
@@ -4,16 +4,33 @@ Knowledge Base Query Handler
 Step Functions task Lambda - retrieves relevant documents from Knowledge Base.
 """
 
+import time
 from typing import Dict, Any
 
-from src.services.kb_service import KnowledgeBaseService
+from src.services.clients import get_kb_service, get_reranker
+from src.services.context_builder import build_context, context_token_budget
 from src.utils.logger import get_logger
+from src.utils.metrics import put_kb_results
+from src.utils.timing import timed_stage
+from src.utils.warmup import register_init, warmup_aware
 from src.utils.error_handler import KnowledgeBaseError
 from src.config.settings import settings
 
 logger = get_logger(__name__)
 
 
+def init() -> None:
+    """Init phase: build the Knowledge Base service and the reranker"""
+    get_kb_service()
+    if settings.RERANK_ENABLED:
+        get_reranker()
+
+
+register_init(init)
+
+
+@warmup_aware(init)
+@timed_stage("kb_query")
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Knowledge Base query Lambda handler for Step Functions
@@ -23,7 +40,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         context: Lambda context
 
     Returns:
-        Event with added 'kb_results' and 'context' fields
+        Event with added 'kb_results', 'context' and context token fields
 
     Raises:
         KnowledgeBaseError: If Knowledge Base query fails
@@ -37,22 +54,70 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     )
 
     try:
-        kb_service = KnowledgeBaseService(settings.KB_ID)
-
-        results = kb_service.retrieve(query, max_results=settings.KB_MAX_RESULTS)
+        kb_service = get_kb_service()
+
+        if settings.RERANK_ENABLED:
+            # Over-fetch, then keep the best KB_MAX_RESULTS after rescoring
+            results = kb_service.retrieve(
+                query,
+                max_results=settings.KB_MAX_RESULTS * settings.RERANK_FETCH_MULTIPLIER,
+            )
+            fetched_count = len(results)
+
+            reranker = get_reranker()
+            rerank_start = time.perf_counter()
+            results = reranker.rerank(query, results, settings.KB_MAX_RESULTS)
+            rerank_ms = round((time.perf_counter() - rerank_start) * 1000, 3)
+
+            event["rerank_ms"] = rerank_ms
+            logger.info(
+                "Knowledge Base results reranked",
+                extra={
+                    "request_id": request_id,
+                    "fetched_count": fetched_count,
+                    "kept_count": len(results),
+                    "rerank_ms": rerank_ms,
+                },
+            )
+        else:
+            results = kb_service.retrieve(query, max_results=settings.KB_MAX_RESULTS)
 
         logger.info(
             "Knowledge Base query completed",
             extra={"request_id": request_id, "results_count": len(results)},
         )
+        put_kb_results(results)
+
+        # Deduplicate and pack results into the prompt's context budget
+        packed = build_context(
+            results,
+            token_budget=context_token_budget(
+                query,
+                max_tokens=settings.MAX_TOKENS,
+                context_window=settings.MODEL_CONTEXT_WINDOW,
+                configured_budget=settings.CONTEXT_TOKEN_BUDGET,
+            ),
+            dedup_threshold=settings.CONTEXT_DEDUP_THRESHOLD,
+        )
 
-        # Format context from results
-        context = _format_context(results)
+        logger.info(
+            "Context built",
+            extra={
+                "request_id": request_id,
+                "chunks_used": len(packed["results"]),
+                "context_tokens": packed["tokens"],
+                "tokens_saved": packed["tokens_saved"],
+                "duplicates_dropped": packed["duplicates_dropped"],
+                "over_budget_dropped": packed["over_budget_dropped"],
+            },
+        )
 
-        # Add results to event
-        event["kb_results"] = results
-        event["context"] = context
-        event["kb_results_count"] = len(results)
+        # Add results to event (only chunks used in the context become sources)
+        event["kb_results"] = packed["results"]
+        event["context"] = packed["context"]
+        event["kb_results_count"] = len(packed["results"])
+        event["context_tokens"] = packed["tokens"]
+        event["context_tokens_saved"] = packed["tokens_saved"]
 
         return event
 
@@ -67,29 +132,3 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             exc_info=True,
         )
         raise KnowledgeBaseError(f"Knowledge Base query failed: {str(e)}")
-
-
-def _format_context(results: list[Dict[str, Any]]) -> str:
-    """
-    Format Knowledge Base results into context string
-
-    Args:
-        results: List of KB retrieval results
-
-    Returns:
-        str: Formatted context string for prompt
-    """
-    if not results:
-        return "No relevant information found in the knowledge base."
-
-    context_parts = []
-    for i, result in enumerate(results, 1):
-        text = result.get("text", "").strip()
-        if text:
-            # Add source information if available
-            metadata = result.get("metadata", {})
-            source_uri = metadata.get("x-amz-bedrock-kb-source-uri", "Unknown source")
-
-            context_parts.append(f"[Source {i}: {source_uri}]\n{text}")
-
-    return "\n\n".join(context_parts)
@@ -0,0 +1,219 @@
+"""
+Inline Pipeline
+
+Runs the RAG workflow stages in-process as direct Python calls, mirroring
+the Step Functions state machine (terraform/step_functions.tf) without its
+start_execution / Lambda invoke / describe_execution hops.
+"""
+
+import asyncio
+from typing import Dict, Any
+
+from src.handlers import bedrock_invoke, cache_response, guardrails_check, kb_query
+from src.services.async_services import run_blocking, run_sync
+from src.utils.logger import get_logger
+from src.utils.error_handler import GuardrailsError
+from src.utils.timing import merge_timings
+from src.config.settings import settings
+
+logger = get_logger(__name__)
+
+
+def run_inline_pipeline(
+    execution_input: Dict[str, Any], cache_stage: bool = True
+) -> Dict[str, Any]:
+    """
+    Run GuardrailsCheck -> KnowledgeBaseQuery -> BedrockInvoke -> CacheResponse
+
+    With PARALLEL_INPUT_STAGE, GuardrailsCheck and KnowledgeBaseQuery run
+    concurrently (see run_input_stage).
+
+    Error semantics match the state machine:
+    - GuardrailsError in GuardrailsCheck or BedrockInvoke -> GuardrailsBlocked
+    - Any KnowledgeBaseQuery failure -> UseEmptyContext, then continue
+    - CacheResponse failure -> non-fatal, continue to success
+    - Any other failure -> WorkflowExecutionError
+
+    Args:
+        execution_input: Workflow input with 'query', 'request_id', 'start_time'
+        cache_stage: Run CacheResponse (False: the caller stores the answer)
+
+    Returns:
+        Dict with status, output (dict), error and cause, in the same shape
+        as a finished Step Functions execution
+    """
+    event = dict(execution_input)
+    request_id = event.get("request_id", "unknown-request")
+
+    try:
+        # Steps 1-2: Check input with Guardrails, query Knowledge Base
+        try:
+            event = run_input_stage(event)
+        except GuardrailsError as e:
+            return _failed(request_id, "GuardrailsBlocked", e)
+
+        # Step 3: Invoke Bedrock model (includes output guardrails)
+        try:
+            event = bedrock_invoke.lambda_handler(event, None)
+        except GuardrailsError as e:
+            return _failed(request_id, "GuardrailsBlocked", e)
+
+        if not cache_stage:
+            return {
+                "status": "SUCCEEDED",
+                "output": event,
+                "error": None,
+                "cause": None,
+            }
+
+        # Step 4: Cache response (failures are non-critical)
+        try:
+            event = cache_response.lambda_handler(event, None)
+        except Exception as e:
+            logger.warning(
+                f"Cache stage failed (non-critical): {e}",
+                extra={"request_id": request_id},
+            )
+            event["cache_error"] = {"Error": type(e).__name__, "Cause": str(e)}
+
+        return {"status": "SUCCEEDED", "output": event, "error": None, "cause": None}
+
+    except Exception as e:
+        logger.error(
+            f"Inline pipeline failed: {e}",
+            extra={"request_id": request_id},
+            exc_info=True,
+        )
+        return _failed(request_id, "WorkflowExecutionError", e)
+
+
+def run_input_stage(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run GuardrailsCheck and KnowledgeBaseQuery (concurrently with PARALLEL_INPUT_STAGE)
+
+    Args:
+        event: Workflow input with 'query', 'request_id', 'start_time'
+
+    Returns:
+        Event with guardrails and KB fields (empty context if retrieval failed)
+
+    Raises:
+        GuardrailsError: If the input is blocked or the check fails
+    """
+    if settings.PARALLEL_INPUT_STAGE:
+        return _run_input_stage_parallel(event)
+    return _run_input_stage_sequential(event)
+
+
+def _run_input_stage_sequential(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run GuardrailsCheck, then KnowledgeBaseQuery
+
+    Args:
+        event: Workflow input
+
+    Returns:
+        Event with guardrails and KB fields
+
+    Raises:
+        GuardrailsError: If the input is blocked or the check fails
+    """
+    event = guardrails_check.lambda_handler(event, None)
+
+    try:
+        return kb_query.lambda_handler(dict(event), None)
+    except Exception as e:
+        logger.warning(
+            f"Knowledge Base stage failed, using empty context: {e}",
+            extra={"request_id": event.get("request_id")},
+        )
+        return _use_empty_context(event)
+
+
+def _run_input_stage_parallel(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run GuardrailsCheck and KnowledgeBaseQuery concurrently
+
+    Retrieval does not depend on the guardrail verdict, so it is started
+    speculatively and its result is discarded if the input is blocked. Both
+    stages run on the async service layer's thread pool.
+
+    Args:
+        event: Workflow input
+
+    Returns:
+        Event with guardrails and KB fields
+
+    Raises:
+        GuardrailsError: If the input is blocked or the check fails
+    """
+    return run_sync(_input_stage_parallel(event))
+
+
+async def _input_stage_parallel(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Coroutine behind _run_input_stage_parallel"""
+    guardrails_task = asyncio.ensure_future(
+        run_blocking(guardrails_check.lambda_handler, dict(event), None)
+    )
+    kb_task = asyncio.ensure_future(
+        run_blocking(kb_query.lambda_handler, dict(event), None)
+    )
+
+    try:
+        guardrails_event = await guardrails_task
+    except BaseException:
+        kb_task.cancel()
+        await asyncio.gather(kb_task, return_exceptions=True)
+        logger.info(
+            "Discarding speculative Knowledge Base result (input not passed)",
+            extra={"request_id": event.get("request_id")},
+        )
+        raise
+
+    try:
+        kb_event = await kb_task
+    except Exception as e:
+        logger.warning(
+            f"Knowledge Base stage failed, using empty context: {e}",
+            extra={"request_id": event.get("request_id")},
+        )
+        return _use_empty_context(guardrails_event)
+
+    return {
+        **kb_event,
+        **guardrails_event,
+        "timings": merge_timings(kb_event, guardrails_event),
+    }
+
+
+def _use_empty_context(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Equivalent of the UseEmptyContext Pass state
+
+    Args:
+        event: Event as it was before the Knowledge Base stage
+
+    Returns:
+        Event with empty context and KB results
+    """
+    return {
+        "query": event["query"],
+        "request_id": event["request_id"],
+        "start_time": event["start_time"],
+        "job_id": event.get("job_id"),
+        "guardrails_passed": event["guardrails_passed"],
+        "guardrails_action": event["guardrails_action"],
+        "context": "",
+        "kb_results": [],
+        "kb_results_count": 0,
+        "timings": event.get("timings", {}),
+    }
+
+
+def _failed(request_id: str, error: str, exc: Exception) -> Dict[str, Any]:
+    """Build a FAILED execution result"""
+    logger.warning(
+        "Inline pipeline failed",
+        extra={"request_id": request_id, "error": error, "cause": str(exc)},
+    )
+    return {"status": "FAILED", "output": {}, "error": error, "cause": str(exc)}
@@ -0,0 +1,329 @@
+"""
+Stream Handler
+
+Query entry point answering in Server-Sent Events (SSE) format. Runs the
+input stage in-process, then generates the answer with Bedrock's streaming
+API.
+
+Answer text is released to the client only after output guardrails have
+checked it: with OUTPUT_GUARDRAILS_MODE=full the whole answer is released
+after the check of the complete answer; with "incremental" each window is
+released while generation continues, once its check has passed (see
+src/services/incremental_guardrails.py). Text of a blocked window is never
+sent.
+
+start_stream() is transport-independent; src/handlers/stream_server.py
+serves it over HTTP with each frame written as soon as it is released. The
+response status is decided by the first frame: a request failing before any
+text is released (invalid, blocked input, blocked answer in full mode) gets
+the standard error response, a failure after that ends the stream with an
+error frame.
+"""
+
+import json
+import time
+from typing import Dict, Any, Generator, Iterator, Optional, Tuple
+
+from src.models.request import QueryRequest
+from src.handlers import cache_response, guardrails_check, kb_query
+from src.handlers.pipeline import run_input_stage
+from src.services.incremental_guardrails import create_output_evaluator
+from src.services.bedrock_service import aborted_stream_usage
+from src.services.clients import (
+    get_bedrock_service,
+    get_cache_service,
+    get_guardrails_service,
+)
+from src.utils.logger import get_logger
+from src.utils.error_handler import (
+    BedrockError,
+    GuardrailsError,
+    ValidationError,
+    error_response,
+)
+from src.utils.validators import validate_query
+from src.utils.metrics import put_guardrails_verdict, put_token_usage
+from src.utils.warmup import prime_models, register_init, run_init
+from src.config.settings import settings
+from src.config.prompts import build_rag_prompt, prerender_rag_prompt
+
+logger = get_logger(__name__)
+
+SSE_HEADERS = {"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+
+
+def init() -> None:
+    """Init phase: stage inits, the Bedrock service and the prompt template"""
+    prime_models(QueryRequest)
+    for stage in (guardrails_check, kb_query, cache_response):
+        run_init(stage.init)
+    get_bedrock_service()
+    prerender_rag_prompt()
+
+
+register_init(init)
+
+
+def start_stream(
+    body: Optional[str], request_id: str
+) -> Tuple[Dict[str, Any], Optional[Iterator[str]]]:
+    """
+    Validate a query request and start answering it
+
+    Runs until the first SSE frame is available, so failures before any text
+    is released are returned as error responses.
+
+    Events:
+        delta: {"text": str} - answer text that passed output guardrails
+        done: {"query", "answer", "sources", "cached", "execution_time_ms",
+               "ttft_ms", "tokens_used"}
+        error: {"error": str, "message": str, "request_id": str} - ends the
+               stream; no blocked text precedes it
+
+    Args:
+        body: Request body (QueryRequest JSON)
+        request_id: Request ID for tracking
+
+    Returns:
+        Tuple of (response, frames): on success a 200 response with
+        statusCode and SSE headers plus an iterator of SSE frames to send;
+        on failure an error response (with body) and None
+    """
+    try:
+        request = QueryRequest(**json.loads(body or "{}"))
+        sanitized_query = validate_query(request.query)
+
+    except ValidationError as e:
+        logger.warning(f"Validation error: {e}", extra={"request_id": request_id})
+        return error_response("validation_error", str(e), request_id, 400), None
+
+    except json.JSONDecodeError:
+        logger.warning("Invalid JSON in request body", extra={"request_id": request_id})
+        return (
+            error_response(
+                "invalid_json", "Invalid JSON in request body", request_id, 400
+            ),
+            None,
+        )
+
+    except Exception as e:
+        logger.warning(f"Invalid request: {e}", extra={"request_id": request_id})
+        return error_response("validation_error", str(e), request_id, 400), None
+
+    frames = _answer_frames(sanitized_query, request_id)
+    try:
+        first_frame = next(frames)
+    except Exception as e:
+        error_code, message, status_code = _failure_fields(e, request_id)
+        return error_response(error_code, message, request_id, status_code), None
+
+    response = {"statusCode": 200, "headers": dict(SSE_HEADERS)}
+    return response, _guarded_frames(first_frame, frames, request_id)
+
+
+def _guarded_frames(
+    first_frame: str, frames: Generator[str, None, None], request_id: str
+) -> Iterator[str]:
+    """Pass frames through, ending the stream with an error frame on failure"""
+    try:
+        yield first_frame
+        yield from frames
+    except Exception as e:
+        error_code, message, _ = _failure_fields(e, request_id)
+        yield _error_frame(error_code, message, request_id)
+    finally:
+        frames.close()
+
+
+def _answer_frames(query: str, request_id: str) -> Generator[str, None, None]:
+    """
+    SSE frames of the answer to a validated query
+
+    Args:
+        query: Validated query
+        request_id: Request ID for tracking
+
+    Yields:
+        str: delta frames, then the done frame
+
+    Raises:
+        GuardrailsError: If the input or the answer is blocked, or a
+            Guardrails check fails
+        BedrockError: If generation fails
+    """
+    start_time = time.time()
+
+    # Cache hit: the whole answer is available immediately
+    if settings.CACHE_ENABLED:
+        cached_result = get_cache_service().get(query)
+        if cached_result:
+            execution_time_ms = int((time.time() - start_time) * 1000)
+            yield format_sse("delta", {"text": cached_result.get("answer", "")})
+            yield format_sse(
+                "done",
+                {
+                    "query": query,
+                    "answer": cached_result.get("answer", ""),
+                    "sources": cached_result.get("sources", []),
+                    "cached": True,
+                    "execution_time_ms": execution_time_ms,
+                    "ttft_ms": execution_time_ms,
+                    "tokens_used": 0,
+                },
+            )
+            return
+
+    event = {"query": query, "request_id": request_id, "start_time": start_time}
+    event = run_input_stage(event)
+
+    answer_parts = []
+    input_tokens = 0
+    usage: Dict[str, Any] = {}
+    ttft_ms = None
+    evaluator = (
+        create_output_evaluator(get_guardrails_service())
+        if settings.OUTPUT_GUARDRAILS_MODE == "incremental"
+        else None
+    )
+
+    prompt = build_rag_prompt(query, event["context"])
+    stream = get_bedrock_service().invoke_model_stream(
+        prompt, max_tokens=settings.MAX_TOKENS
+    )
+    try:
+        for chunk in stream:
+            if chunk["type"] == "start":
+                input_tokens = chunk["input_tokens"]
+                continue
+            if chunk["type"] == "usage":
+                usage = chunk
+                continue
+
+            answer_parts.append(chunk["text"])
+            if evaluator is None:
+                continue
+            if not evaluator.feed(chunk["text"]):
+                break  # blocked - stop generating, send nothing pending
+
+            verified = evaluator.release()
+            if verified:
+                if ttft_ms is None:
+                    ttft_ms = int((time.time() - start_time) * 1000)
+                yield format_sse("delta", {"text": verified})
+    finally:
+        stream.close()
+
+    answer = "".join(answer_parts).strip()
+    if not usage:  # aborted: the stream ended before its usage event
+        usage = aborted_stream_usage(
+            input_tokens, "".join(answer_parts), "guardrails_abort"
+        )
+    put_token_usage(usage["input_tokens"], usage["output_tokens"])
+
+    # Output guardrails (the remaining windows, or the complete answer); the
+    # rest of the answer has not been released yet
+    if evaluator is not None:
+        guardrails_result = evaluator.finish()
+    else:
+        guardrails_result = get_guardrails_service().check_content(
+            answer, check_type="output"
+        )
+    put_guardrails_verdict("output", guardrails_result["passed"])
+    if not guardrails_result["passed"]:
+        raise GuardrailsError(
+            f"Answer blocked by output guardrails: {guardrails_result.get('reason')}"
+        )
+
+    remaining = evaluator.release() if evaluator is not None else "".join(answer_parts)
+    if ttft_ms is None:
+        ttft_ms = int((time.time() - start_time) * 1000)
+    if remaining:
+        yield format_sse("delta", {"text": remaining})
+
+    event["answer"] = answer
+    event["input_tokens"] = usage.get("input_tokens", 0)
+    event["output_tokens"] = usage.get("output_tokens", 0)
+    event["tokens_used"] = usage.get("tokens_used", 0)
+    event["stop_reason"] = usage.get("stop_reason", "")
+    event["output_guardrails_passed"] = True
+
+    # Cache response (failures are non-critical)
+    try:
+        event = cache_response.lambda_handler(event, None)
+    except Exception as e:
+        logger.warning(
+            f"Cache stage failed (non-critical): {e}", extra={"request_id": request_id}
+        )
+        event["sources"] = []
+
+    execution_time_ms = int((time.time() - start_time) * 1000)
+
+    logger.info(
+        "Streaming response completed",
+        extra={
+            "request_id": request_id,
+            "ttft_ms": ttft_ms,
+            "model_ttft_ms": usage.get("ttft_ms"),
+            "execution_time_ms": execution_time_ms,
+            "tokens_used": event["tokens_used"],
+        },
+    )
+
+    yield format_sse(
+        "done",
+        {
+            "query": query,
+            "answer": answer,
+            "sources": event.get("sources", []),
+            "cached": False,
+            "execution_time_ms": execution_time_ms,
+            "ttft_ms": ttft_ms,
+            "tokens_used": event["tokens_used"],
+        },
+    )
+
+
+def format_sse(event_name: str, data: Dict[str, Any]) -> str:
+    """
+    Format one Server-Sent Events frame
+
+    Args:
+        event_name: SSE event name
+        data: JSON-serializable payload
+
+    Returns:
+        str: SSE frame terminated by a blank line
+    """
+    return f"event: {event_name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _failure_fields(exc: Exception, request_id: str) -> Tuple[str, str, int]:
+    """
+    Log a failed answer and map it to an API error
+
+    Args:
+        exc: Exception raised while answering
+        request_id: Request ID for tracking
+
+    Returns:
+        Tuple of (error_code, message, status_code)
+    """
+    if isinstance(exc, GuardrailsError):
+        logger.warning(f"Query blocked: {exc}", extra={"request_id": request_id})
+        return "guardrails_blocked", "Content blocked by safety guidelines", 400
+    if isinstance(exc, BedrockError):
+        logger.error(
+            f"Streaming generation failed: {exc}", extra={"request_id": request_id}
+        )
+        return "workflow_failed", "Query processing failed", 500
+    logger.error(
+        f"Unexpected error: {exc}", extra={"request_id": request_id}, exc_info=True
+    )
+    return "internal_error", "Internal server error", 500
+
+
+def _error_frame(error_code: str, message: str, request_id: str) -> str:
+    """Format an SSE error frame in the standard error body shape"""
+    return format_sse(
+        "error", {"error": error_code, "message": message, "request_id": request_id}
+    )
@@ -0,0 +1,155 @@
+"""
+Stream Server
+
+HTTP server for the streaming endpoint. In Lambda it runs behind the Lambda
+Web Adapter (AWS_LWA_INVOKE_MODE=response_stream, see terraform/lambda.tf):
+the adapter forwards Function URL requests to this server and streams the
+response body back as it is written, so each SSE frame from
+src/handlers/stream_handler.py reaches the client when it is released.
+
+Non-HTTP events (the scheduled warm-up events) arrive as POST requests to
+AWS_LWA_PASS_THROUGH_PATH.
+
+Usage:
+    python -m src.handlers.stream_server
+"""
+
+import json
+import os
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Optional
+
+from src.handlers.stream_handler import init, start_stream
+from src.utils.logger import get_logger
+from src.utils.warmup import is_warmup_event, run_init
+from src.config.settings import settings
+
+logger = get_logger(__name__)
+
+HEALTH_PATH = "/health"
+PASS_THROUGH_PATH = os.getenv("AWS_LWA_PASS_THROUGH_PATH", "/events")
+LAMBDA_CONTEXT_HEADER = "x-amzn-lambda-context"
+
+
+class StreamRequestHandler(BaseHTTPRequestHandler):
+    """Serves queries as chunked SSE responses, flushing every frame"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        """Readiness check of the Lambda Web Adapter"""
+        if self.path != HEALTH_PATH:
+            self._send_json(404, {"error": "not_found"})
+            return
+        self._send_json(200, {"status": "ok"})
+
+    def do_POST(self) -> None:
+        """Answer a query, or a pass-through event"""
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+
+        if self.path == PASS_THROUGH_PATH:
+            self._handle_event(body)
+            return
+
+        response, frames = start_stream(body, self._request_id())
+        if frames is None:
+            self._send_response(response)
+            return
+        self._send_frames(response, frames)
+
+    def _handle_event(self, body: str) -> None:
+        """Answer warm-up events; other events are not handled here"""
+        try:
+            event = json.loads(body or "{}")
+        except json.JSONDecodeError:
+            event = None
+        if not is_warmup_event(event):
+            self._send_json(400, {"error": "unsupported_event"})
+            return
+        self._send_json(200, {"warmup": True, "init_ms": run_init(init)})
+
+    def _request_id(self) -> str:
+        """Lambda request ID from the adapter's context header"""
+        try:
+            context = json.loads(self.headers.get(LAMBDA_CONTEXT_HEADER) or "{}")
+            request_id: Optional[str] = context.get("request_id")
+        except (json.JSONDecodeError, AttributeError):
+            request_id = None
+        return request_id or str(uuid.uuid4())
+
+    def _send_frames(self, response: Dict[str, Any], frames: Iterator[str]) -> None:
+        """Write frames as HTTP/1.1 chunks as soon as each is produced"""
+        self.send_response(response["statusCode"])
+        for name, value in response["headers"].items():
+            self.send_header(name, value)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        try:
+            for frame in frames:
+                data = frame.encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Client disconnected during stream")
+            self.close_connection = True
+        finally:
+            frames.close()  # stops generation if the client went away
+
+    def _send_response(self, response: Dict[str, Any]) -> None:
+        """Write a complete (non-streamed) response"""
+        data = response.get("body", "").encode("utf-8")
+        self.send_response(response["statusCode"])
+        for name, value in response.get("headers", {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status_code: int, body: Dict[str, Any]) -> None:
+        self._send_response(
+            {
+                "statusCode": status_code,
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps(body),
+            }
+        )
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format % args)
+
+
+def create_server(
+    host: str = "127.0.0.1", port: Optional[int] = None
+) -> ThreadingHTTPServer:
+    """
+    Create the streaming HTTP server
+
+    Args:
+        host: Address to bind (the adapter connects over loopback)
+        port: Port to bind (default: STREAM_SERVER_PORT; 0 picks a free port)
+
+    Returns:
+        ThreadingHTTPServer: Server handling each request in its own thread
+    """
+    if port is None:
+        port = settings.STREAM_SERVER_PORT
+    server = ThreadingHTTPServer((host, port), StreamRequestHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    """Run the init phase, then serve until the process is stopped"""
+    run_init(init)
+    server = create_server()
+    logger.info("Stream server listening", extra={"port": server.server_address[1]})
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""
+Workflow Runner
+
+Runs the RAG workflow for one query with the configured orchestration mode
+(Step Functions execution or the in-process pipeline) and maps failures to
+API error responses. Shared by the query entry points.
+
+Step Functions inputs always carry 'job_id' (None outside async jobs): the
+state machine reads it to decide whether to record the outcome of a job.
+
+Work that outlives the request in inline mode (async jobs, background
+cache refreshes) runs as a
+workflow task: an asynchronous invocation of this function carrying
+{"workflow_task": <task>, "input": <workflow input>}, which the handler
+runs instead of serving a request (see workflow_task_aware). A thread left
+running after the handler returns is frozen with the container.
+"""
+
+import functools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+from src.services.clients import get_client, get_cache_service, get_job_service
+from src.utils.logger import get_logger
+from src.config.settings import settings
+
+logger = get_logger(__name__)
+
+# Lease / wait rounds before a request runs the workflow without a lease
+SINGLE_FLIGHT_MAX_ATTEMPTS = 3
+
+# Workflow tasks outside Lambda (no WORKFLOW_TASK_FUNCTION_NAME)
+_task_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="task")
+
+WORKFLOW_TASK_KEY = "workflow_task"
+WORKFLOW_TASK_JOB = "job"
+WORKFLOW_TASK_REFRESH = "refresh"
+
+
+def prime_workflow() -> None:
+    """
+    Build what run_workflow uses on first call (init phase)
+
+    step_functions mode builds the Step Functions client; inline mode runs
+    the init phases of the pipeline's stage handlers.
+    """
+    if settings.ORCHESTRATION_MODE == "inline":
+        from src.handlers import (
+            bedrock_invoke,
+            cache_response,
+            guardrails_check,
+            kb_query,
+        )
+        from src.utils.warmup import run_init
+
+        for stage in (guardrails_check, kb_query, bedrock_invoke, cache_response):
+            run_init(stage.init)
+    else:
+        get_client("stepfunctions")
+
+
+def run_workflow(execution_input: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the RAG workflow with the configured orchestration mode
+
+    Args:
+        execution_input: Workflow input with 'query', 'request_id', 'start_time'
+
+    Returns:
+        Dict with status, output (dict), error and cause
+
+    Raises:
+        ClientError: If the Step Functions execution cannot be started
+    """
+    if settings.ORCHESTRATION_MODE == "inline":
+        # Imported on first use: step_functions mode never loads the stage handlers
+        from src.handlers.pipeline import run_inline_pipeline
+
+        return run_inline_pipeline(execution_input)
+
+    return _run_step_functions(execution_input)
+
+
+def run_workflow_coalesced(execution_input: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the RAG workflow once per query across concurrent requests
+
+    The first request to miss the cache takes an in-flight lease on the
+    query's cache item and runs the workflow; identical requests arriving
+    meanwhile wait for its cached answer instead of starting their own
+    execution. If the owner fails or its lease expires, a waiter takes over.
+    Waiting stops when the request's time budget (REQUEST_TIME_BUDGET_SECONDS
+    from 'start_time') runs out.
+
+    Args:
+        execution_input: Workflow input with 'query', 'request_id', 'start_time'
+
+    Returns:
+        Dict with status, output (dict), error and cause; 'coalesced' is
+        True when the output is another request's cached answer; status is
+        "TIMEOUT" when the budget ran out while waiting
+
+    Raises:
+        ClientError: If the Step Functions execution cannot be started
+    """
+    if not (settings.CACHE_ENABLED and settings.SINGLE_FLIGHT_ENABLED):
+        return run_workflow(execution_input)
+
+    cache_service = get_cache_service()
+    query = execution_input["query"]
+    owner = execution_input["request_id"]
+    lease_seconds = settings.SINGLE_FLIGHT_LEASE_SECONDS
+    deadline = (
+        execution_input.get("start_time", time.time())
+        + settings.REQUEST_TIME_BUDGET_SECONDS
+    )
+
+    for _ in range(SINGLE_FLIGHT_MAX_ATTEMPTS):
+        if cache_service.acquire_lease(query, owner, lease_seconds):
+            try:
+                return run_workflow(execution_input)
+            finally:
+                # No-op once the cache stage replaced the lease with the answer
+                cache_service.release_lease(query, owner)
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        item = cache_service.wait_for_answer(
+            query,
+            timeout_seconds=min(lease_seconds, remaining),
+            poll_interval=settings.SINGLE_FLIGHT_POLL_INTERVAL,
+        )
+        if item is not None:
+            logger.info(
+                "Coalesced with in-flight request",
+                extra={"request_id": owner, "query": query[:50]},
+            )
+            return {
+                "status": "SUCCEEDED",
+                "output": {
+                    "answer": item.get("answer", ""),
+                    "sources": item.get("sources", []),
+                },
+                "error": None,
+                "cause": None,
+                "coalesced": True,
+            }
+
+    if time.time() >= deadline:
+        logger.warning(
+            "Time budget exhausted waiting for in-flight request",
+            extra={"request_id": owner},
+        )
+        return {"status": "TIMEOUT", "output": {}, "error": "Timeout", "cause": None}
+
+    logger.warning(
+        "In-flight lease not resolved, running without coalescing",
+        extra={"request_id": owner},
+    )
+    return run_workflow(execution_input)
+
+
+def start_background_refresh(query: str, request_id: str) -> bool:
+    """
+    Re-run the workflow for a stale cache entry without waiting for it
+
+    Only the request that claims the entry's refresh lease starts a run, so
+    a popular stale answer is refreshed once. The workflow's cache stage
+    replaces the entry with the new answer.
+
+    In step_functions mode the execution is started asynchronously; in
+    inline mode the pipeline runs as a workflow task.
+
+    Args:
+        query: Validated query whose cached answer is stale
+        request_id: ID of the request that served the stale answer
+
+    Returns:
+        bool: True if a refresh was started
+    """
+    cache_service = get_cache_service()
+    if not cache_service.acquire_refresh_lease(
+        query, request_id, settings.CACHE_REFRESH_LEASE_SECONDS
+    ):
+        return False
+
+    execution_input = {
+        "query": query,
+        "request_id": f"{request_id}-refresh",
+        "start_time": time.time(),
+    }
+
+    try:
+        if settings.ORCHESTRATION_MODE == "inline":
+            start_workflow_task(WORKFLOW_TASK_REFRESH, execution_input)
+        else:
+            get_client("stepfunctions").start_execution(
+                stateMachineArn=settings.STATE_MACHINE_ARN,
+                input=_execution_payload(execution_input),
+            )
+    except Exception as e:
+        # The lease expires and the next stale read retries the refresh
+        logger.error(
+            f"Failed to start cache refresh: {e}", extra={"request_id": request_id}
+        )
+        return False
+
+    logger.info(
+        "Started background cache refresh",
+        extra={"request_id": request_id, "query": query[:50]},
+    )
+    return True
+
+
+def _run_step_functions(execution_input: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Start a Step Functions execution and wait for it to finish
+
+    Express state machines (STATE_MACHINE_TYPE) run with StartSyncExecution;
+    Standard executions are polled with describe_execution.
+
+    Args:
+        execution_input: Workflow input
+
+    Returns:
+        Dict with status, output (dict), error and cause
+
+    Raises:
+        ClientError: If the execution cannot be started
+    """
+    sfn_client = get_client("stepfunctions")
+
+    if settings.STATE_MACHINE_TYPE == "EXPRESS":
+        # Express workflows return the result on the start call, no polling
+        sfn_response = sfn_client.start_sync_execution(
+            stateMachineArn=settings.STATE_MACHINE_ARN,
+            input=_execution_payload(execution_input),
+        )
+        logger.info(
+            "Finished Step Functions sync execution",
+            extra={
+                "request_id": execution_input["request_id"],
+                "execution_arn": sfn_response["executionArn"],
+                "status": sfn_response["status"],
+            },
+        )
+        return {
+            "status": sfn_response["status"],
+            "output": json.loads(sfn_response.get("output") or "{}"),
+            "error": sfn_response.get("error"),
+            "cause": sfn_response.get("cause"),
+        }
+
+    sfn_response = sfn_client.start_execution(
+        stateMachineArn=settings.STATE_MACHINE_ARN,
+        input=_execution_payload(execution_input),
+    )
+
+    execution_arn = sfn_response["executionArn"]
+
+    logger.info(
+        "Started Step Functions execution",
+        extra={
+            "request_id": execution_input["request_id"],
+            "execution_arn": execution_arn,
+        },
+    )
+
+    # Wait for execution to complete (with timeout)
+    execution_result = _wait_for_execution(
+        sfn_client, execution_arn, timeout_seconds=30
+    )
+    execution_result["output"] = json.loads(execution_result["output"] or "{}")
+
+    return execution_result
+
+
+def _wait_for_execution(
+    sfn_client, execution_arn: str, timeout_seconds: int = 30
+) -> Dict[str, Any]:
+    """
+    Wait for Step Functions execution to complete
+
+    Args:
+        sfn_client: Step Functions client
+        execution_arn: Execution ARN
+        timeout_seconds: Maximum time to wait
+
+    Returns:
+        Dict with status and output
+    """
+    start = time.time()
+
+    while time.time() - start < timeout_seconds:
+        response = sfn_client.describe_execution(executionArn=execution_arn)
+        status = response["status"]
+
+        if status in ["SUCCEEDED", "FAILED", "TIMED_OUT", "ABORTED"]:
+            return {
+                "status": status,
+                "output": response.get("output", "{}"),
+                "error": response.get("error"),
+                "cause": response.get("cause"),
+            }
+
+        time.sleep(0.5)
+
+    return {"status": "TIMEOUT", "output": "{}", "error": "Timeout", "cause": None}
+
+
+def start_workflow_job(execution_input: Dict[str, Any]) -> None:
+    """
+    Start the workflow for an async job without waiting for it
+
+    The outcome is recorded in the job record: in step_functions mode by the
+    state machine's RecordJob* states, in inline mode by the workflow task
+    running the pipeline.
+
+    Args:
+        execution_input: Workflow input with 'query', 'request_id',
+            'start_time' and 'job_id'
+
+    Raises:
+        ClientError: If the execution or workflow task cannot be started
+    """
+    if settings.ORCHESTRATION_MODE == "inline":
+        start_workflow_task(WORKFLOW_TASK_JOB, execution_input)
+        return
+
+    sfn_response = get_client("stepfunctions").start_execution(
+        stateMachineArn=settings.STATE_MACHINE_ARN,
+        input=_execution_payload(execution_input),
+    )
+    logger.info(
+        "Started Step Functions execution for job",
+        extra={
+            "job_id": execution_input["job_id"],
+            "execution_arn": sfn_response["executionArn"],
+        },
+    )
+
+
+def _run_inline_job(execution_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the inline pipeline for an async job and record its outcome"""
+    from src.handlers.pipeline import run_inline_pipeline
+
+    execution_result = run_inline_pipeline(execution_input)
+    if execution_result["status"] == "SUCCEEDED" and settings.CACHE_ENABLED:
+        get_cache_service().remember(execution_input["query"])
+    get_job_service().complete(execution_input["job_id"], execution_result)
+    return execution_result
+
+
+def start_workflow_task(task: str, execution_input: Dict[str, Any]) -> None:
+    """
+    Run a workflow task without waiting for it
+
+    In Lambda the task is an asynchronous invocation (InvocationType="Event")
+    of WORKFLOW_TASK_FUNCTION_NAME; elsewhere it runs on a background thread.
+
+    Args:
+        task: Task name (WORKFLOW_TASK_JOB or WORKFLOW_TASK_REFRESH)
+        execution_input: Workflow input of the task
+
+    Raises:
+        ClientError: If the function cannot be invoked
+    """
+    function_name = settings.WORKFLOW_TASK_FUNCTION_NAME
+    if not function_name:
+        _task_executor.submit(run_workflow_task, task, execution_input)
+        return
+
+    get_client("lambda").invoke(
+        FunctionName=function_name,
+        InvocationType="Event",
+        Payload=json.dumps(
+            {WORKFLOW_TASK_KEY: task, "input": execution_input}, default=str
+        ),
+    )
+    logger.info(
+        "Started workflow task",
+        extra={
+            "request_id": execution_input["request_id"],
+            "task": task,
+            "function_name": function_name,
+        },
+    )
+
+
+def run_workflow_task(task: str, execution_input: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run a workflow task to completion
+
+    Args:
+        task: Task name (WORKFLOW_TASK_JOB or WORKFLOW_TASK_REFRESH)
+        execution_input: Workflow input of the task
+
+    Returns:
+        Dict with the task name and the workflow status
+
+    Raises:
+        ValueError: If the task is unknown
+    """
+    if task == WORKFLOW_TASK_JOB:
+        execution_result = _run_inline_job(execution_input)
+    elif task == WORKFLOW_TASK_REFRESH:
+        from src.handlers.pipeline import run_inline_pipeline
+
+        # The cache stage replaces the stale entry with the new answer
+        execution_result = run_inline_pipeline(execution_input)
+    else:
+        raise ValueError(f"Unknown workflow task: {task}")
+    return {WORKFLOW_TASK_KEY: task, "status": execution_result["status"]}
+
+
+def workflow_task_aware(handler: Callable) -> Callable:
+    """
+    Decorator running workflow task events instead of the handler
+
+    Args:
+        handler: lambda_handler(event, context)
+
+    Returns:
+        Wrapped handler
+    """
+
+    @functools.wraps(handler)
+    def wrapper(event: Any, context: Any) -> Any:
+        if isinstance(event, dict) and WORKFLOW_TASK_KEY in event:
+            return run_workflow_task(event[WORKFLOW_TASK_KEY], event["input"])
+        return handler(event, context)
+
+    return wrapper
+
+
+def _execution_payload(execution_input: Dict[str, Any]) -> str:
+    """Step Functions execution input (JSON) with 'job_id' always present"""
+    return json.dumps({"job_id": None, **execution_input})
+
+
+def failure_response_fields(exec_error: str) -> Tuple[str, str, int]:
+    """
+    Map a failed execution's error name to an API error
+
+    Args:
+        exec_error: Execution error (e.g. "GuardrailsBlocked")
+
+    Returns:
+        Tuple of (error_code, message, status_code)
+    """
+    if exec_error == "GuardrailsBlocked":
+        return "guardrails_blocked", "Content blocked by safety guidelines", 400
+    return "workflow_failed", "Query processing failed", 500
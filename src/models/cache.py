@@ -2,7 +2,7 @@
 Cache data models
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 
 
@@ -16,8 +16,10 @@ class CacheItem(BaseModel):
         answer: Generated answer
         sources: List of source documents
         cached_at: Unix timestamp when cached
-        ttl: DynamoDB TTL attribute (Unix timestamp)
+        expires_at: Unix timestamp after which the answer is stale
+        ttl: DynamoDB TTL attribute (Unix timestamp, expires_at + stale grace)
         execution_time_ms: Original execution time
+        response_fragment: Pre-rendered QueryResponse body fragment
     """
 
     query_hash: str = Field(..., description="SHA-256 hash of query")
@@ -27,10 +29,15 @@ class CacheItem(BaseModel):
         default_factory=list, description="Source documents"
     )
     cached_at: int = Field(..., description="Cache timestamp (Unix)")
+    expires_at: Optional[int] = Field(None, description="Logical expiry (Unix)")
     ttl: int = Field(..., description="DynamoDB TTL (Unix)")
     execution_time_ms: int = Field(..., description="Execution time in ms")
+    response_fragment: Optional[str] = Field(
+        None, description="Pre-rendered response body fragment"
+    )
 
     model_config = {
+        "defer_build": True,
         "json_schema_extra": {
             "examples": [
                 {
@@ -39,9 +46,10 @@ class CacheItem(BaseModel):
                     "answer": "Amazon Bedrock is...",
                     "sources": [{"title": "guide.pdf", "page": 5}],
                     "cached_at": 1734422400,
+                    "expires_at": 1734508800,
                     "ttl": 1734508800,
                     "execution_time_ms": 3456,
                 }
             ]
-        }
+        },
     }
@@ -2,6 +2,8 @@
 API Request models
 """
 
+from typing import List
+
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -24,10 +26,41 @@ class QueryRequest(BaseModel):
         return v.strip()
 
     model_config = {
+        "defer_build": True,
         "json_schema_extra": {
             "examples": [
                 {"query": "What is Amazon Bedrock?"},
                 {"query": "How do I use Knowledge Bases with RAG?"},
             ]
-        }
+        },
+    }
+
+
+class BatchQueryRequest(BaseModel):
+    """
+    API request model for batch query endpoint
+
+    Items are validated individually by the handler so that one invalid
+    query fails only its own result.
+
+    Attributes:
+        queries: User query strings (1-50 items)
+    """
+
+    queries: List[str] = Field(
+        ..., min_length=1, max_length=50, description="User queries"
+    )
+
+    model_config = {
+        "defer_build": True,
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "queries": [
+                        "What is Amazon Bedrock?",
+                        "How do I use Knowledge Bases with RAG?",
+                    ]
+                },
+            ]
+        },
     }
@@ -2,7 +2,8 @@
 API Response models
 """
 
-from typing import List, Optional
+import json
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -21,6 +22,8 @@ class Source(BaseModel):
     uri: Optional[str] = Field(None, description="Document URI")
     score: Optional[float] = Field(None, description="Relevance score from KB")
 
+    model_config = {"defer_build": True}
+
 
 class QueryResponse(BaseModel):
     """
@@ -31,6 +34,7 @@ class QueryResponse(BaseModel):
         answer: Generated answer from Bedrock
         sources: List of source documents used
         cached: Whether response was served from cache
+        stale: Whether the cached answer had expired (a refresh was triggered)
         execution_time_ms: Total execution time in milliseconds
     """
 
@@ -38,9 +42,11 @@ class QueryResponse(BaseModel):
     answer: str = Field(..., description="Generated answer")
     sources: List[Source] = Field(default_factory=list, description="Source documents")
     cached: bool = Field(False, description="Whether response was cached")
+    stale: bool = Field(False, description="Whether the cached answer was stale")
     execution_time_ms: int = Field(..., description="Execution time in milliseconds")
 
     model_config = {
+        "defer_build": True,
         "json_schema_extra": {
             "examples": [
                 {
@@ -55,10 +61,144 @@ class QueryResponse(BaseModel):
                         }
                     ],
                     "cached": False,
+                    "stale": False,
                     "execution_time_ms": 3456,
                 }
             ]
-        }
+        },
+    }
+
+
+def render_body_fragment(query: str, answer: str, sources: List[Dict[str, Any]]) -> str:
+    """
+    Pre-render the cache-independent part of a QueryResponse body
+
+    The fragment is the JSON body up to and including 'sources', rendered
+    exactly as success_response(QueryResponse(...).model_dump()) renders
+    it, so splice_cached_body produces the same bytes without the model.
+
+    Args:
+        query: Query (sanitized)
+        answer: Generated answer
+        sources: Source dicts (title, page, uri, score)
+
+    Returns:
+        str: Body fragment (unterminated JSON object)
+    """
+    response = QueryResponse(
+        query=query, answer=answer, sources=sources, execution_time_ms=0
+    ).model_dump(include={"query", "answer", "sources"})
+    return json.dumps(response)[:-1]
+
+
+def splice_cached_body(fragment: str, stale: bool, execution_time_ms: int) -> str:
+    """
+    Complete a pre-rendered fragment into a cache-hit QueryResponse body
+
+    Args:
+        fragment: Output of render_body_fragment
+        stale: Whether the cached answer was stale
+        execution_time_ms: Execution time in milliseconds
+
+    Returns:
+        str: JSON body
+    """
+    return (
+        f'{fragment}, "cached": true, "stale": {"true" if stale else "false"}, '
+        f'"execution_time_ms": {int(execution_time_ms)}}}'
+    )
+
+
+class BatchQueryItem(BaseModel):
+    """
+    Result of one query in a batch
+
+    Attributes:
+        index: Position of the query in the request
+        query: Query (sanitized when valid)
+        status_code: HTTP status code of this item
+        answer: Generated answer (success only)
+        sources: Source documents (success only)
+        cached: Whether the answer was served from cache
+        stale: Whether the cached answer was stale
+        error: Error code (failure only)
+        message: Error message (failure only)
+    """
+
+    index: int = Field(..., description="Position in the request")
+    query: str = Field(..., description="Query")
+    status_code: int = Field(..., description="Per-item HTTP status code")
+    answer: Optional[str] = Field(None, description="Generated answer")
+    sources: List[Source] = Field(default_factory=list, description="Source documents")
+    cached: bool = Field(False, description="Whether response was cached")
+    stale: bool = Field(False, description="Whether the cached answer was stale")
+    error: Optional[str] = Field(None, description="Error code")
+    message: Optional[str] = Field(None, description="Error message")
+
+    model_config = {"defer_build": True}
+
+
+class BatchQueryResponse(BaseModel):
+    """
+    Batch API response model
+
+    Attributes:
+        results: Per-query results in request order
+        unique_queries: Number of distinct valid queries processed
+        cache_hits: Number of distinct queries served from cache
+        execution_time_ms: Total execution time in milliseconds
+    """
+
+    results: List[BatchQueryItem] = Field(..., description="Per-query results")
+    unique_queries: int = Field(..., description="Distinct valid queries")
+    cache_hits: int = Field(..., description="Distinct queries served from cache")
+    execution_time_ms: int = Field(..., description="Execution time in milliseconds")
+
+    model_config = {"defer_build": True}
+
+
+class JobResponse(BaseModel):
+    """
+    Async query job response model (POST /query in async mode, GET /query/{job_id})
+
+    Attributes:
+        job_id: Job ID
+        status: RUNNING, SUCCEEDED or FAILED
+        query: Query (sanitized)
+        answer: Generated answer (SUCCEEDED only)
+        sources: Source documents (SUCCEEDED only)
+        error: Error code (FAILED only)
+        message: Error message (FAILED only)
+        execution_time_ms: Time from submission to completion (finished jobs)
+    """
+
+    job_id: str = Field(..., description="Job ID")
+    status: str = Field(..., description="RUNNING, SUCCEEDED or FAILED")
+    query: str = Field(..., description="Query")
+    answer: Optional[str] = Field(None, description="Generated answer")
+    sources: List[Source] = Field(default_factory=list, description="Source documents")
+    error: Optional[str] = Field(None, description="Error code")
+    message: Optional[str] = Field(None, description="Error message")
+    execution_time_ms: Optional[int] = Field(
+        None, description="Time from submission to completion in milliseconds"
+    )
+
+    model_config = {
+        "defer_build": True,
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "job_id": "8f14e45f-ceea-4e67-a2b1-1c0a5e9e7d2a",
+                    "status": "RUNNING",
+                    "query": "What is Amazon Bedrock?",
+                    "answer": None,
+                    "sources": [],
+                    "error": None,
+                    "message": None,
+                    "execution_time_ms": None,
+                }
+            ]
+        },
     }
 
 
@@ -77,6 +217,7 @@ class ErrorResponse(BaseModel):
     request_id: str = Field(..., description="Request ID")
 
     model_config = {
+        "defer_build": True,
         "json_schema_extra": {
             "examples": [
                 {
@@ -85,5 +226,5 @@ class ErrorResponse(BaseModel):
                     "request_id": "req-abc123",
                 }
             ]
-        }
+        },
     }
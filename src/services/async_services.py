@@ -0,0 +1,258 @@
+"""
+Async Services
+
+asyncio counterparts of BedrockService, GuardrailsService,
+KnowledgeBaseService and CacheService, so one invocation can await several
+stages concurrently (e.g. input guardrails with retrieval, or retrieval
+fan-out over several queries).
+
+Each async service wraps the shared synchronous service from the registry
+and runs its blocking boto3 calls on a bounded thread pool (botocore
+clients are thread-safe and share one connection pool). Return shapes and
+exceptions are those of the wrapped service.
+
+Example (inside a synchronous Lambda handler):
+    guardrails = AsyncGuardrailsService()
+    kb = AsyncKnowledgeBaseService()
+    verdict, results = run_sync(
+        guardrails.check_content(query, "input"), kb.retrieve(query)
+    )
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.services.clients import (
+    get_bedrock_service,
+    get_cache_service,
+    get_guardrails_service,
+    get_kb_service,
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# One event loop per thread (batch items run pipelines on several threads)
+_loops = threading.local()
+
+_STREAM_END = object()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the shared thread pool for blocking service calls (ASYNC_MAX_WORKERS)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.ASYNC_MAX_WORKERS,
+                    thread_name_prefix="async-service",
+                )
+    return _executor
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking callable on the shared thread pool
+
+    Args:
+        fn: Callable
+        *args: Positional arguments
+        **kwargs: Keyword arguments
+
+    Returns:
+        The callable's return value (its exceptions propagate)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(fn, *args, **kwargs)
+    )
+
+
+def run_sync(*awaitables: Awaitable[Any]) -> Any:
+    """
+    Run coroutines concurrently to completion from synchronous code
+
+    Uses one event loop per thread, reused across warm invocations, instead
+    of creating a new loop per call like asyncio.run.
+
+    Args:
+        *awaitables: Coroutines (created, not yet awaited)
+
+    Returns:
+        The result of a single awaitable, or a list of results in argument
+        order for several (the first exception propagates)
+
+    Raises:
+        RuntimeError: If called from a running event loop (await instead)
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError("run_sync called from a running event loop; use await")
+
+    loop = getattr(_loops, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _loops.loop = asyncio.new_event_loop()
+
+    if len(awaitables) == 1:
+        return loop.run_until_complete(awaitables[0])
+    return loop.run_until_complete(_gather(awaitables))
+
+
+async def _gather(awaitables: Tuple[Awaitable[Any], ...]) -> List[Any]:
+    """Await all awaitables concurrently on the running loop"""
+    return list(await asyncio.gather(*awaitables))
+
+
+class AsyncBedrockService:
+    """asyncio counterpart of BedrockService"""
+
+    def __init__(self, service: Optional[Any] = None):
+        """
+        Initialize AsyncBedrockService
+
+        Args:
+            service: BedrockService (default: shared registry instance)
+        """
+        self.service = service or get_bedrock_service()
+
+    async def invoke_model(self, prompt: str, max_tokens: int = 1024) -> Dict[str, Any]:
+        """See BedrockService.invoke_model"""
+        return await run_blocking(self.service.invoke_model, prompt, max_tokens)
+
+    async def invoke_model_stream(
+        self, prompt: str, max_tokens: int = 1024
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        See BedrockService.invoke_model_stream
+
+        Each event is read on the thread pool. To stop early, close the
+        generator (e.g. iterate inside contextlib.aclosing); that closes the
+        underlying stream.
+        """
+        stream = await run_blocking(
+            self.service.invoke_model_stream, prompt, max_tokens
+        )
+        try:
+            while True:
+                event = await run_blocking(next, stream, _STREAM_END)
+                if event is _STREAM_END:
+                    break
+                yield event
+        finally:
+            await run_blocking(stream.close)
+
+
+class AsyncGuardrailsService:
+    """asyncio counterpart of GuardrailsService"""
+
+    def __init__(self, service: Optional[Any] = None):
+        """
+        Initialize AsyncGuardrailsService
+
+        Args:
+            service: GuardrailsService (default: shared registry instance)
+        """
+        self.service = service or get_guardrails_service()
+
+    async def check_content(self, text: str, check_type: str) -> Dict[str, Any]:
+        """See GuardrailsService.check_content"""
+        return await run_blocking(self.service.check_content, text, check_type)
+
+
+class AsyncKnowledgeBaseService:
+    """asyncio counterpart of KnowledgeBaseService"""
+
+    def __init__(self, service: Optional[Any] = None):
+        """
+        Initialize AsyncKnowledgeBaseService
+
+        Args:
+            service: KnowledgeBaseService (default: shared registry instance)
+        """
+        self.service = service or get_kb_service()
+
+    async def retrieve(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        """See KnowledgeBaseService.retrieve"""
+        return await run_blocking(self.service.retrieve, query, max_results)
+
+
+class AsyncCacheService:
+    """asyncio counterpart of CacheService"""
+
+    def __init__(self, service: Optional[Any] = None):
+        """
+        Initialize AsyncCacheService
+
+        Args:
+            service: CacheService (default: shared registry instance)
+        """
+        self.service = service or get_cache_service()
+
+    async def get(
+        self, query: str, allow_stale: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """See CacheService.get"""
+        return await run_blocking(self.service.get, query, allow_stale)
+
+    async def batch_get(
+        self, queries: List[str], allow_stale: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """See CacheService.batch_get"""
+        return await run_blocking(self.service.batch_get, queries, allow_stale)
+
+    async def put(
+        self, query: str, data: Dict[str, Any], ttl_seconds: int = 86400
+    ) -> bool:
+        """See CacheService.put"""
+        return await run_blocking(self.service.put, query, data, ttl_seconds)
+
+    async def batch_put(
+        self, entries: List[Tuple[str, Dict[str, Any]]], ttl_seconds: int = 86400
+    ) -> bool:
+        """See CacheService.batch_put"""
+        return await run_blocking(self.service.batch_put, entries, ttl_seconds)
+
+    async def acquire_lease(self, query: str, owner: str, lease_seconds: int) -> bool:
+        """See CacheService.acquire_lease"""
+        return await run_blocking(
+            self.service.acquire_lease, query, owner, lease_seconds
+        )
+
+    async def release_lease(self, query: str, owner: str) -> None:
+        """See CacheService.release_lease"""
+        await run_blocking(self.service.release_lease, query, owner)
+
+    async def wait_for_answer(
+        self, query: str, timeout_seconds: float, poll_interval: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        See CacheService.wait_for_answer
+
+        Polls with asyncio.sleep between reads, so waiting does not hold a
+        pool thread.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_seconds
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            item, resolved = await run_blocking(self.service.poll_answer, query)
+            if resolved:
+                return item
+            await asyncio.sleep(min(poll_interval, remaining))
+
+    async def remember(self, query: str) -> None:
+        """See CacheService.remember (may call the embedding model)"""
+        await run_blocking(self.service.remember, query)
+
+    def get_stats(self) -> Dict[str, int]:
+        """See CacheService.get_stats"""
+        return self.service.get_stats()
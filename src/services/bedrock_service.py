@@ -5,10 +5,12 @@ Handles all Bedrock model invocation for answer generation.
 """
 
 import json
-from typing import Dict, Any
-import boto3
+import time
+from typing import Dict, Any, Iterator, Optional
 from botocore.exceptions import ClientError
 
+from src.services.clients import get_client
+from src.services.context_builder import estimate_tokens
 from src.utils.logger import get_logger
 from src.utils.error_handler import BedrockError
 
@@ -18,15 +20,20 @@ logger = get_logger(__name__)
 class BedrockService:
     """Service for Bedrock model invocation"""
 
-    def __init__(self, model_id: str = "anthropic.claude-3-haiku-20240307-v1:0"):
+    def __init__(
+        self,
+        model_id: str = "anthropic.claude-3-haiku-20240307-v1:0",
+        client: Optional[Any] = None,
+    ):
         """
         Initialize BedrockService
 
         Args:
             model_id: Bedrock model ID (default: Claude 3 Haiku)
+            client: bedrock-runtime client (default: shared registry client)
         """
         self.model_id = model_id
-        self.client = boto3.client("bedrock-runtime")
+        self.client = client or get_client("bedrock-runtime")
         logger.info(f"BedrockService initialized", extra={"model_id": model_id})
 
     def invoke_model(self, prompt: str, max_tokens: int = 1024) -> Dict[str, Any]:
@@ -40,7 +47,9 @@ class BedrockService:
         Returns:
             Dict with keys:
                 - answer: Generated text
-                - tokens_used: Number of tokens used
+                - input_tokens: Prompt tokens
+                - output_tokens: Generated tokens
+                - tokens_used: Number of tokens used (input + output)
                 - stop_reason: Why generation stopped
 
         Raises:
@@ -78,6 +87,122 @@ class BedrockService:
             )
             raise BedrockError(f"Bedrock invocation failed: {error_message}")
 
+    def invoke_model_stream(
+        self, prompt: str, max_tokens: int = 1024
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Invoke Bedrock model with response streaming
+
+        Closing the generator early (e.g. to abort generation) closes the
+        underlying stream.
+
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate (default: 1024)
+
+        Yields:
+            {"type": "start", "input_tokens": int} once the prompt is
+            accepted, {"type": "delta", "text": str} for each text chunk,
+            then one {"type": "usage", "input_tokens": int,
+            "output_tokens": int, "tokens_used": int, "stop_reason": str,
+            "ttft_ms": int, "latency_ms": int}; a stream closed early has no
+            usage event (see aborted_stream_usage)
+
+        Raises:
+            BedrockError: If API call or stream fails
+        """
+        request_body = self._build_request_body(prompt, max_tokens)
+        start = time.perf_counter()
+
+        try:
+            response = self.client.invoke_model_with_response_stream(
+                modelId=self.model_id,
+                body=request_body,
+                contentType="application/json",
+                accept="application/json",
+            )
+        except ClientError as e:
+            error_message = e.response.get("Error", {}).get("Message", str(e))
+            logger.error(
+                f"Bedrock streaming API error: {error_message}",
+                extra={"model_id": self.model_id},
+            )
+            raise BedrockError(f"Bedrock invocation failed: {error_message}")
+
+        stream = response["body"]
+        ttft_ms = None
+        input_tokens = 0
+        output_tokens = 0
+        stop_reason = "end_turn"
+
+        try:
+            for stream_event in stream:
+                chunk = stream_event.get("chunk")
+                if chunk is None:
+                    # Modeled stream errors arrive as non-chunk events
+                    raise BedrockError(
+                        f"Bedrock stream error: {', '.join(stream_event.keys())}"
+                    )
+
+                payload = json.loads(chunk["bytes"])
+                payload_type = payload.get("type")
+
+                if payload_type == "message_start":
+                    usage = payload.get("message", {}).get("usage", {})
+                    input_tokens = usage.get("input_tokens", 0)
+                    yield {"type": "start", "input_tokens": input_tokens}
+
+                elif payload_type == "content_block_delta":
+                    delta = payload.get("delta", {})
+                    if delta.get("type") == "text_delta" and delta.get("text"):
+                        if ttft_ms is None:
+                            ttft_ms = int((time.perf_counter() - start) * 1000)
+                        yield {"type": "delta", "text": delta["text"]}
+
+                elif payload_type == "message_delta":
+                    stop_reason = (
+                        payload.get("delta", {}).get("stop_reason") or stop_reason
+                    )
+                    output_tokens = payload.get("usage", {}).get(
+                        "output_tokens", output_tokens
+                    )
+
+        except ClientError as e:
+            error_message = e.response.get("Error", {}).get("Message", str(e))
+            logger.error(
+                f"Bedrock stream error: {error_message}",
+                extra={"model_id": self.model_id},
+            )
+            raise BedrockError(f"Bedrock invocation failed: {error_message}")
+
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+
+        latency_ms = int((time.perf_counter() - start) * 1000)
+
+        logger.info(
+            "Bedrock streaming invocation completed",
+            extra={
+                "model_id": self.model_id,
+                "tokens_used": input_tokens + output_tokens,
+                "stop_reason": stop_reason,
+                "ttft_ms": ttft_ms,
+                "latency_ms": latency_ms,
+            },
+        )
+
+        yield {
+            "type": "usage",
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "tokens_used": input_tokens + output_tokens,
+            "stop_reason": stop_reason,
+            "ttft_ms": ttft_ms if ttft_ms is not None else latency_ms,
+            "latency_ms": latency_ms,
+        }
+
     def _build_request_body(self, prompt: str, max_tokens: int) -> str:
         """
         Build request body for Claude 3 model
@@ -116,7 +241,7 @@ class BedrockService:
             response: Raw API response
 
         Returns:
-            Dict with answer, tokens_used, stop_reason
+            Dict with answer, input_tokens, output_tokens, tokens_used, stop_reason
         """
         # Read response body
         response_body = json.loads(response["body"].read())
@@ -132,12 +257,44 @@ class BedrockService:
 
         # Extract usage information
         usage = response_body.get("usage", {})
-        tokens_used = usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
 
         stop_reason = response_body.get("stop_reason", "end_turn")
 
         return {
             "answer": answer.strip(),
-            "tokens_used": tokens_used,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "tokens_used": input_tokens + output_tokens,
             "stop_reason": stop_reason,
         }
+
+
+def aborted_stream_usage(
+    input_tokens: int, text: str, stop_reason: str = "aborted"
+) -> Dict[str, Any]:
+    """
+    Usage of a stream closed before its usage event
+
+    Bedrock reports output tokens only at the end of the stream, so the
+    output tokens of an aborted generation are estimated from the text
+    received; the result is marked with usage_estimated=True.
+
+    Args:
+        input_tokens: Input tokens from the stream's start event
+        text: Text received before the stream was closed
+        stop_reason: Why the stream was closed
+
+    Returns:
+        dict: Usage in the shape of the stream's usage event
+    """
+    output_tokens = estimate_tokens(text)
+    return {
+        "type": "usage",
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "tokens_used": input_tokens + output_tokens,
+        "stop_reason": stop_reason,
+        "usage_estimated": True,
+    }
@@ -0,0 +1,168 @@
+"""
+Cache Item Codec
+
+Compact encoding of cached answers. The answer, sources and execution time
+are serialized to JSON, compressed and stored in a single binary 'payload'
+attribute instead of plain 'answer' / 'sources' attributes, which shrinks
+items (fewer RCU/WCU, further from the 400 KB item limit).
+
+Payload layout:
+    byte 0     format version (PAYLOAD_FORMAT_VERSION)
+    byte 1     compression codec (CODEC_ZLIB or CODEC_ZSTD)
+    bytes 2..  compressed UTF-8 JSON
+
+zstd is used only if the optional 'zstandard' package is installed; items
+are decoded by the codec recorded in their header, so readers do not depend
+on the writer's settings.
+"""
+
+import json
+import zlib
+from decimal import Decimal
+from typing import Any, Dict
+
+from src.utils.error_handler import CacheError
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+PAYLOAD_ATTRIBUTE = "payload"
+PAYLOAD_FORMAT_VERSION = 1
+
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODECS = {"zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def resolve_codec(name: str) -> int:
+    """
+    Resolve a codec name to its header value
+
+    Args:
+        name: "zlib" or "zstd" ("zstd" falls back to zlib without zstandard)
+
+    Returns:
+        int: Codec ID
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name not in CODECS:
+        raise ValueError(f"Invalid cache codec: {name}. Must be 'zlib' or 'zstd'")
+    if name == "zstd" and zstandard is None:
+        return CODEC_ZLIB
+    return CODECS[name]
+
+
+def encode_payload(data: Dict[str, Any], codec: int = CODEC_ZLIB) -> bytes:
+    """
+    Encode response data into a versioned, compressed payload
+
+    Args:
+        data: JSON-serializable data (Decimals are written as numbers)
+        codec: CODEC_ZLIB or CODEC_ZSTD
+
+    Returns:
+        bytes: Payload
+    """
+    raw = json.dumps(
+        data, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    ).encode("utf-8")
+
+    if codec == CODEC_ZSTD:
+        body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    else:
+        codec = CODEC_ZLIB
+        body = zlib.compress(raw, ZLIB_LEVEL)
+
+    return bytes((PAYLOAD_FORMAT_VERSION, codec)) + body
+
+
+def decode_payload(payload: Any) -> Dict[str, Any]:
+    """
+    Decode a payload written by encode_payload
+
+    Args:
+        payload: bytes, or a boto3 Binary attribute value
+
+    Returns:
+        Dict: Decoded data
+
+    Raises:
+        CacheError: If the version or codec is unsupported or the data is corrupt
+    """
+    payload = bytes(getattr(payload, "value", payload))
+    if len(payload) < 2 or payload[0] != PAYLOAD_FORMAT_VERSION:
+        raise CacheError(
+            f"Unsupported payload format version: {payload[:1].hex() or 'empty'}"
+        )
+
+    codec, body = payload[1], payload[2:]
+    try:
+        if codec == CODEC_ZLIB:
+            raw = zlib.decompress(body)
+        elif codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise CacheError("zstd payload but zstandard is not installed")
+            raw = zstandard.ZstdDecompressor().decompress(body)
+        else:
+            raise CacheError(f"Unsupported payload codec: {codec}")
+        return json.loads(raw)
+    except (zlib.error, ValueError) as e:
+        raise CacheError(f"Corrupt cache payload: {e}")
+    except Exception as e:
+        if zstandard is not None and isinstance(e, zstandard.ZstdError):
+            raise CacheError(f"Corrupt cache payload: {e}")
+        raise
+
+
+def to_dynamodb(value: Any) -> Any:
+    """
+    Convert floats to Decimal for plain DynamoDB attributes
+
+    The boto3 resource layer rejects float values (e.g. source scores).
+
+    Args:
+        value: JSON-compatible value
+
+    Returns:
+        Value with every float replaced by a Decimal
+    """
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: to_dynamodb(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_dynamodb(v) for v in value]
+    return value
+
+
+def from_dynamodb(value: Any) -> Any:
+    """
+    Convert Decimals read from plain DynamoDB attributes to int or float
+
+    Args:
+        value: Attribute value as returned by the boto3 resource layer
+
+    Returns:
+        Value with every Decimal replaced by an int (integral) or a float
+    """
+    if isinstance(value, Decimal):
+        return _json_default(value)
+    if isinstance(value, dict):
+        return {k: from_dynamodb(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [from_dynamodb(v) for v in value]
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize Decimals read back from DynamoDB"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
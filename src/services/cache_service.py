@@ -6,28 +6,83 @@ Handles all cache operations for query responses.
 
 import hashlib
 import time
-from typing import Optional, Dict, Any
-import boto3
+from typing import Optional, Dict, Any, List, Tuple
 from botocore.exceptions import ClientError
 
+from src.config.settings import settings
+from src.services.cache_codec import (
+    PAYLOAD_ATTRIBUTE,
+    decode_payload,
+    encode_payload,
+    from_dynamodb,
+    resolve_codec,
+    to_dynamodb,
+)
+from src.services.clients import get_resource
+from src.models.response import render_body_fragment
+from src.utils.error_handler import CacheError
 from src.utils.logger import get_logger
+from src.utils.metrics import COUNT, put_metrics
+from src.utils.lru_cache import LRUCache
 
 logger = get_logger(__name__)
 
+BATCH_GET_MAX_KEYS = 100  # DynamoDB BatchGetItem limit
+BATCH_GET_MAX_ATTEMPTS = 4
+# Extra physical lifetime of a lease item after its lease expires
+LEASE_TTL_GRACE_SECONDS = 3600
+# Lookup outcome -> metric name
+LOOKUP_METRICS = {
+    "hit": "CacheHit",
+    "stale": "CacheStaleHit",
+    "expired": "CacheExpired",
+    "miss": "CacheMiss",
+}
+
 
 class CacheService:
     """Service for managing DynamoDB cache operations"""
 
-    def __init__(self, table_name: str):
+    def __init__(
+        self,
+        table_name: str,
+        dynamodb: Optional[Any] = None,
+        l1: Optional[LRUCache] = None,
+        semantic: Optional[Any] = None,
+        item_encoding: Optional[str] = None,
+    ):
         """
         Initialize CacheService
 
         Args:
             table_name: DynamoDB table name
+            dynamodb: DynamoDB service resource (default: shared registry resource)
+            l1: In-memory L1 cache (default: built from settings if L1_CACHE_ENABLED)
+            semantic: SemanticCache (default: built from settings if CACHE_MODE is "semantic")
+            item_encoding: "plain" or "compressed" (default: CACHE_ITEM_ENCODING);
+                reads accept both
         """
         self.table_name = table_name
-        self.dynamodb = boto3.resource("dynamodb")
+        self.dynamodb = dynamodb or get_resource("dynamodb")
         self.table = self.dynamodb.Table(table_name)
+        if l1 is None and settings.L1_CACHE_ENABLED:
+            l1 = LRUCache(
+                max_entries=settings.L1_CACHE_MAX_ENTRIES,
+                max_bytes=settings.L1_CACHE_MAX_BYTES,
+            )
+        self.l1 = l1
+        if semantic is None and settings.CACHE_MODE == "semantic":
+            from src.services.semantic_cache import build_semantic_cache
+
+            semantic = build_semantic_cache(settings)
+        self.semantic = semantic
+        self.item_encoding = item_encoding or settings.CACHE_ITEM_ENCODING
+        if self.item_encoding not in ("plain", "compressed"):
+            raise ValueError(
+                f"Invalid cache item encoding: {self.item_encoding}. "
+                "Must be 'plain' or 'compressed'"
+            )
+        self.codec = resolve_codec(settings.CACHE_COMPRESSION)
         logger.info(f"CacheService initialized with table: {table_name}")
 
     def _generate_cache_key(self, query: str) -> str:
@@ -42,52 +97,229 @@ class CacheService:
         """
         return hashlib.sha256(query.encode("utf-8")).hexdigest()
 
-    def get(self, query: str) -> Optional[Dict[str, Any]]:
+    def get(self, query: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
         """
         Get cached response for query
 
+        In semantic mode, an exact-key miss falls back to the answer of the
+        nearest cached query above SEMANTIC_CACHE_THRESHOLD.
+
         Args:
             query: Query string
+            allow_stale: Also return an expired item still within the
+                CACHE_STALE_GRACE_SECONDS window, marked with stale=True
 
         Returns:
             Optional[Dict]: Cached data if exists and not expired, None otherwise
         """
         cache_key = self._generate_cache_key(query)
+        item, outcome = self._get_by_key(cache_key, query, allow_stale)
+
+        if item is None and self.semantic is not None:
+            try:
+                match = self.semantic.lookup(query)
+            except Exception as e:
+                logger.error(f"Semantic cache lookup failed: {e}")
+                match = None
+
+            if match is not None and match[0] != cache_key:
+                neighbour_key, similarity = match
+                neighbour, neighbour_outcome = self._get_by_key(
+                    neighbour_key, query, allow_stale
+                )
+                if neighbour is not None:
+                    item, outcome = neighbour, neighbour_outcome
+                    logger.info(
+                        "Cache hit (semantic)",
+                        extra={
+                            "query_hash": cache_key,
+                            "matched_query_hash": neighbour_key,
+                            "similarity": round(similarity, 4),
+                        },
+                    )
+
+        _put_lookup_metrics({outcome: 1})
+        return item
+
+    def batch_get(
+        self, queries: List[str], allow_stale: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get cached responses for many queries (exact match only)
+
+        L1 is checked first; the remaining keys are read with BatchGetItem
+        (up to 100 keys per call, unprocessed keys retried with backoff).
+
+        Args:
+            queries: Query strings (duplicates allowed)
+            allow_stale: Also return items within the stale grace window,
+                marked with stale=True
+
+        Returns:
+            Dict mapping each query with a valid cached item to that item
+        """
+        keys = {self._generate_cache_key(q): q for q in queries}
+        found: Dict[str, Dict[str, Any]] = {}
+
+        remote_keys = []
+        for cache_key in keys:
+            l1_item = self.l1.get(cache_key) if self.l1 is not None else None
+            if l1_item is not None:
+                found[cache_key] = dict(l1_item)
+            else:
+                remote_keys.append(cache_key)
+
+        current_time = int(time.time())
+        for start in range(0, len(remote_keys), BATCH_GET_MAX_KEYS):
+            pending = {
+                self.table_name: {
+                    "Keys": [
+                        {"query_hash": k}
+                        for k in remote_keys[start : start + BATCH_GET_MAX_KEYS]
+                    ]
+                }
+            }
+
+            for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+                try:
+                    response = self.dynamodb.batch_get_item(RequestItems=pending)
+                except ClientError as e:
+                    logger.error(f"DynamoDB batch_get_item failed: {e}")
+                    break
+
+                for item in response.get("Responses", {}).get(self.table_name, []):
+                    item = self._decode_item(item)
+                    if item is None or "answer" not in item:
+                        continue
+                    if _expires_at(item) > current_time:
+                        found[item["query_hash"]] = item
+                        self._put_l1(item["query_hash"], item)
+                    elif allow_stale and item.get("ttl", 0) > current_time:
+                        found[item["query_hash"]] = {**item, "stale": True}
+
+                pending = response.get("UnprocessedKeys") or {}
+                if not pending:
+                    break
+                time.sleep(0.05 * (2**attempt))
+
+        logger.info(
+            "Cache batch lookup",
+            extra={
+                "keys": len(keys),
+                "hits": len(found),
+                "l1_hits": len(keys) - len(remote_keys),
+            },
+        )
+        stale_hits = sum(1 for item in found.values() if item.get("stale"))
+        _put_lookup_metrics(
+            {
+                "hit": len(found) - stale_hits,
+                "stale": stale_hits,
+                "miss": len(keys) - len(found),
+            }
+        )
+
+        return {keys[k]: item for k, item in found.items()}
+
+    def remember(self, query: str) -> None:
+        """
+        Add a query whose answer is cached to the semantic index
+
+        Used when the answer was written by another container (e.g. the
+        cache_response Lambda), so this container can match paraphrases.
+        Queries already in the index are skipped without an embedding call.
+
+        Args:
+            query: Query string
+        """
+        if self.semantic is None:
+            return
+
+        try:
+            self.semantic.add(query, self._generate_cache_key(query))
+        except Exception as e:
+            logger.error(f"Semantic cache indexing failed: {e}")
+
+    def _get_by_key(
+        self, cache_key: str, query: str, allow_stale: bool = False
+    ) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        Get cached item by cache key from L1, then DynamoDB
+
+        Args:
+            cache_key: Cache key (query hash)
+            query: Query string (for logging)
+            allow_stale: Return an item within the stale grace window
+                (marked with stale=True)
+
+        Returns:
+            Tuple of (cached data or None, lookup outcome: "hit", "stale",
+            "expired" or "miss")
+        """
+        # L1: in-memory, per container
+        if self.l1 is not None:
+            l1_item = self.l1.get(cache_key)
+            if l1_item is not None:
+                logger.info(
+                    "Cache hit (L1)",
+                    extra={"query_hash": cache_key, "query": query[:50]},
+                )
+                return dict(l1_item), "hit"
 
         try:
             response = self.table.get_item(Key={"query_hash": cache_key})
+            if "Item" in response:
+                response["Item"] = self._decode_item(response["Item"])
+                if response["Item"] is None:
+                    return None, "miss"
+
+            if "Item" in response and "answer" not in response["Item"]:
+                # Lease item of an in-flight query (see acquire_lease)
+                logger.info("Cache miss (in flight)", extra={"query_hash": cache_key})
+                return None, "miss"
 
             if "Item" in response:
                 item = response["Item"]
 
-                # Check if TTL has expired (DynamoDB TTL is eventually consistent)
+                # Check if the entry has expired (DynamoDB TTL is eventually
+                # consistent, and ttl includes the stale grace window)
                 current_time = int(time.time())
-                if item.get("ttl", 0) > current_time:
+                if _expires_at(item) > current_time:
                     logger.info(
                         "Cache hit",
                         extra={"query_hash": cache_key, "query": query[:50]},
                     )
-                    return item
+                    self._put_l1(cache_key, item)
+                    if self.semantic is not None and "query_text" in item:
+                        self.remember(item["query_text"])
+                    return item, "hit"
+                elif allow_stale and item.get("ttl", 0) > current_time:
+                    logger.info(
+                        "Cache hit (stale)",
+                        extra={
+                            "query_hash": cache_key,
+                            "expired_seconds": current_time - _expires_at(item),
+                        },
+                    )
+                    return {**item, "stale": True}, "stale"
                 else:
                     logger.info(
                         "Cache expired",
                         extra={"query_hash": cache_key, "ttl": item.get("ttl")},
                     )
-                    return None
+                    return None, "expired"
             else:
                 logger.info("Cache miss", extra={"query_hash": cache_key})
-                return None
+                return None, "miss"
 
         except ClientError as e:
             logger.error(
                 f"DynamoDB get_item failed: {e}", extra={"query_hash": cache_key}
             )
             # Return None on error - cache is best-effort
-            return None
+            return None, "miss"
 
-    def put(
-        self, query: str, data: Dict[str, Any], ttl_seconds: int = 86400
-    ) -> bool:
+    def put(self, query: str, data: Dict[str, Any], ttl_seconds: int = 86400) -> bool:
         """
         Cache response data
 
@@ -99,22 +331,14 @@ class CacheService:
         Returns:
             bool: True if successful, False otherwise
         """
-        cache_key = self._generate_cache_key(query)
-        current_time = int(time.time())
-        ttl = current_time + ttl_seconds
-
-        cache_item = {
-            "query_hash": cache_key,
-            "query_text": query,
-            "answer": data.get("answer", ""),
-            "sources": data.get("sources", []),
-            "cached_at": current_time,
-            "ttl": ttl,
-            "execution_time_ms": data.get("execution_time_ms", 0),
-        }
+        cache_item = self._build_item(query, data, ttl_seconds)
+        cache_key = cache_item["query_hash"]
+        ttl = cache_item["ttl"]
 
         try:
             self.table.put_item(Item=cache_item)
+            self._put_l1(cache_key, self._decode_item(cache_item))
+            self.remember(query)
             logger.info(
                 "Cached response",
                 extra={"query_hash": cache_key, "ttl": ttl, "query": query[:50]},
@@ -127,3 +351,378 @@ class CacheService:
             )
             # Don't fail the request if caching fails
             return False
+
+    def batch_put(
+        self, entries: List[Tuple[str, Dict[str, Any]]], ttl_seconds: int = 86400
+    ) -> bool:
+        """
+        Cache many responses with BatchWriteItem
+
+        Args:
+            entries: (query, response data) pairs
+            ttl_seconds: Time-to-live in seconds (default: 24 hours)
+
+        Returns:
+            bool: True if all items were written, False otherwise
+        """
+        items = [self._build_item(q, data, ttl_seconds) for q, data in entries]
+
+        try:
+            # batch_writer sends BatchWriteItem in chunks of 25 and resends
+            # unprocessed items
+            with self.table.batch_writer() as writer:
+                for item in items:
+                    writer.put_item(Item=item)
+
+        except ClientError as e:
+            logger.error(f"DynamoDB batch write failed: {e}")
+            return False
+
+        for (query, _), item in zip(entries, items):
+            self._put_l1(item["query_hash"], self._decode_item(item))
+            self.remember(query)
+
+        logger.info("Cached responses (batch)", extra={"items": len(items)})
+        return True
+
+    def acquire_lease(self, query: str, owner: str, lease_seconds: int) -> bool:
+        """
+        Mark a query as in flight so identical concurrent requests wait for it
+
+        The lease is taken with a conditional update on the query's cache
+        item, which succeeds only if there is no unexpired answer (checked
+        against expires_at, as in poll_answer) and no unexpired lease. An
+        expired lease (owner crashed or timed out) is taken over. The lease
+        item carries a ttl so DynamoDB eventually removes abandoned leases;
+        the owner's answer replaces the item.
+
+        Args:
+            query: Query string
+            owner: Lease owner (request ID)
+            lease_seconds: Lease duration; must exceed the workflow timeout
+
+        Returns:
+            bool: True if the lease was acquired, False if another request holds
+            it or a valid answer exists
+        """
+        cache_key = self._generate_cache_key(query)
+        current_time = int(time.time())
+
+        try:
+            self.table.update_item(
+                Key={"query_hash": cache_key},
+                UpdateExpression=(
+                    "SET lease_owner = :owner, lease_expires_at = :expires, "
+                    "#ttl = :ttl REMOVE answer, payload"
+                ),
+                # An answer in its stale grace period is expired too (legacy
+                # items without expires_at expire at their ttl)
+                ConditionExpression=(
+                    "((attribute_not_exists(answer) AND attribute_not_exists(payload)) "
+                    "OR expires_at <= :now "
+                    "OR (attribute_not_exists(expires_at) AND #ttl <= :now)) AND "
+                    "(attribute_not_exists(lease_expires_at) "
+                    "OR lease_expires_at <= :now)"
+                ),
+                ExpressionAttributeNames={"#ttl": "ttl"},
+                ExpressionAttributeValues={
+                    ":owner": owner,
+                    ":expires": current_time + lease_seconds,
+                    ":ttl": current_time + lease_seconds + LEASE_TTL_GRACE_SECONDS,
+                    ":now": current_time,
+                },
+            )
+            logger.info(
+                "Acquired in-flight lease",
+                extra={"query_hash": cache_key, "owner": owner},
+            )
+            return True
+
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == (
+                "ConditionalCheckFailedException"
+            ):
+                return False
+            logger.error(
+                f"DynamoDB update_item failed: {e}", extra={"query_hash": cache_key}
+            )
+            # Proceed without coalescing rather than block the request
+            return True
+
+    def release_lease(self, query: str, owner: str) -> None:
+        """
+        Release a lease without an answer (e.g. the workflow failed)
+
+        Deletes the lease item only if it is still owned by owner and no
+        answer was written, so a late release cannot remove another
+        request's lease or a fresh answer.
+
+        Args:
+            query: Query string
+            owner: Lease owner passed to acquire_lease
+        """
+        cache_key = self._generate_cache_key(query)
+
+        try:
+            self.table.delete_item(
+                Key={"query_hash": cache_key},
+                ConditionExpression=(
+                    "lease_owner = :owner AND attribute_not_exists(answer) "
+                    "AND attribute_not_exists(payload)"
+                ),
+                ExpressionAttributeValues={":owner": owner},
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != (
+                "ConditionalCheckFailedException"
+            ):
+                logger.error(
+                    f"DynamoDB delete_item failed: {e}",
+                    extra={"query_hash": cache_key},
+                )
+
+    def acquire_refresh_lease(self, query: str, owner: str, lease_seconds: int) -> bool:
+        """
+        Claim the refresh of a stale entry so only one request re-runs it
+
+        Unlike acquire_lease, the stale answer is kept so it can still be
+        served while the refresh runs. The refreshed answer replaces the
+        item (and the lease); if the refresh fails, the lease expires and
+        the next stale read claims it again.
+
+        Args:
+            query: Query string
+            owner: Lease owner (request ID)
+            lease_seconds: Lease duration
+
+        Returns:
+            bool: True if this caller should refresh the entry
+        """
+        cache_key = self._generate_cache_key(query)
+        current_time = int(time.time())
+
+        try:
+            self.table.update_item(
+                Key={"query_hash": cache_key},
+                UpdateExpression=(
+                    "SET refresh_owner = :owner, refresh_expires_at = :expires"
+                ),
+                ConditionExpression=(
+                    "(attribute_exists(answer) OR attribute_exists(payload)) AND "
+                    "expires_at <= :now AND "
+                    "(attribute_not_exists(refresh_expires_at) "
+                    "OR refresh_expires_at <= :now)"
+                ),
+                ExpressionAttributeValues={
+                    ":owner": owner,
+                    ":expires": current_time + lease_seconds,
+                    ":now": current_time,
+                },
+            )
+            return True
+
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != (
+                "ConditionalCheckFailedException"
+            ):
+                logger.error(
+                    f"DynamoDB update_item failed: {e}",
+                    extra={"query_hash": cache_key},
+                )
+            return False
+
+    def wait_for_answer(
+        self, query: str, timeout_seconds: float, poll_interval: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the in-flight request holding a query's lease to cache its answer
+
+        Args:
+            query: Query string
+            timeout_seconds: Maximum time to wait
+            poll_interval: Seconds between reads
+
+        Returns:
+            Optional[Dict]: Cached item once written; None if the lease was
+            released or expired without an answer, or on timeout
+        """
+        deadline = time.time() + timeout_seconds
+
+        while time.time() < deadline:
+            item, resolved = self.poll_answer(query)
+            if resolved:
+                return item
+            time.sleep(poll_interval)
+
+        return None
+
+    def poll_answer(self, query: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Read a leased query's item once (strongly consistent)
+
+        Args:
+            query: Query string
+
+        Returns:
+            Tuple of (cached item or None, resolved); resolved is False while
+            the lease is still held without an answer
+        """
+        cache_key = self._generate_cache_key(query)
+
+        try:
+            response = self.table.get_item(
+                Key={"query_hash": cache_key}, ConsistentRead=True
+            )
+        except ClientError as e:
+            logger.error(
+                f"DynamoDB get_item failed: {e}", extra={"query_hash": cache_key}
+            )
+            return None, True
+
+        item = response.get("Item")
+        current_time = int(time.time())
+        if item is None:
+            return None, True
+        item = self._decode_item(item)
+        if item is None:
+            return None, True
+        if "answer" in item:
+            if _expires_at(item) <= current_time:
+                return None, True
+            self._put_l1(cache_key, item)
+            return item, True
+        if item.get("lease_expires_at", 0) <= current_time:
+            return None, True
+
+        return None, False
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get L1 cache counters
+
+        Returns:
+            Dict with entries, bytes, hits, misses, evictions, expirations
+            (empty if L1 is disabled)
+        """
+        return self.l1.stats() if self.l1 is not None else {}
+
+    def _build_item(
+        self, query: str, data: Dict[str, Any], ttl_seconds: int
+    ) -> Dict[str, Any]:
+        """
+        Build a cache item
+
+        Args:
+            query: Query string
+            data: Response data (answer, sources, execution_time_ms)
+            ttl_seconds: Time-to-live in seconds
+
+        Returns:
+            Dict: DynamoDB item
+        """
+        current_time = int(time.time())
+        expires_at = current_time + ttl_seconds
+        item = {
+            "query_hash": self._generate_cache_key(query),
+            "query_text": query,
+            "cached_at": current_time,
+            "expires_at": expires_at,
+            # DynamoDB removes the item only after the stale grace window
+            "ttl": expires_at + settings.CACHE_STALE_GRACE_SECONDS,
+            "execution_time_ms": data.get("execution_time_ms", 0),
+        }
+
+        answer = {
+            "answer": data.get("answer", ""),
+            "sources": data.get("sources", []),
+        }
+        if settings.CACHE_RESPONSE_FRAGMENT_ENABLED:
+            try:
+                answer["response_fragment"] = render_body_fragment(
+                    query, answer["answer"], answer["sources"]
+                )
+            except ValueError as e:
+                logger.warning(f"Response fragment not rendered: {e}")
+        if self.item_encoding == "compressed":
+            item[PAYLOAD_ATTRIBUTE] = encode_payload(answer, self.codec)
+        else:
+            item.update(to_dynamodb(answer))
+        return item
+
+    def _decode_item(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Convert a stored item to the plain form (answer and sources attributes)
+
+        Numbers come back as int or float (not the Decimals DynamoDB returns),
+        so items serialize the same way whatever CACHE_ITEM_ENCODING wrote them.
+
+        Args:
+            item: Item as stored (plain or with a compressed payload)
+
+        Returns:
+            Optional[Dict]: Plain item, or None if the payload cannot be decoded
+        """
+        if PAYLOAD_ATTRIBUTE not in item:
+            return from_dynamodb(item)
+
+        try:
+            answer = decode_payload(item[PAYLOAD_ATTRIBUTE])
+        except CacheError as e:
+            logger.error(
+                f"Cache payload decode failed: {e}",
+                extra={"query_hash": item.get("query_hash")},
+            )
+            return None
+
+        plain = from_dynamodb({k: v for k, v in item.items() if k != PAYLOAD_ATTRIBUTE})
+        plain.update(answer)
+        return plain
+
+    def _put_l1(self, cache_key: str, item: Dict[str, Any]) -> None:
+        """
+        Store an item in L1, expiring at its expiry or the L1 max age, whichever is first
+
+        Args:
+            cache_key: Cache key
+            item: Cache item with 'expires_at' / 'ttl' (Unix timestamp)
+        """
+        if self.l1 is None:
+            return
+
+        expires_at = min(
+            float(_expires_at(item)), time.time() + settings.L1_CACHE_MAX_TTL_SECONDS
+        )
+        self.l1.put(cache_key, dict(item), expires_at=expires_at)
+
+
+def _put_lookup_metrics(counts: Dict[str, int]) -> None:
+    """
+    Emit cache lookup outcome counts
+
+    All four metrics are written (zeros included), so the hit rate is
+    Sum(CacheHit) / (sum of the four).
+
+    Args:
+        counts: Lookups by outcome ("hit", "stale", "expired", "miss")
+    """
+    put_metrics(
+        {
+            name: (counts.get(outcome, 0), COUNT)
+            for outcome, name in LOOKUP_METRICS.items()
+        }
+    )
+
+
+def _expires_at(item: Dict[str, Any]) -> int:
+    """
+    Logical expiry of a cache item
+
+    Items written before expires_at was introduced expire at their ttl.
+
+    Args:
+        item: Cache item
+
+    Returns:
+        int: Unix timestamp after which the answer is stale
+    """
+    return int(item.get("expires_at", item.get("ttl", 0)))
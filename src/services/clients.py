@@ -0,0 +1,236 @@
+"""
+AWS Client Registry
+
+Builds boto3 clients, resources and service objects lazily, once per Lambda
+container, and reuses them across warm invocations.
+
+Clients are created from a shared botocore session; boto3 (with s3transfer
+and its other imports) is loaded only when a resource is first requested,
+so handlers that use clients alone do not pay for importing it.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import botocore.session
+from botocore.config import Config
+
+from src.config.settings import settings
+from src.utils.logger import get_logger
+from src.utils.timing import instrument_client
+
+logger = get_logger(__name__)
+
+_lock = threading.RLock()
+_instances: Dict[str, Any] = {}
+_construction_ms: Dict[str, float] = {}
+
+
+def build_client_config() -> Config:
+    """
+    Build the botocore Config shared by all clients
+
+    Returns:
+        Config: Tuned connection pool, keep-alive, timeouts and retries
+    """
+    return Config(
+        region_name=settings.AWS_REGION,
+        max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+        connect_timeout=settings.AWS_CONNECT_TIMEOUT,
+        read_timeout=settings.AWS_READ_TIMEOUT,
+        tcp_keepalive=settings.AWS_TCP_KEEPALIVE,
+        retries={
+            "max_attempts": settings.AWS_MAX_RETRY_ATTEMPTS,
+            "mode": settings.AWS_RETRY_MODE,
+        },
+    )
+
+
+def _get_or_create(key: str, factory: Callable[[], Any]) -> Any:
+    """
+    Return the cached instance for key, building it on first use
+
+    Args:
+        key: Registry key
+        factory: Zero-argument callable that builds the instance
+
+    Returns:
+        The shared instance
+    """
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+
+    with _lock:
+        instance = _instances.get(key)
+        if instance is None:
+            start = time.perf_counter()
+            instance = factory()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            _instances[key] = instance
+            _construction_ms[key] = elapsed_ms
+            logger.info(
+                "Registry instance constructed",
+                extra={"registry_key": key, "construction_ms": round(elapsed_ms, 2)},
+            )
+
+    return instance
+
+
+def get_client(service_name: str) -> Any:
+    """
+    Get the shared boto3 client for a service
+
+    Args:
+        service_name: boto3 service name (e.g. "bedrock-runtime")
+
+    Returns:
+        boto3 client (instrumented for stage timings)
+    """
+    return _get_or_create(
+        f"client:{service_name}",
+        lambda: instrument_client(
+            _get_botocore_session().create_client(
+                service_name, config=build_client_config()
+            )
+        ),
+    )
+
+
+def get_resource(service_name: str) -> Any:
+    """
+    Get the shared boto3 resource for a service
+
+    Args:
+        service_name: boto3 service name (e.g. "dynamodb")
+
+    Returns:
+        boto3 service resource (instrumented for stage timings)
+    """
+    return _get_or_create(
+        f"resource:{service_name}",
+        lambda: _instrument_resource(
+            _get_boto3_session().resource(service_name, config=build_client_config())
+        ),
+    )
+
+
+def _get_botocore_session() -> Any:
+    """Shared botocore session (credentials are resolved once for all clients)"""
+    return _get_or_create("session:botocore", botocore.session.get_session)
+
+
+def _get_boto3_session() -> Any:
+    """Shared boto3 session wrapping the botocore session, imported on first use"""
+
+    def build():
+        import boto3
+
+        return boto3.session.Session(botocore_session=_get_botocore_session())
+
+    return _get_or_create("session:boto3", build)
+
+
+def _instrument_resource(resource: Any) -> Any:
+    """Instrument a resource's underlying client"""
+    instrument_client(resource.meta.client)
+    return resource
+
+
+def register_client(service_name: str, client: Any) -> None:
+    """
+    Use client as the shared client for a service (e.g. a local stand-in)
+
+    Args:
+        service_name: boto3 service name
+        client: Object with the boto3 client methods the services call
+    """
+    with _lock:
+        _instances[f"client:{service_name}"] = client
+
+
+def register_resource(service_name: str, resource: Any) -> None:
+    """
+    Use resource as the shared service resource (e.g. a local stand-in)
+
+    Args:
+        service_name: boto3 service name
+        resource: Object with the boto3 resource methods the services call
+    """
+    with _lock:
+        _instances[f"resource:{service_name}"] = resource
+
+
+def get_bedrock_service(model_id: Optional[str] = None):
+    """Get the shared BedrockService for model_id (default: settings.MODEL_ID)"""
+    from src.services.bedrock_service import BedrockService
+
+    model_id = model_id or settings.MODEL_ID
+    return _get_or_create(
+        f"service:bedrock:{model_id}", lambda: BedrockService(model_id)
+    )
+
+
+def get_guardrails_service(
+    guardrails_id: Optional[str] = None, guardrails_version: Optional[str] = None
+):
+    """Get the shared GuardrailsService (default: settings Guardrails ID/version)"""
+    from src.services.guardrails_service import GuardrailsService
+
+    guardrails_id = guardrails_id or settings.GUARDRAILS_ID
+    guardrails_version = guardrails_version or settings.GUARDRAILS_VERSION
+    return _get_or_create(
+        f"service:guardrails:{guardrails_id}:{guardrails_version}",
+        lambda: GuardrailsService(guardrails_id, guardrails_version),
+    )
+
+
+def get_kb_service(kb_id: Optional[str] = None):
+    """Get the shared KnowledgeBaseService for kb_id (default: settings.KB_ID)"""
+    from src.services.kb_service import KnowledgeBaseService
+
+    kb_id = kb_id or settings.KB_ID
+    return _get_or_create(f"service:kb:{kb_id}", lambda: KnowledgeBaseService(kb_id))
+
+
+def get_cache_service(table_name: Optional[str] = None):
+    """Get the shared CacheService for table_name (default: settings.CACHE_TABLE_NAME)"""
+    from src.services.cache_service import CacheService
+
+    table_name = table_name or settings.CACHE_TABLE_NAME
+    return _get_or_create(
+        f"service:cache:{table_name}", lambda: CacheService(table_name)
+    )
+
+
+def get_job_service(table_name: Optional[str] = None):
+    """Get the shared JobService for table_name (default: settings.CACHE_TABLE_NAME)"""
+    from src.services.job_service import JobService
+
+    table_name = table_name or settings.CACHE_TABLE_NAME
+    return _get_or_create(f"service:job:{table_name}", lambda: JobService(table_name))
+
+
+def get_reranker():
+    """Get the shared Reranker (built from settings)"""
+    from src.services.reranker import build_reranker
+
+    return _get_or_create("service:reranker", lambda: build_reranker(settings))
+
+
+def get_construction_times() -> Dict[str, float]:
+    """
+    Get construction time of every instance built in this container
+
+    Returns:
+        Dict mapping registry key to construction time in milliseconds
+    """
+    return dict(_construction_ms)
+
+
+def reset() -> None:
+    """Drop all cached instances (next access rebuilds them)"""
+    with _lock:
+        _instances.clear()
+        _construction_ms.clear()
@@ -0,0 +1,180 @@
+"""
+Context Builder
+
+Builds the prompt context from Knowledge Base results: drops near-duplicate
+chunks (character shingle overlap) and packs the remaining chunks by score
+into a token budget.
+"""
+
+import re
+from typing import Any, Dict, List, Set
+
+from src.config.prompts import RAG_PROMPT_TEMPLATE
+
+NO_CONTEXT_MESSAGE = "No relevant information found in the knowledge base."
+
+SHINGLE_SIZE = 5
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of text without a tokenizer
+
+    ASCII text averages about 4 characters per token; other characters
+    (e.g. Japanese) are counted as one token each.
+
+    Args:
+        text: Input text
+
+    Returns:
+        int: Estimated token count
+    """
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """
+    Hashed character shingles of whitespace-normalized, lowercased text
+
+    Args:
+        text: Input text
+        size: Shingle length in characters
+
+    Returns:
+        Set[int]: Shingle hashes
+    """
+    normalized = re.sub(r"\s+", " ", text.lower()).strip()
+    if len(normalized) <= size:
+        return {hash(normalized)} if normalized else set()
+    return {hash(normalized[i : i + size]) for i in range(len(normalized) - size + 1)}
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    """Jaccard similarity of two shingle sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def format_chunk(index: int, result: Dict[str, Any]) -> str:
+    """
+    Format one retrieved chunk for the prompt
+
+    Args:
+        index: 1-based source number
+        result: KB result with 'text' and 'metadata'
+
+    Returns:
+        str: Chunk with its source header
+    """
+    metadata = result.get("metadata", {})
+    source_uri = metadata.get("x-amz-bedrock-kb-source-uri", "Unknown source")
+    return f"[Source {index}: {source_uri}]\n{result.get('text', '').strip()}"
+
+
+def context_token_budget(
+    query: str,
+    max_tokens: int,
+    context_window: int,
+    configured_budget: int = 0,
+) -> int:
+    """
+    Tokens available for context in the prompt
+
+    Args:
+        query: User query
+        max_tokens: Tokens reserved for the answer (MAX_TOKENS)
+        context_window: Model context window (MODEL_CONTEXT_WINDOW)
+        configured_budget: Explicit cap (CONTEXT_TOKEN_BUDGET, 0: no cap)
+
+    Returns:
+        int: Context token budget
+    """
+    prompt_tokens = estimate_tokens(RAG_PROMPT_TEMPLATE.format(query=query, context=""))
+    budget = max(context_window - max_tokens - prompt_tokens, 0)
+    if configured_budget > 0:
+        budget = min(budget, configured_budget)
+    return budget
+
+
+def build_context(
+    results: List[Dict[str, Any]],
+    token_budget: int,
+    dedup_threshold: float = 0.8,
+) -> Dict[str, Any]:
+    """
+    Deduplicate and pack retrieved chunks into the context budget
+
+    Chunks are taken in descending score order ('rerank_score' when present). A chunk is dropped if its
+    shingle Jaccard similarity with an already selected chunk reaches
+    dedup_threshold, or if it does not fit the remaining budget.
+
+    Args:
+        results: KB results with 'text', 'score' and 'metadata'
+        token_budget: Maximum estimated tokens of the context
+        dedup_threshold: Similarity at or above which chunks are duplicates
+
+    Returns:
+        Dict with keys:
+            - context: str (formatted context for the prompt)
+            - results: List of selected results in context order
+            - tokens: Estimated tokens of the context
+            - tokens_saved: Estimated tokens removed compared to using every chunk
+            - duplicates_dropped: int
+            - over_budget_dropped: int
+    """
+    chunks = [r for r in results if r.get("text", "").strip()]
+    if not chunks:
+        return {
+            "context": NO_CONTEXT_MESSAGE,
+            "results": [],
+            "tokens": estimate_tokens(NO_CONTEXT_MESSAGE),
+            "tokens_saved": 0,
+            "duplicates_dropped": 0,
+            "over_budget_dropped": 0,
+        }
+
+    full_tokens = estimate_tokens(
+        "\n\n".join(format_chunk(i, r) for i, r in enumerate(chunks, 1))
+    )
+
+    selected: List[Dict[str, Any]] = []
+    selected_shingles: List[Set[int]] = []
+    tokens = 0
+    duplicates_dropped = 0
+    over_budget_dropped = 0
+
+    for result in sorted(
+        chunks, key=lambda r: r.get("rerank_score", r.get("score", 0.0)), reverse=True
+    ):
+        result_shingles = shingles(result["text"])
+        if any(
+            jaccard(result_shingles, s) >= dedup_threshold for s in selected_shingles
+        ):
+            duplicates_dropped += 1
+            continue
+
+        # +1 for the "\n\n" separator
+        chunk_tokens = estimate_tokens(format_chunk(len(selected) + 1, result)) + 1
+        if tokens + chunk_tokens > token_budget:
+            over_budget_dropped += 1
+            continue
+
+        selected.append(result)
+        selected_shingles.append(result_shingles)
+        tokens += chunk_tokens
+
+    context = "\n\n".join(format_chunk(i, r) for i, r in enumerate(selected, 1))
+    if not context:
+        context = NO_CONTEXT_MESSAGE
+    context_tokens = estimate_tokens(context)
+
+    return {
+        "context": context,
+        "results": selected,
+        "tokens": context_tokens,
+        "tokens_saved": max(full_tokens - context_tokens, 0),
+        "duplicates_dropped": duplicates_dropped,
+        "over_budget_dropped": over_budget_dropped,
+    }
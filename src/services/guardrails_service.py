@@ -4,30 +4,57 @@ Bedrock Guardrails Service
 Handles all Guardrails API calls for content safety checks.
 """
 
-from typing import Dict, Any
-import boto3
+import hashlib
+from typing import Dict, Any, Optional
 from botocore.exceptions import ClientError
 
+from src.config.settings import settings
+from src.services.clients import get_client
+from src.services.result_cache import ResultCache
 from src.utils.logger import get_logger
 from src.utils.error_handler import GuardrailsError
 
 logger = get_logger(__name__)
 
+# Working draft of a guardrail: edited in place, so its verdicts are not cached
+DRAFT_VERSION = "DRAFT"
+
 
 class GuardrailsService:
     """Service for Bedrock Guardrails content safety checks"""
 
-    def __init__(self, guardrails_id: str, guardrails_version: str = "DRAFT"):
+    def __init__(
+        self,
+        guardrails_id: str,
+        guardrails_version: str = "DRAFT",
+        client: Optional[Any] = None,
+        verdict_cache: Optional[ResultCache] = None,
+    ):
         """
         Initialize GuardrailsService
 
         Args:
             guardrails_id: Bedrock Guardrails ID
             guardrails_version: Guardrails version (default: DRAFT)
+            client: bedrock-runtime client (default: shared registry client)
+            verdict_cache: Verdict cache (default: built from settings if
+                GUARDRAILS_VERDICT_CACHE_ENABLED and the version is not DRAFT)
         """
         self.guardrails_id = guardrails_id
         self.guardrails_version = guardrails_version
-        self.client = boto3.client("bedrock-runtime")
+        self.client = client or get_client("bedrock-runtime")
+        if (
+            verdict_cache is None
+            and settings.GUARDRAILS_VERDICT_CACHE_ENABLED
+            and guardrails_version.upper() != DRAFT_VERSION
+        ):
+            verdict_cache = ResultCache(
+                "guardrails",
+                ttl_seconds=settings.GUARDRAILS_VERDICT_CACHE_TTL_SECONDS,
+                max_entries=settings.GUARDRAILS_VERDICT_CACHE_MAX_ENTRIES,
+                table_name=settings.GUARDRAILS_VERDICT_TABLE_NAME or None,
+            )
+        self.verdict_cache = verdict_cache
         logger.info(
             f"GuardrailsService initialized",
             extra={"guardrails_id": guardrails_id, "version": guardrails_version},
@@ -37,6 +64,11 @@ class GuardrailsService:
         """
         Check content with Guardrails
 
+        Verdicts are memoized per guardrail ID, version, source and text, so
+        a new GUARDRAILS_VERSION never reuses verdicts of the previous one.
+        DRAFT verdicts are never memoized: the draft changes without a new
+        version.
+
         Args:
             text: Content to check
             check_type: "input" or "output"
@@ -51,7 +83,23 @@ class GuardrailsService:
             GuardrailsError: If API call fails
         """
         if check_type not in ["input", "output"]:
-            raise ValueError(f"Invalid check_type: {check_type}. Must be 'input' or 'output'")
+            raise ValueError(
+                f"Invalid check_type: {check_type}. Must be 'input' or 'output'"
+            )
+
+        verdict_key = self._verdict_key(text, check_type)
+        if self.verdict_cache is not None:
+            cached = self.verdict_cache.get(verdict_key)
+            if cached is not None:
+                logger.info(
+                    "Guardrails verdict cache hit",
+                    extra={
+                        "check_type": check_type,
+                        "action": cached["action"],
+                        "text_length": len(text),
+                    },
+                )
+                return cached
 
         try:
             response = self.client.apply_guardrail(
@@ -62,6 +110,8 @@ class GuardrailsService:
             )
 
             result = self._parse_guardrails_response(response)
+            if self.verdict_cache is not None:
+                self.verdict_cache.put(verdict_key, result)
 
             logger.info(
                 f"Guardrails check completed",
@@ -83,6 +133,23 @@ class GuardrailsService:
             )
             raise GuardrailsError(f"Guardrails check failed: {error_message}")
 
+    def _verdict_key(self, text: str, check_type: str) -> str:
+        """
+        Build the verdict cache key
+
+        Args:
+            text: Checked content
+            check_type: "input" or "output"
+
+        Returns:
+            str: SHA-256 hex of guardrail ID, version, source and text hash
+        """
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            f"{self.guardrails_id}:{self.guardrails_version}:"
+            f"{check_type.upper()}:{text_hash}".encode("utf-8")
+        ).hexdigest()
+
     def _parse_guardrails_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """
         Parse Guardrails API response
@@ -115,6 +182,8 @@ class GuardrailsService:
                     if assessment.get("sensitiveInformationPolicy"):
                         reasons.append("PII detected")
 
-                reason = "; ".join(reasons) if reasons else "Content blocked by guardrails"
+                reason = (
+                    "; ".join(reasons) if reasons else "Content blocked by guardrails"
+                )
 
         return {"passed": passed, "action": action, "reason": reason}
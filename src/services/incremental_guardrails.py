@@ -0,0 +1,236 @@
+"""
+Incremental Guardrails Evaluator
+
+Checks a generated answer with output Guardrails in overlapping windows
+while it is still being produced, so a blocked answer can be aborted early
+instead of paying for a full serial check after generation. Text is released
+to the client (release) only once the windows covering it have passed.
+"""
+
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from src.services.async_services import get_executor
+from src.utils.logger import get_logger
+from src.config.settings import settings
+
+logger = get_logger(__name__)
+
+
+class IncrementalGuardrailsEvaluator:
+    """
+    Windowed output Guardrails checks over a growing answer
+
+    Every window_chars of new text is checked together with the preceding
+    overlap_chars, so violations spanning a window boundary are still seen
+    whole. At most max_concurrency windows are checked at once.
+
+    Text is verified once every window up to its end has passed; release()
+    returns verified text except the last overlap_chars, which are held
+    until the next window (or finish) has seen them with what follows.
+
+    Usage:
+        evaluator = IncrementalGuardrailsEvaluator(guardrails_service)
+        for delta in stream:
+            if not evaluator.feed(delta):
+                break  # blocked - abort generation
+            send(evaluator.release())
+        result = evaluator.finish()
+        if result["passed"]:
+            send(evaluator.release())
+    """
+
+    def __init__(
+        self,
+        guardrails_service: Any,
+        window_chars: int = 1000,
+        overlap_chars: int = 200,
+        max_concurrency: int = 3,
+    ):
+        """
+        Initialize IncrementalGuardrailsEvaluator
+
+        Args:
+            guardrails_service: GuardrailsService used for each window
+            window_chars: New characters per window
+            overlap_chars: Characters of the previous window repeated in the next
+            max_concurrency: Maximum windows checked concurrently
+        """
+        if overlap_chars >= window_chars:
+            raise ValueError("overlap_chars must be smaller than window_chars")
+
+        self.guardrails_service = guardrails_service
+        self.window_chars = window_chars
+        self.overlap_chars = overlap_chars
+        self.max_concurrency = max_concurrency
+
+        self._text = ""
+        self._next_start = 0
+        self._pending: List[Tuple[str, int]] = []
+        self._in_flight: List[Tuple[Future, int]] = []
+        self._scheduled = 0
+        # Ends of scheduled windows not yet verified, in order, and the ends
+        # of those that passed out of order
+        self._window_ends: Deque[int] = deque()
+        self._passed_ends: Set[int] = set()
+        self._verified_end = 0
+        self._released = 0
+        self._finished = False
+        self.windows_checked = 0
+        self.blocked_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def blocked(self) -> bool:
+        return self.blocked_result is not None
+
+    def feed(self, text: str) -> bool:
+        """
+        Add generated text and schedule checks for completed windows
+
+        Args:
+            text: Newly generated text
+
+        Returns:
+            bool: False once any window has been blocked (caller should abort)
+
+        Raises:
+            GuardrailsError: If a Guardrails API call failed
+        """
+        self._text += text
+
+        while len(self._text) - self._next_start >= self.window_chars:
+            end = self._next_start + self.window_chars
+            self._schedule(end)
+            self._next_start = end
+
+        self._collect(wait=False)
+        return not self.blocked
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Check the remaining tail and wait for all windows
+
+        Returns:
+            Dict with passed, action, reason (as GuardrailsService.check_content)
+            and windows_checked
+
+        Raises:
+            GuardrailsError: If a Guardrails API call failed
+        """
+        if not self.blocked and (
+            self._next_start < len(self._text) or self._scheduled == 0
+        ):
+            self._schedule(len(self._text))
+            self._next_start = len(self._text)
+
+        while (self._pending or self._in_flight) and not self.blocked:
+            self._collect(wait=True)
+
+        self._cancel_outstanding()
+        self._finished = True
+
+        result = self.blocked_result or {
+            "passed": True,
+            "action": "NONE",
+            "reason": None,
+        }
+        return {**result, "windows_checked": self.windows_checked}
+
+    def release(self) -> str:
+        """
+        Take the text verified since the last call
+
+        Returns:
+            str: Verified text not released before ("" once blocked)
+        """
+        if self.blocked:
+            return ""
+        end = self._verified_end
+        if not self._finished:
+            end = max(self._released, end - self.overlap_chars)
+        text = self._text[self._released : end]
+        self._released = end
+        return text
+
+    def abort(self) -> None:
+        """Drop pending windows and cancel checks that have not started"""
+        self._cancel_outstanding()
+
+    def _schedule(self, end: int) -> None:
+        """Queue the window ending at end for checking"""
+        self._pending.append((self._window(end), end))
+        self._window_ends.append(end)
+        self._scheduled += 1
+
+    def _window(self, end: int) -> str:
+        """Text of the window ending at end, including the overlap"""
+        return self._text[max(0, self._next_start - self.overlap_chars) : end]
+
+    def _collect(self, wait: bool) -> None:
+        """Harvest finished checks and submit pending windows up to the limit"""
+        if wait and self._in_flight:
+            self._in_flight[0][0].result()
+
+        still_running = []
+        for future, end in self._in_flight:
+            if not future.done():
+                still_running.append((future, end))
+                continue
+
+            result = future.result()  # re-raises GuardrailsError
+            self.windows_checked += 1
+            if result["passed"]:
+                self._passed_ends.add(end)
+            elif self.blocked_result is None:
+                self.blocked_result = result
+                logger.warning(
+                    "Output window blocked by guardrails",
+                    extra={
+                        "window": self.windows_checked,
+                        "reason": result.get("reason"),
+                    },
+                )
+        self._in_flight = still_running
+
+        if self.blocked:
+            self._cancel_outstanding()
+            return
+
+        while self._window_ends and self._window_ends[0] in self._passed_ends:
+            self._verified_end = self._window_ends.popleft()
+            self._passed_ends.discard(self._verified_end)
+
+        while self._pending and len(self._in_flight) < self.max_concurrency:
+            window, end = self._pending.pop(0)
+            # Shared pool of the async service layer; the evaluator caps its
+            # own in-flight checks
+            future = get_executor().submit(
+                self.guardrails_service.check_content, window, "output"
+            )
+            self._in_flight.append((future, end))
+
+    def _cancel_outstanding(self) -> None:
+        """Cancel queued work once the verdict is known"""
+        self._pending.clear()
+        for future, _ in self._in_flight:
+            future.cancel()
+        self._in_flight = []
+
+
+def create_output_evaluator(guardrails_service: Any) -> IncrementalGuardrailsEvaluator:
+    """
+    Build an evaluator from GUARDRAILS_WINDOW_CHARS / _OVERLAP_CHARS / _MAX_CONCURRENCY
+
+    Args:
+        guardrails_service: GuardrailsService used for each window
+
+    Returns:
+        IncrementalGuardrailsEvaluator
+    """
+    return IncrementalGuardrailsEvaluator(
+        guardrails_service,
+        window_chars=settings.GUARDRAILS_WINDOW_CHARS,
+        overlap_chars=settings.GUARDRAILS_OVERLAP_CHARS,
+        max_concurrency=settings.GUARDRAILS_MAX_CONCURRENCY,
+    )
@@ -0,0 +1,218 @@
+"""
+Job Service
+
+Records of asynchronous query jobs. POST /query in async mode creates a
+RUNNING record and starts the workflow without waiting; the workflow writes
+the outcome (Step Functions: the RecordJob* states in
+terraform/step_functions.tf, inline mode: complete) and GET /query/{job_id}
+reads it.
+
+Items live in the answer cache table under "job#<job_id>", next to the
+namespaced result cache items:
+
+    status        RUNNING | SUCCEEDED | FAILED
+    query         Sanitized query
+    request_id    ID of the submitting request
+    created_at    Submission time (epoch milliseconds)
+    ttl           Expiry (JOB_TTL_SECONDS after submission)
+    result        JSON {"answer", "sources"} (SUCCEEDED)
+    error         Execution error name, e.g. "GuardrailsBlocked" (FAILED)
+    completed_at  Completion time (ISO 8601, as Step Functions' EnteredTime)
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from botocore.exceptions import ClientError
+
+from src.config.settings import settings
+from src.services.cache_codec import from_dynamodb
+from src.services.clients import get_resource
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+JOB_KEY_PREFIX = "job#"
+TERMINAL_STATUSES = ("SUCCEEDED", "FAILED")
+# First long-poll interval; doubled up to JOB_POLL_MAX_INTERVAL
+JOB_POLL_INITIAL_INTERVAL = 0.2
+
+
+class JobService:
+    """Service for asynchronous query job records"""
+
+    def __init__(self, table_name: str, dynamodb: Optional[Any] = None):
+        """
+        Initialize JobService
+
+        Args:
+            table_name: DynamoDB table name
+            dynamodb: DynamoDB service resource (default: shared registry resource)
+        """
+        self.table_name = table_name
+        self.table = (dynamodb or get_resource("dynamodb")).Table(table_name)
+
+    def create(self, job_id: str, query: str, request_id: str) -> Dict[str, Any]:
+        """
+        Create a RUNNING job record
+
+        Args:
+            job_id: Job ID (unique; an existing record is not overwritten)
+            query: Sanitized query
+            request_id: ID of the submitting request
+
+        Returns:
+            Dict: The job record
+
+        Raises:
+            ClientError: If the record cannot be written
+        """
+        created_at = int(time.time() * 1000)
+        item = {
+            "query_hash": _item_key(job_id),
+            "status": "RUNNING",
+            "query": query,
+            "request_id": request_id,
+            "created_at": created_at,
+            "ttl": created_at // 1000 + settings.JOB_TTL_SECONDS,
+        }
+        self.table.put_item(
+            Item=item, ConditionExpression="attribute_not_exists(query_hash)"
+        )
+        logger.info("Created job", extra={"job_id": job_id, "request_id": request_id})
+        return _from_item(job_id, item)
+
+    def complete(self, job_id: str, execution_result: Dict[str, Any]) -> bool:
+        """
+        Record a finished workflow run (failures are logged, not raised)
+
+        Args:
+            job_id: Job ID
+            execution_result: Result of run_workflow (status, output, error)
+
+        Returns:
+            bool: True if the record was updated
+        """
+        now = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        completed_at = now.replace("+00:00", "Z")
+        names = {"#status": "status"}
+        values: Dict[str, Any] = {":completed_at": completed_at}
+
+        if execution_result["status"] == "SUCCEEDED":
+            output = execution_result["output"]
+            update = (
+                "SET #status = :status, #result = :result, completed_at = :completed_at"
+            )
+            names["#result"] = "result"
+            values[":status"] = "SUCCEEDED"
+            # Scores may be Decimals (e.g. an answer read back from the cache)
+            values[":result"] = json.dumps(
+                from_dynamodb(
+                    {
+                        "answer": output.get("answer", ""),
+                        "sources": output.get("sources", []),
+                    }
+                )
+            )
+        else:
+            update = (
+                "SET #status = :status, #error = :error, completed_at = :completed_at"
+            )
+            names["#error"] = "error"
+            values[":status"] = "FAILED"
+            values[":error"] = execution_result.get("error") or "WorkflowExecutionError"
+
+        try:
+            self.table.update_item(
+                Key={"query_hash": _item_key(job_id)},
+                UpdateExpression=update,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+            )
+        except ClientError as e:
+            logger.error(f"Failed to record job result: {e}", extra={"job_id": job_id})
+            return False
+
+        logger.info(
+            "Completed job",
+            extra={"job_id": job_id, "status": values[":status"]},
+        )
+        return True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job record
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Optional[Dict]: Job with job_id, status, query, created_at and, once
+            finished, answer/sources or error and completed_at; None if unknown
+            or expired
+
+        Raises:
+            ClientError: If the record cannot be read
+        """
+        response = self.table.get_item(
+            Key={"query_hash": _item_key(job_id)}, ConsistentRead=True
+        )
+        item = response.get("Item")
+        if item is None or int(item.get("ttl", 0)) <= int(time.time()):
+            return None
+        return _from_item(job_id, item)
+
+    def wait(self, job_id: str, max_wait_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll a job until it finishes or max_wait_seconds pass
+
+        Reads back off exponentially (JOB_POLL_INITIAL_INTERVAL doubling up
+        to JOB_POLL_MAX_INTERVAL), so a long wait costs a handful of reads.
+
+        Args:
+            job_id: Job ID
+            max_wait_seconds: Maximum time to wait (0: read once)
+
+        Returns:
+            Optional[Dict]: Job as returned by get (still RUNNING on timeout)
+
+        Raises:
+            ClientError: If the record cannot be read
+        """
+        deadline = time.monotonic() + max_wait_seconds
+        interval = JOB_POLL_INITIAL_INTERVAL
+
+        job = self.get(job_id)
+        while job is not None and job["status"] not in TERMINAL_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, settings.JOB_POLL_MAX_INTERVAL)
+            job = self.get(job_id)
+        return job
+
+
+def _item_key(job_id: str) -> str:
+    """DynamoDB partition key for a job ID"""
+    return f"{JOB_KEY_PREFIX}{job_id}"
+
+
+def _from_item(job_id: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a job item to a job dict"""
+    job = {
+        "job_id": job_id,
+        "status": item["status"],
+        "query": item.get("query", ""),
+        "created_at": int(item.get("created_at", 0)),
+    }
+    if "result" in item:
+        job.update(json.loads(item["result"]))
+    if "error" in item:
+        job["error"] = item["error"]
+    if "completed_at" in item:
+        job["completed_at"] = item["completed_at"]
+        completed_ms = datetime.fromisoformat(item["completed_at"]).timestamp() * 1000
+        job["execution_time_ms"] = max(int(completed_ms) - job["created_at"], 0)
+    return job
@@ -2,14 +2,18 @@
 Bedrock Knowledge Base Service
 
 Handles all Knowledge Base API calls for document retrieval (RAG).
+The search itself runs in a retrieval backend (Bedrock Knowledge Bases or
+the local index, selected by KB_BACKEND).
 """
 
-from typing import List, Dict, Any
-import boto3
-from botocore.exceptions import ClientError
+import hashlib
+from typing import List, Dict, Any, Optional
 
+from src.config.settings import settings
+from src.services.result_cache import ResultCache
+from src.services.retrieval_backend import RetrievalBackend, build_retrieval_backend
 from src.utils.logger import get_logger
-from src.utils.error_handler import KnowledgeBaseError
+from src.utils.text import normalize_query
 
 logger = get_logger(__name__)
 
@@ -17,21 +21,54 @@ logger = get_logger(__name__)
 class KnowledgeBaseService:
     """Service for Bedrock Knowledge Base document retrieval"""
 
-    def __init__(self, kb_id: str):
+    def __init__(
+        self,
+        kb_id: str,
+        client: Optional[Any] = None,
+        retrieval_cache: Optional[ResultCache] = None,
+        ingestion_version: Optional[str] = None,
+        backend: Optional[RetrievalBackend] = None,
+    ):
         """
         Initialize KnowledgeBaseService
 
         Args:
             kb_id: Knowledge Base ID
+            client: bedrock-agent-runtime client (default: shared registry client)
+            retrieval_cache: Retrieval result cache (default: built from settings
+                if KB_RETRIEVAL_CACHE_ENABLED)
+            ingestion_version: KB contents version used in cache keys
+                (default: settings.KB_INGESTION_VERSION)
+            backend: Retrieval backend (default: selected by settings.KB_BACKEND;
+                client is passed to the bedrock backend)
         """
         self.kb_id = kb_id
-        self.client = boto3.client("bedrock-agent-runtime")
-        logger.info(f"KnowledgeBaseService initialized", extra={"kb_id": kb_id})
+        self.backend = backend or build_retrieval_backend(settings, kb_id, client)
+        if retrieval_cache is None and settings.KB_RETRIEVAL_CACHE_ENABLED:
+            retrieval_cache = ResultCache(
+                "retrieval",
+                ttl_seconds=settings.KB_RETRIEVAL_CACHE_TTL_SECONDS,
+                max_entries=settings.KB_RETRIEVAL_CACHE_MAX_ENTRIES,
+                table_name=settings.KB_RETRIEVAL_CACHE_TABLE_NAME or None,
+            )
+        self.retrieval_cache = retrieval_cache
+        self.ingestion_version = (
+            settings.KB_INGESTION_VERSION
+            if ingestion_version is None
+            else ingestion_version
+        )
+        logger.info(
+            f"KnowledgeBaseService initialized",
+            extra={"kb_id": kb_id, "backend": type(self.backend).__name__},
+        )
 
     def retrieve(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """
         Retrieve relevant documents from Knowledge Base
 
+        Results are cached per KB ID, ingestion version, normalized query
+        and max_results, so repeat queries skip the vector search.
+
         Args:
             query: Search query
             max_results: Maximum number of results to return (default: 5)
@@ -43,70 +80,51 @@ class KnowledgeBaseService:
                 - metadata: Document metadata (title, uri, etc.)
 
         Raises:
-            KnowledgeBaseError: If API call fails
+            KnowledgeBaseError: If retrieval fails
         """
-        try:
-            response = self.client.retrieve(
-                knowledgeBaseId=self.kb_id,
-                retrievalQuery={"text": query},
-                retrievalConfiguration={
-                    "vectorSearchConfiguration": {"numberOfResults": max_results}
-                },
-            )
-
-            results = response.get("retrievalResults", [])
-
-            logger.info(
-                f"Knowledge Base query completed",
-                extra={
-                    "kb_id": self.kb_id,
-                    "query": query[:100],
-                    "results_count": len(results),
-                },
-            )
-
-            # Format results
-            formatted_results = []
-            for result in results:
-                formatted_result = {
-                    "text": result.get("content", {}).get("text", ""),
-                    "score": result.get("score", 0.0),
-                    "metadata": result.get("metadata", {}),
-                }
-                formatted_results.append(formatted_result)
-
-            return formatted_results
-
-        except ClientError as e:
-            error_code = e.response.get("Error", {}).get("Code", "Unknown")
-            error_message = e.response.get("Error", {}).get("Message", str(e))
-            logger.error(
-                f"Knowledge Base API error: {error_code} - {error_message}",
-                extra={"kb_id": self.kb_id, "query": query[:100]},
-            )
-            raise KnowledgeBaseError(f"Knowledge Base query failed: {error_message}")
-
-    def _format_context(self, results: List[Dict[str, Any]]) -> str:
+        cache_key = self._retrieval_key(query, max_results)
+        if self.retrieval_cache is not None:
+            cached = self.retrieval_cache.get(cache_key)
+            if cached is not None:
+                logger.info(
+                    "Knowledge Base retrieval cache hit",
+                    extra={
+                        "kb_id": self.kb_id,
+                        "query": query[:100],
+                        "results_count": len(cached["results"]),
+                    },
+                )
+                return cached["results"]
+
+        results = self.backend.retrieve(query, max_results)
+
+        logger.info(
+            "Knowledge Base query completed",
+            extra={
+                "kb_id": self.kb_id,
+                "query": query[:100],
+                "results_count": len(results),
+            },
+        )
+
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.put(cache_key, {"results": results})
+
+        return results
+
+    def _retrieval_key(self, query: str, max_results: int) -> str:
         """
-        Format retrieved results into context string
+        Build the retrieval cache key
 
         Args:
-            results: List of retrieval results
+            query: Search query
+            max_results: numberOfResults of the search
 
         Returns:
-            str: Concatenated context string
+            str: SHA-256 hex of KB ID, ingestion version, max_results and
+            normalized query
         """
-        if not results:
-            return ""
-
-        context_parts = []
-        for i, result in enumerate(results, 1):
-            text = result.get("text", "").strip()
-            if text:
-                # Add source information if available
-                metadata = result.get("metadata", {})
-                source_info = metadata.get("x-amz-bedrock-kb-source-uri", "Unknown source")
-
-                context_parts.append(f"[Source {i}: {source_info}]\n{text}")
-
-        return "\n\n".join(context_parts)
+        return hashlib.sha256(
+            f"{self.kb_id}:{self.ingestion_version}:{max_results}:"
+            f"{normalize_query(query)}".encode("utf-8")
+        ).hexdigest()
@@ -0,0 +1,377 @@
+"""
+Local Retrieval Backend
+
+In-process alternative to Bedrock Knowledge Bases for local runs,
+benchmarks and small corpora. A persistent index is built from a directory
+of text documents:
+
+    <index>.meta.json        embedder, dimension, chunk texts and source URIs
+    <index>.embeddings.npy   float32 (chunks, dimension), memory-mapped at query time
+    <index>.bm25.npz         BM25 inverted index (CSR postings, idf, chunk lengths)
+
+Queries are scored by a hybrid of BM25 and embedding cosine similarity.
+
+Build an index:
+    python -m src.services.local_retrieval build sample-docs --index local-kb/index
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.services.retrieval_backend import RetrievalBackend
+from src.services.semantic_cache import BedrockEmbedder, Embedder, HashingEmbedder
+from src.utils.logger import get_logger
+from src.utils.error_handler import KnowledgeBaseError
+from src.utils.text import lexical_terms
+
+logger = get_logger(__name__)
+
+SOURCE_URI_KEY = "x-amz-bedrock-kb-source-uri"
+DOCUMENT_EXTENSIONS = (".txt", ".md")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def chunk_text(
+    text: str, chunk_chars: int = 1000, overlap_chars: int = 200
+) -> List[str]:
+    """
+    Split a document into chunks of up to chunk_chars
+
+    Paragraphs are packed together while they fit; paragraphs longer than
+    chunk_chars are split with overlap_chars of overlap.
+
+    Args:
+        text: Document text
+        chunk_chars: Maximum chunk size in characters
+        overlap_chars: Overlap between pieces of a split paragraph
+
+    Returns:
+        List[str]: Chunks
+
+    Raises:
+        ValueError: If chunk_chars is not positive or overlap_chars is not in
+            [0, chunk_chars)
+    """
+    _validate_chunk_sizes(chunk_chars, overlap_chars)
+
+    chunks: List[str] = []
+    current = ""
+
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+
+        if len(paragraph) > chunk_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            step = chunk_chars - overlap_chars
+            chunks.extend(
+                paragraph[i : i + chunk_chars]
+                for i in range(0, len(paragraph) - overlap_chars, step)
+            )
+            continue
+
+        if current and len(current) + 2 + len(paragraph) > chunk_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _validate_chunk_sizes(chunk_chars: int, overlap_chars: int) -> None:
+    """Reject sizes for which splitting a long paragraph would never advance"""
+    if chunk_chars <= 0:
+        raise ValueError(f"chunk_chars must be positive, got {chunk_chars}")
+    if not 0 <= overlap_chars < chunk_chars:
+        raise ValueError(
+            f"overlap_chars must be at least 0 and less than chunk_chars "
+            f"({chunk_chars}), got {overlap_chars}"
+        )
+
+
+def build_embedder(
+    kind: str, dimension: int, model_id: Optional[str] = None
+) -> Embedder:
+    """
+    Build the embedder recorded in an index
+
+    Args:
+        kind: "hashing" or "bedrock"
+        dimension: Vector size
+        model_id: Bedrock embedding model ID (bedrock only)
+
+    Returns:
+        Embedder
+    """
+    if kind == "hashing":
+        return HashingEmbedder(dimension)
+    if kind == "bedrock":
+        return BedrockEmbedder(model_id, dimension)
+    raise ValueError(f"Invalid embedder: {kind}. Must be 'hashing' or 'bedrock'")
+
+
+def build_local_index(
+    source_dir: str,
+    index_path: str,
+    embedder_kind: str = "hashing",
+    dimension: int = 256,
+    model_id: Optional[str] = None,
+    chunk_chars: int = 1000,
+    overlap_chars: int = 200,
+    source_uri_prefix: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Chunk, embed and index every document under source_dir
+
+    Args:
+        source_dir: Directory of .txt / .md documents
+        index_path: File path prefix for the index files
+        embedder_kind: "hashing" or "bedrock"
+        dimension: Embedding size
+        model_id: Bedrock embedding model ID (bedrock only)
+        chunk_chars: Maximum chunk size in characters
+        overlap_chars: Overlap between pieces of a split paragraph
+        source_uri_prefix: Prefix of source URIs (default: file:// + source_dir)
+
+    Returns:
+        Dict with documents, chunks and terms counts
+
+    Raises:
+        ValueError: If the embedder or the chunk sizes are invalid
+    """
+    _validate_chunk_sizes(chunk_chars, overlap_chars)
+    embedder = build_embedder(embedder_kind, dimension, model_id)
+    prefix = source_uri_prefix or f"file://{os.path.abspath(source_dir)}/"
+
+    texts: List[str] = []
+    sources: List[str] = []
+    documents = 0
+    for root, _, files in os.walk(source_dir):
+        for name in sorted(files):
+            if not name.endswith(DOCUMENT_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, encoding="utf-8") as f:
+                document_chunks = chunk_text(f.read(), chunk_chars, overlap_chars)
+            relative = os.path.relpath(path, source_dir).replace(os.sep, "/")
+            texts.extend(document_chunks)
+            sources.extend(f"{prefix}{relative}" for _ in document_chunks)
+            documents += 1
+
+    directory = os.path.dirname(index_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    embeddings = np.lib.format.open_memmap(
+        f"{index_path}.embeddings.npy",
+        mode="w+",
+        dtype=np.float32,
+        shape=(len(texts), embedder.dimension),
+    )
+    for i, text in enumerate(texts):
+        embeddings[i] = embedder.embed(text)
+    embeddings.flush()
+
+    vocabulary = _write_bm25(f"{index_path}.bm25.npz", texts)
+
+    with open(f"{index_path}.meta.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "embedder": embedder_kind,
+                "dimension": embedder.dimension,
+                "model_id": model_id,
+                "vocabulary": vocabulary,
+                "texts": texts,
+                "sources": sources,
+            },
+            f,
+            ensure_ascii=False,
+        )
+
+    stats = {"documents": documents, "chunks": len(texts), "terms": len(vocabulary)}
+    logger.info(
+        "Local retrieval index built", extra={"index_path": index_path, **stats}
+    )
+    return stats
+
+
+def _write_bm25(path: str, texts: List[str]) -> List[str]:
+    """
+    Write the BM25 inverted index for texts
+
+    Args:
+        path: .npz output path
+        texts: Chunk texts
+
+    Returns:
+        List[str]: Vocabulary (term of each postings list)
+    """
+    counts = [Counter(lexical_terms(t)) for t in texts]
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    for chunk_id, chunk_counts in enumerate(counts):
+        for term, tf in chunk_counts.items():
+            postings.setdefault(term, []).append((chunk_id, tf))
+
+    vocabulary = sorted(postings)
+    offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    for i, term in enumerate(vocabulary):
+        offsets[i + 1] = offsets[i] + len(postings[term])
+
+    docs = np.fromiter(
+        (d for term in vocabulary for d, _ in postings[term]),
+        dtype=np.int32,
+        count=int(offsets[-1]),
+    )
+    tfs = np.fromiter(
+        (tf for term in vocabulary for _, tf in postings[term]),
+        dtype=np.float32,
+        count=int(offsets[-1]),
+    )
+    df = np.diff(offsets).astype(np.float32)
+    idf = np.log(1.0 + (len(texts) - df + 0.5) / (df + 0.5)).astype(np.float32)
+    lengths = np.array([sum(c.values()) for c in counts], dtype=np.float32)
+
+    np.savez(path, offsets=offsets, docs=docs, tfs=tfs, idf=idf, lengths=lengths)
+    return vocabulary
+
+
+class LocalRetrievalBackend(RetrievalBackend):
+    """Hybrid BM25 + embedding search over a local index"""
+
+    def __init__(self, index_path: str, lexical_weight: float = 0.5):
+        """
+        Initialize LocalRetrievalBackend, loading the index
+
+        Args:
+            index_path: File path prefix of an index built by build_local_index
+            lexical_weight: Weight of normalized BM25 against cosine similarity
+        """
+        self.index_path = index_path
+        self.lexical_weight = lexical_weight
+
+        try:
+            with open(f"{index_path}.meta.json", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.embeddings = np.load(f"{index_path}.embeddings.npy", mmap_mode="r")
+            bm25 = np.load(f"{index_path}.bm25.npz")
+        except OSError as e:
+            raise KnowledgeBaseError(f"Local retrieval index not found: {e}")
+
+        self.texts: List[str] = meta["texts"]
+        self.sources: List[str] = meta["sources"]
+        self.terms = {term: i for i, term in enumerate(meta["vocabulary"])}
+        self.embedder = build_embedder(
+            meta["embedder"], meta["dimension"], meta.get("model_id")
+        )
+
+        self.offsets = bm25["offsets"]
+        self.docs = bm25["docs"]
+        self.tfs = bm25["tfs"]
+        self.idf = bm25["idf"]
+        lengths = bm25["lengths"]
+        # Per-chunk BM25 length normalization, precomputed once
+        avg_length = max(float(lengths.mean()), 1.0) if len(lengths) else 1.0
+        self.norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths / avg_length)
+
+        logger.info(
+            "LocalRetrievalBackend initialized",
+            extra={"index_path": index_path, "chunks": len(self.texts)},
+        )
+
+    def retrieve(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        if not self.texts:
+            return []
+
+        lexical = self._bm25(query)
+        if lexical.max() > 0:
+            lexical /= lexical.max()
+        semantic = np.clip(self.embeddings @ self.embedder.embed(query), 0.0, 1.0)
+        scores = self.lexical_weight * lexical + (1.0 - self.lexical_weight) * semantic
+
+        k = min(max_results, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [
+            {
+                "text": self.texts[i],
+                "score": float(scores[i]),
+                "metadata": {SOURCE_URI_KEY: self.sources[i]},
+            }
+            for i in top
+        ]
+
+    def _bm25(self, query: str) -> np.ndarray:
+        """BM25 score of every chunk for query"""
+        scores = np.zeros(len(self.texts), dtype=np.float32)
+        for term in set(lexical_terms(query)):
+            term_id = self.terms.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.docs[start:end]
+            tfs = self.tfs[start:end]
+            scores[docs] += (
+                self.idf[term_id] * tfs * (BM25_K1 + 1.0) / (tfs + self.norm[docs])
+            )
+        return scores
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Local retrieval index tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Build an index from a directory")
+    build.add_argument("source_dir", help="Directory of .txt / .md documents")
+    build.add_argument("--index", default="local-kb/index", help="Index path prefix")
+    build.add_argument("--embedder", default="hashing", choices=["hashing", "bedrock"])
+    build.add_argument("--dimension", type=int, default=256)
+    build.add_argument("--model-id", default="amazon.titan-embed-text-v2:0")
+    build.add_argument("--chunk-chars", type=int, default=1000)
+    build.add_argument("--overlap-chars", type=int, default=200)
+    build.add_argument("--source-uri-prefix", default=None)
+
+    query = subparsers.add_parser("query", help="Query an index")
+    query.add_argument("text", help="Query text")
+    query.add_argument("--index", default="local-kb/index", help="Index path prefix")
+    query.add_argument("--max-results", type=int, default=5)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        try:
+            stats = build_local_index(
+                args.source_dir,
+                args.index,
+                embedder_kind=args.embedder,
+                dimension=args.dimension,
+                model_id=args.model_id,
+                chunk_chars=args.chunk_chars,
+                overlap_chars=args.overlap_chars,
+                source_uri_prefix=args.source_uri_prefix,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        print(json.dumps(stats))
+    else:
+        backend = LocalRetrievalBackend(args.index)
+        results = backend.retrieve(args.text, args.max_results)
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
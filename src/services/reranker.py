@@ -0,0 +1,172 @@
+"""
+Reranker Service
+
+Rescores over-fetched Knowledge Base results in-process and keeps the best
+k: a vectorized BM25 scorer (NumPy) fused with the vector search score, or
+a pluggable cross-encoder.
+"""
+
+import importlib
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.utils.logger import get_logger
+from src.utils.text import lexical_terms
+
+logger = get_logger(__name__)
+
+
+class CrossEncoder:
+    """Base class for cross-encoders scoring (query, passage) pairs"""
+
+    def score(self, query: str, texts: List[str]) -> List[float]:
+        """
+        Score passages against a query
+
+        Args:
+            query: Query
+            texts: Candidate passages
+
+        Returns:
+            List[float]: One relevance score per passage (higher is better)
+        """
+        raise NotImplementedError
+
+
+def load_cross_encoder(spec: str) -> CrossEncoder:
+    """
+    Load a cross-encoder from a "module:factory" spec
+
+    Args:
+        spec: Import path of a zero-argument callable returning a CrossEncoder
+
+    Returns:
+        CrossEncoder
+
+    Raises:
+        ValueError: If spec is not in "module:factory" form
+    """
+    module_name, _, attr = spec.partition(":")
+    if not module_name or not attr:
+        raise ValueError(
+            f"Invalid RERANK_CROSS_ENCODER: {spec}. Must be 'module:factory'"
+        )
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+def bm25_scores(
+    query: str, texts: List[str], k1: float = 1.2, b: float = 0.75
+) -> np.ndarray:
+    """
+    BM25 scores of texts for query, with statistics taken from texts
+
+    Args:
+        query: Query
+        texts: Candidate passages
+        k1: Term frequency saturation
+        b: Length normalization
+
+    Returns:
+        np.ndarray: Scores of shape (len(texts),)
+    """
+    query_terms = list(dict.fromkeys(lexical_terms(query)))
+    if not texts or not query_terms:
+        return np.zeros(len(texts), dtype=np.float64)
+
+    doc_terms = [Counter(lexical_terms(t)) for t in texts]
+    tf = np.array(
+        [[counts.get(term, 0) for term in query_terms] for counts in doc_terms],
+        dtype=np.float64,
+    )
+    doc_len = np.array([sum(c.values()) for c in doc_terms], dtype=np.float64)
+    avg_len = max(doc_len.mean(), 1.0)
+
+    df = (tf > 0).sum(axis=0)
+    idf = np.log(1.0 + (len(texts) - df + 0.5) / (df + 0.5))
+
+    norm = k1 * (1.0 - b + b * doc_len / avg_len)
+    return ((tf * (k1 + 1.0)) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    """Scale values to [0, 1] (all zeros if constant)"""
+    spread = values.max() - values.min()
+    if spread <= 0:
+        return np.zeros_like(values)
+    return (values - values.min()) / spread
+
+
+class Reranker:
+    """Rescores retrieval results and keeps the top k"""
+
+    def __init__(
+        self,
+        lexical_weight: float = 0.5,
+        cross_encoder: Optional[CrossEncoder] = None,
+    ):
+        """
+        Initialize Reranker
+
+        Args:
+            lexical_weight: Weight of normalized BM25 against the normalized
+                vector score (ignored when a cross-encoder is set)
+            cross_encoder: Optional cross-encoder replacing the fused score
+        """
+        self.lexical_weight = lexical_weight
+        self.cross_encoder = cross_encoder
+
+    def rerank(
+        self, query: str, results: List[Dict[str, Any]], top_k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Rescore results and keep the best top_k
+
+        Args:
+            query: Search query
+            results: KB results with 'text', 'score' and 'metadata'
+            top_k: Number of results to keep
+
+        Returns:
+            List of the top_k results, best first, each with an added
+            'rerank_score' ('score' keeps the retrieval score)
+        """
+        if not results:
+            return []
+
+        texts = [r.get("text", "") for r in results]
+        if self.cross_encoder is not None:
+            scores = np.asarray(
+                self.cross_encoder.score(query, texts), dtype=np.float64
+            )
+        else:
+            lexical = _min_max(bm25_scores(query, texts))
+            vector = _min_max(
+                np.array([r.get("score", 0.0) for r in results], dtype=np.float64)
+            )
+            scores = (
+                self.lexical_weight * lexical + (1.0 - self.lexical_weight) * vector
+            )
+
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [{**results[i], "rerank_score": float(scores[i])} for i in order]
+
+
+def build_reranker(settings: Any) -> Reranker:
+    """
+    Build a Reranker from settings
+
+    Args:
+        settings: Settings with RERANK_LEXICAL_WEIGHT and RERANK_CROSS_ENCODER
+
+    Returns:
+        Reranker
+    """
+    cross_encoder = None
+    if settings.RERANK_CROSS_ENCODER:
+        cross_encoder = load_cross_encoder(settings.RERANK_CROSS_ENCODER)
+        logger.info(
+            "Cross-encoder loaded", extra={"spec": settings.RERANK_CROSS_ENCODER}
+        )
+    return Reranker(settings.RERANK_LEXICAL_WEIGHT, cross_encoder)
@@ -0,0 +1,129 @@
+"""
+Result Cache Service
+
+Two-tier memoization for results of paid, deterministic API calls
+(Guardrails verdicts, Knowledge Base retrievals): an in-memory LRU tier
+per container and an optional DynamoDB tier shared across containers.
+
+DynamoDB items live in the answer cache table under a namespaced key
+("<namespace>#<key>") with the JSON result in 'payload' and a 'ttl'
+attribute, so they never collide with answer items (plain SHA-256 keys).
+"""
+
+import json
+import time
+from typing import Any, Dict, Optional
+from botocore.exceptions import ClientError
+
+from src.config.settings import settings
+from src.services.clients import get_resource
+from src.utils.logger import get_logger
+from src.utils.lru_cache import LRUCache
+
+logger = get_logger(__name__)
+
+
+class ResultCache:
+    """Namespaced result cache with an L1 LRU tier and an optional DynamoDB tier"""
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: int = 86400,
+        max_entries: int = 1024,
+        table_name: Optional[str] = None,
+        dynamodb: Optional[Any] = None,
+    ):
+        """
+        Initialize ResultCache
+
+        Args:
+            namespace: Key prefix separating this cache from other users of the table
+            ttl_seconds: Time-to-live of cached results
+            max_entries: Maximum entries in the in-memory tier
+            table_name: DynamoDB table for the shared tier (None: in-memory only)
+            dynamodb: DynamoDB service resource (default: shared registry resource)
+        """
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.l1 = LRUCache(
+            max_entries=max_entries, max_bytes=settings.L1_CACHE_MAX_BYTES
+        )
+        self.table = None
+        if table_name:
+            self.table = (dynamodb or get_resource("dynamodb")).Table(table_name)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached result
+
+        Args:
+            key: Cache key (unique within the namespace)
+
+        Returns:
+            Optional[Dict]: Cached result if present and not expired, None otherwise
+        """
+        value = self.l1.get(key)
+        if value is not None:
+            return dict(value)
+
+        if self.table is None:
+            return None
+
+        try:
+            response = self.table.get_item(Key={"query_hash": self._item_key(key)})
+        except ClientError as e:
+            logger.error(
+                f"DynamoDB get_item failed: {e}",
+                extra={"namespace": self.namespace},
+            )
+            return None
+
+        item = response.get("Item")
+        if item is None or int(item.get("ttl", 0)) <= int(time.time()):
+            return None
+
+        value = json.loads(item["payload"])
+        self.l1.put(key, value, expires_at=float(item["ttl"]))
+        return dict(value)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Cache a result (DynamoDB failures are logged, not raised)
+
+        Args:
+            key: Cache key (unique within the namespace)
+            value: JSON-serializable result
+        """
+        ttl = int(time.time()) + self.ttl_seconds
+        self.l1.put(key, dict(value), expires_at=float(ttl))
+
+        if self.table is None:
+            return
+
+        try:
+            self.table.put_item(
+                Item={
+                    "query_hash": self._item_key(key),
+                    "payload": json.dumps(value),
+                    "ttl": ttl,
+                }
+            )
+        except ClientError as e:
+            logger.error(
+                f"DynamoDB put_item failed: {e}",
+                extra={"namespace": self.namespace},
+            )
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get in-memory tier counters
+
+        Returns:
+            Dict with entries, bytes, hits, misses, evictions, expirations
+        """
+        return self.l1.stats()
+
+    def _item_key(self, key: str) -> str:
+        """DynamoDB partition key for a cache key"""
+        return f"{self.namespace}#{key}"
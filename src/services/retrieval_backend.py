@@ -0,0 +1,107 @@
+"""
+Retrieval Backends
+
+Interface between KnowledgeBaseService and the system that runs the search.
+Every backend returns results in the Bedrock Knowledge Bases shape:
+{"text", "score", "metadata": {"x-amz-bedrock-kb-source-uri", ...}}.
+"""
+
+from typing import Any, Dict, List, Optional
+from botocore.exceptions import ClientError
+
+from src.services.clients import get_client
+from src.utils.logger import get_logger
+from src.utils.error_handler import KnowledgeBaseError
+
+logger = get_logger(__name__)
+
+
+class RetrievalBackend:
+    """Base class for retrieval backends"""
+
+    def retrieve(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        """
+        Retrieve the most relevant chunks for a query
+
+        Args:
+            query: Search query
+            max_results: Maximum number of results
+
+        Returns:
+            List of dicts with text, score and metadata, best first
+
+        Raises:
+            KnowledgeBaseError: If retrieval fails
+        """
+        raise NotImplementedError
+
+
+class BedrockKnowledgeBaseBackend(RetrievalBackend):
+    """Bedrock Knowledge Bases (bedrock-agent-runtime Retrieve API)"""
+
+    def __init__(self, kb_id: str, client: Optional[Any] = None):
+        """
+        Initialize BedrockKnowledgeBaseBackend
+
+        Args:
+            kb_id: Knowledge Base ID
+            client: bedrock-agent-runtime client (default: shared registry client)
+        """
+        self.kb_id = kb_id
+        self.client = client or get_client("bedrock-agent-runtime")
+
+    def retrieve(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        try:
+            response = self.client.retrieve(
+                knowledgeBaseId=self.kb_id,
+                retrievalQuery={"text": query},
+                retrievalConfiguration={
+                    "vectorSearchConfiguration": {"numberOfResults": max_results}
+                },
+            )
+
+        except ClientError as e:
+            error_code = e.response.get("Error", {}).get("Code", "Unknown")
+            error_message = e.response.get("Error", {}).get("Message", str(e))
+            logger.error(
+                f"Knowledge Base API error: {error_code} - {error_message}",
+                extra={"kb_id": self.kb_id, "query": query[:100]},
+            )
+            raise KnowledgeBaseError(f"Knowledge Base query failed: {error_message}")
+
+        return [
+            {
+                "text": result.get("content", {}).get("text", ""),
+                "score": result.get("score", 0.0),
+                "metadata": result.get("metadata", {}),
+            }
+            for result in response.get("retrievalResults", [])
+        ]
+
+
+def build_retrieval_backend(
+    settings: Any, kb_id: str, client: Optional[Any] = None
+) -> RetrievalBackend:
+    """
+    Build the retrieval backend selected by KB_BACKEND
+
+    Args:
+        settings: Settings with KB_BACKEND and LOCAL_KB_* values
+        kb_id: Knowledge Base ID (bedrock backend)
+        client: bedrock-agent-runtime client (bedrock backend)
+
+    Returns:
+        RetrievalBackend
+    """
+    if settings.KB_BACKEND == "bedrock":
+        return BedrockKnowledgeBaseBackend(kb_id, client)
+    if settings.KB_BACKEND == "local":
+        from src.services.local_retrieval import LocalRetrievalBackend
+
+        return LocalRetrievalBackend(
+            settings.LOCAL_KB_INDEX_PATH,
+            lexical_weight=settings.LOCAL_KB_LEXICAL_WEIGHT,
+        )
+    raise ValueError(
+        f"Invalid KB_BACKEND: {settings.KB_BACKEND}. Must be 'bedrock' or 'local'"
+    )
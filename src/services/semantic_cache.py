@@ -0,0 +1,313 @@
+"""
+Semantic Cache Service
+
+Near-duplicate query matching for the answer cache. Queries are embedded
+and stored in a memory-mapped NumPy index that maps each vector to the
+exact-match cache key of its answer.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logger import get_logger
+from src.utils.text import normalize_query, tokenize
+
+logger = get_logger(__name__)
+
+KEY_LENGTH = 64  # SHA-256 hex digest
+
+
+class Embedder:
+    """Base class for query embedders"""
+
+    dimension: int
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed text into a unit-length float32 vector
+
+        Args:
+            text: Input text
+
+        Returns:
+            np.ndarray: Vector of shape (dimension,)
+        """
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic local embedder using feature hashing
+
+    Hashes normalized word unigrams, bigrams and character trigrams into a
+    fixed-size signed vector. Needs no model or network access, so it is
+    suitable for tests and as a low-cost default.
+    """
+
+    def __init__(self, dimension: int = 256):
+        """
+        Initialize HashingEmbedder
+
+        Args:
+            dimension: Output vector size
+        """
+        self.dimension = dimension
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature, weight in self._features(normalize_query(text)):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimension
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign * weight
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        """Build weighted hashing features from normalized text"""
+        words = tokenize(text)
+        features = [(f"w:{w}", 1.0) for w in words]
+        features += [(f"b:{a} {b}", 0.5) for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"#{word}#"
+            features += [(f"c:{padded[i:i + 3]}", 0.25) for i in range(len(padded) - 2)]
+        return features
+
+
+class BedrockEmbedder(Embedder):
+    """Embedder backed by a Bedrock text embedding model (Titan Text Embeddings V2)"""
+
+    def __init__(
+        self,
+        model_id: str = "amazon.titan-embed-text-v2:0",
+        dimension: int = 256,
+        client: Optional[Any] = None,
+    ):
+        """
+        Initialize BedrockEmbedder
+
+        Args:
+            model_id: Bedrock embedding model ID
+            dimension: Output vector size (256, 512 or 1024 for Titan V2)
+            client: bedrock-runtime client (default: shared registry client)
+        """
+        from src.services.clients import get_client
+
+        self.model_id = model_id
+        self.dimension = dimension
+        self.client = client or get_client("bedrock-runtime")
+
+    def embed(self, text: str) -> np.ndarray:
+        response = self.client.invoke_model(
+            modelId=self.model_id,
+            body=json.dumps(
+                {"inputText": text, "dimensions": self.dimension, "normalize": True}
+            ),
+            contentType="application/json",
+            accept="application/json",
+        )
+        body = json.loads(response["body"].read())
+        return np.asarray(body["embedding"], dtype=np.float32)
+
+
+class VectorIndex:
+    """
+    Memory-mapped ring buffer of (vector, cache key) pairs
+
+    Files (created next to path):
+        <path>.vectors.npy: float32 array (capacity, dimension)
+        <path>.keys.npy: S64 array (capacity,)
+        <path>.meta.npy: int64 array [count, next_position]
+
+    When full, the oldest entries are overwritten.
+    """
+
+    def __init__(self, path: str, dimension: int, capacity: int = 10000):
+        """
+        Initialize VectorIndex, opening existing files if compatible
+
+        Args:
+            path: File path prefix for the index files
+            dimension: Vector size
+            capacity: Maximum number of entries
+        """
+        self.path = path
+        self.dimension = dimension
+        self.capacity = capacity
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.vectors, vectors_created = self._open(
+            f"{path}.vectors.npy", np.float32, (capacity, dimension)
+        )
+        self.keys, keys_created = self._open(
+            f"{path}.keys.npy", f"S{KEY_LENGTH}", (capacity,)
+        )
+        self.meta, _ = self._open(f"{path}.meta.npy", np.int64, (2,))
+        if vectors_created or keys_created:
+            self.meta[:] = 0
+        self._key_set = {key.decode("ascii") for key in self.keys[: self.count]}
+
+    @property
+    def count(self) -> int:
+        return int(self.meta[0])
+
+    def contains(self, key: str) -> bool:
+        """
+        Check whether a cache key is indexed
+
+        Args:
+            key: Cache key (SHA-256 hex)
+
+        Returns:
+            bool: True if an entry with the key exists
+        """
+        return key in self._key_set
+
+    def add(self, vector: np.ndarray, key: str) -> None:
+        """
+        Append a vector and its cache key
+
+        Args:
+            vector: Unit-length vector of shape (dimension,)
+            key: Cache key (SHA-256 hex)
+        """
+        with self._lock:
+            position = int(self.meta[1])
+            if position < self.count:
+                # Overwriting the oldest entry
+                self._key_set.discard(self.keys[position].decode("ascii"))
+            self.vectors[position] = vector
+            self.keys[position] = key.encode("ascii")
+            self.meta[1] = (position + 1) % self.capacity
+            self.meta[0] = min(self.count + 1, self.capacity)
+            self._key_set.add(key)
+
+    def search(self, vector: np.ndarray) -> Optional[Tuple[str, float]]:
+        """
+        Find the nearest neighbour by cosine similarity
+
+        Args:
+            vector: Unit-length query vector
+
+        Returns:
+            Optional[Tuple[str, float]]: (cache key, similarity) or None if empty
+        """
+        count = self.count
+        if count == 0:
+            return None
+
+        scores = self.vectors[:count] @ vector
+        best = int(np.argmax(scores))
+        return self.keys[best].decode("ascii"), float(scores[best])
+
+    def flush(self) -> None:
+        """Flush memory-mapped files to disk"""
+        self.vectors.flush()
+        self.keys.flush()
+        self.meta.flush()
+
+    def _open(
+        self, filename: str, dtype: Any, shape: Tuple[int, ...]
+    ) -> Tuple[np.memmap, bool]:
+        """Open an existing memmap with matching layout or create a zeroed one"""
+        if os.path.exists(filename):
+            try:
+                array = np.load(filename, mmap_mode="r+")
+                if array.shape == shape and array.dtype == np.dtype(dtype):
+                    return array, False
+            except ValueError:
+                pass
+            logger.warning(
+                "Semantic cache index layout changed, recreating",
+                extra={"file": filename},
+            )
+
+        array = np.lib.format.open_memmap(filename, mode="w+", dtype=dtype, shape=shape)
+        return array, True
+
+
+class SemanticCache:
+    """Maps queries to the cache key of a semantically equivalent cached query"""
+
+    def __init__(self, embedder: Embedder, index: VectorIndex, threshold: float = 0.9):
+        """
+        Initialize SemanticCache
+
+        Args:
+            embedder: Query embedder
+            index: Vector index storing (embedding, cache key)
+            threshold: Minimum cosine similarity to treat queries as equivalent
+        """
+        self.embedder = embedder
+        self.index = index
+        self.threshold = threshold
+
+    def lookup(self, query: str) -> Optional[Tuple[str, float]]:
+        """
+        Find the cache key of the nearest cached query above the threshold
+
+        Args:
+            query: Query string
+
+        Returns:
+            Optional[Tuple[str, float]]: (cache key, similarity) or None
+        """
+        match = self.index.search(self.embedder.embed(query))
+        if match is None or match[1] < self.threshold:
+            return None
+        return match
+
+    def add(self, query: str, cache_key: str) -> None:
+        """
+        Index a cached query
+
+        Already indexed cache keys are skipped before embedding, so repeated
+        calls for the same query cost no embedding request.
+
+        Args:
+            query: Query string
+            cache_key: Exact-match cache key of the query's answer
+        """
+        if self.index.contains(cache_key):
+            return
+        self.index.add(self.embedder.embed(query), cache_key)
+
+
+def build_semantic_cache(settings: Any) -> SemanticCache:
+    """
+    Build a SemanticCache from settings
+
+    Args:
+        settings: Settings with SEMANTIC_CACHE_* and EMBEDDING_MODEL_ID
+
+    Returns:
+        SemanticCache
+    """
+    if settings.SEMANTIC_CACHE_EMBEDDER == "bedrock":
+        embedder: Embedder = BedrockEmbedder(
+            settings.EMBEDDING_MODEL_ID, settings.SEMANTIC_CACHE_DIMENSION
+        )
+    elif settings.SEMANTIC_CACHE_EMBEDDER == "hashing":
+        embedder = HashingEmbedder(settings.SEMANTIC_CACHE_DIMENSION)
+    else:
+        raise ValueError(
+            f"Invalid SEMANTIC_CACHE_EMBEDDER: {settings.SEMANTIC_CACHE_EMBEDDER}. "
+            "Must be 'hashing' or 'bedrock'"
+        )
+
+    index = VectorIndex(
+        settings.SEMANTIC_CACHE_INDEX_PATH,
+        embedder.dimension,
+        settings.SEMANTIC_CACHE_CAPACITY,
+    )
+    return SemanticCache(embedder, index, settings.SEMANTIC_CACHE_THRESHOLD)
@@ -4,6 +4,7 @@ Error handling utility
 Provides custom exception classes and error response formatting.
 """
 
+import json
 from typing import Dict, Any
 
 
@@ -74,8 +75,6 @@ def error_response(
             'body': '{"error": "validation_error", "message": "Query is empty", ...}'
         }
     """
-    import json
-
     return {
         "statusCode": status_code,
         "headers": {"Content-Type": "application/json"},
@@ -104,10 +103,26 @@ def success_response(data: Dict[str, Any], status_code: int = 200) -> Dict[str,
             'body': '{"answer": "Hello", "cached": false}'
         }
     """
-    import json
-
     return {
         "statusCode": status_code,
         "headers": {"Content-Type": "application/json"},
         "body": json.dumps(data),
     }
+
+
+def success_response_body(body: str, status_code: int = 200) -> Dict[str, Any]:
+    """
+    Create a success response from an already serialized JSON body
+
+    Args:
+        body: JSON body
+        status_code: HTTP status code (default: 200)
+
+    Returns:
+        Dict containing API Gateway Proxy response format
+    """
+    return {
+        "statusCode": status_code,
+        "headers": {"Content-Type": "application/json"},
+        "body": body,
+    }
@@ -0,0 +1,156 @@
+"""
+In-memory LRU cache utility
+
+Bounded, TTL-aware LRU cache used as a per-container L1 tier in front of
+remote caches. Entries survive across warm Lambda invocations.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the in-memory footprint of a value from its JSON encoding
+
+    Args:
+        value: Any JSON-serializable value (Decimals are stringified)
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and total bytes"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 8 * 1024 * 1024):
+        """
+        Initialize LRUCache
+
+        Args:
+            max_entries: Maximum number of entries kept
+            max_bytes: Maximum total estimated size of all entries
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float], int]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value, refreshing its recency
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[Any]: Cached value if present and not expired, None otherwise
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        expires_at: Optional[float] = None,
+        size: Optional[int] = None,
+    ) -> bool:
+        """
+        Store a value, evicting least recently used entries to fit
+
+        Args:
+            key: Cache key
+            value: Value to store
+            expires_at: Unix timestamp after which the entry is invalid (None: no expiry)
+            size: Size in bytes (default: estimated from JSON encoding)
+
+        Returns:
+            bool: False if the value is larger than max_bytes and was not stored
+        """
+        if expires_at is not None and expires_at <= time.time():
+            return False
+
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            while self._entries and (
+                len(self._entries) >= self.max_entries
+                or self._bytes + size > self.max_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+
+        return True
+
+    def delete(self, key: str) -> None:
+        """Remove a key if present"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters
+
+        Returns:
+            Dict with entries, bytes, hits, misses, evictions, expirations
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        """Remove key and release its bytes (caller holds the lock)"""
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,161 @@
+"""
+Metrics utility using AWS Lambda Powertools
+
+Hot-path KPIs in CloudWatch Embedded Metric Format (EMF): each put_metrics
+call writes one EMF record, from which CloudWatch extracts the metrics, so
+no PutMetricData calls are made. Records carry the model and Knowledge Base
+as dimensions, and keep every value (CloudWatch computes percentiles).
+
+Sinks (METRICS_SINK):
+    emf   stdout, for CloudWatch Logs (Lambda)
+    file  append EMF records as JSON lines to METRICS_FILE_PATH (local runs,
+          load tests, capacity planning)
+    none  discard (unit tests)
+
+Metric names:
+    CacheHit / CacheStaleHit / CacheExpired / CacheMiss   Count (0 or 1 per lookup)
+    StageDuration / StageRemoteTime / StageRetries        per Stage dimension
+    InputTokens / OutputTokens                            Count
+    GuardrailsChecks / GuardrailsBlocked                  per CheckType dimension
+    KBResultCount / KBTopScore / KBMeanScore
+"""
+
+import json
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from aws_lambda_powertools.metrics import EphemeralMetrics
+
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+COUNT = "Count"
+MILLISECONDS = "Milliseconds"
+NO_UNIT = "None"
+
+MetricValue = Union[float, List[float]]
+
+_file_lock = threading.Lock()
+
+
+def default_dimensions() -> Dict[str, str]:
+    """Dimensions added to every record: model and Knowledge Base"""
+    return {
+        "Model": settings.MODEL_ID,
+        "KnowledgeBase": settings.KB_ID or "none",
+    }
+
+
+def put_metrics(
+    metrics: Dict[str, Tuple[MetricValue, str]],
+    dimensions: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Write one EMF record with the given metrics
+
+    Failures are logged and swallowed; metrics never fail a request.
+
+    Args:
+        metrics: Metric name -> (value or list of values, unit)
+        dimensions: Dimensions in addition to default_dimensions()
+
+    Example:
+        >>> put_metrics(
+        ...     {"StageDuration": (412.7, MILLISECONDS)}, {"Stage": "kb_query"}
+        ... )
+    """
+    if settings.METRICS_SINK == "none" or not metrics:
+        return
+
+    try:
+        emitter = EphemeralMetrics(namespace=settings.METRICS_NAMESPACE)
+        for name, value in {**default_dimensions(), **(dimensions or {})}.items():
+            emitter.add_dimension(name=name, value=str(value))
+        for name, (values, unit) in metrics.items():
+            for value in values if isinstance(values, list) else [values]:
+                emitter.add_metric(name=name, unit=unit, value=float(value))
+
+        record = json.dumps(emitter.serialize_metric_set(), separators=(",", ":"))
+        _write(record)
+
+    except Exception as e:
+        logger.warning(f"Failed to emit metrics: {e}", extra={"metrics": list(metrics)})
+
+
+def put_stage_timings(timings: Dict[str, Dict[str, float]]) -> None:
+    """
+    Emit a request's stage timing records (see src.utils.timing)
+
+    Args:
+        timings: Timing records by stage name
+    """
+    for stage, record in timings.items():
+        metrics = {
+            "StageDuration": (record["duration_ms"], MILLISECONDS),
+            "StageRemoteTime": (record["remote_ms"], MILLISECONDS),
+            "StageRetries": (record["retries"], COUNT),
+        }
+        if "overhead_ms" in record:
+            metrics["OrchestrationOverhead"] = (record["overhead_ms"], MILLISECONDS)
+        put_metrics(metrics, {"Stage": stage})
+
+
+def put_token_usage(input_tokens: int, output_tokens: int) -> None:
+    """
+    Emit model token usage (input and output are priced differently)
+
+    Args:
+        input_tokens: Prompt tokens
+        output_tokens: Generated tokens
+    """
+    put_metrics(
+        {
+            "InputTokens": (input_tokens, COUNT),
+            "OutputTokens": (output_tokens, COUNT),
+        }
+    )
+
+
+def put_guardrails_verdict(check_type: str, passed: bool) -> None:
+    """
+    Emit one Guardrails verdict (block rate = Sum(Blocked) / Sum(Checks))
+
+    Args:
+        check_type: "input" or "output"
+        passed: False if the content was blocked
+    """
+    put_metrics(
+        {
+            "GuardrailsChecks": (1, COUNT),
+            "GuardrailsBlocked": (0 if passed else 1, COUNT),
+        },
+        {"CheckType": check_type},
+    )
+
+
+def put_kb_results(results: List[Dict[str, Any]]) -> None:
+    """
+    Emit Knowledge Base retrieval result count and relevance scores
+
+    Args:
+        results: Retrieved results with 'score'
+    """
+    scores = [r["score"] for r in results if isinstance(r.get("score"), (int, float))]
+    metrics = {"KBResultCount": (len(results), COUNT)}
+    if scores:
+        metrics["KBTopScore"] = (max(scores), NO_UNIT)
+        metrics["KBMeanScore"] = (sum(scores) / len(scores), NO_UNIT)
+    put_metrics(metrics)
+
+
+def _write(record: str) -> None:
+    """Write an EMF record to the configured sink"""
+    if settings.METRICS_SINK == "file":
+        with _file_lock:
+            with open(settings.METRICS_FILE_PATH, "a", encoding="utf-8") as f:
+                f.write(record + "\n")
+    else:
+        sys.stdout.write(record + "\n")
@@ -0,0 +1,36 @@
+"""
+Rate limiter utility
+
+Thread-safe limiter spacing calls evenly to a maximum rate.
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Blocks callers so that at most rate_per_second acquisitions happen per second"""
+
+    def __init__(self, rate_per_second: float):
+        """
+        Initialize RateLimiter
+
+        Args:
+            rate_per_second: Maximum acquisitions per second (<= 0: unlimited)
+        """
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def acquire(self) -> None:
+        """Wait until the next slot is available"""
+        if self.interval == 0.0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+
+        if wait > 0:
+            time.sleep(wait)
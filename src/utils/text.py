@@ -0,0 +1,91 @@
+"""
+Text utility
+
+Query normalization and tokenization shared by caching and retrieval.
+"""
+
+import re
+import unicodedata
+from typing import List
+
+_CONTRACTIONS = {
+    "what's": "what is",
+    "where's": "where is",
+    "who's": "who is",
+    "how's": "how is",
+    "it's": "it is",
+    "that's": "that is",
+    "there's": "there is",
+    "can't": "cannot",
+    "won't": "will not",
+    "don't": "do not",
+    "doesn't": "does not",
+    "isn't": "is not",
+    "aren't": "are not",
+    "i'm": "i am",
+    "you're": "you are",
+    "we're": "we are",
+    "they're": "they are",
+}
+
+_CONTRACTION_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(c) for c in _CONTRACTIONS) + r")\b"
+)
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize query text for cache keys and matching
+
+    Applies NFKC normalization, lowercasing, contraction expansion,
+    punctuation removal and whitespace collapsing.
+
+    Args:
+        text: Raw query text
+
+    Returns:
+        str: Normalized text
+
+    Example:
+        >>> normalize_query("  What's   Amazon Bedrock? ")
+        "what is amazon bedrock"
+    """
+    text = unicodedata.normalize("NFKC", text).lower().replace("’", "'")
+    text = _CONTRACTION_PATTERN.sub(lambda m: _CONTRACTIONS[m.group(1)], text)
+    return " ".join(tokenize(text))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase word tokens
+
+    Args:
+        text: Input text
+
+    Returns:
+        List[str]: Word tokens (punctuation dropped)
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def lexical_terms(text: str) -> List[str]:
+    """
+    Split text into terms for lexical (BM25) scoring
+
+    Word tokens are kept as is; tokens containing non-ASCII characters
+    (e.g. Japanese, which has no spaces) are split into character bigrams.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List[str]: Terms
+    """
+    terms = []
+    for token in tokenize(unicodedata.normalize("NFKC", text)):
+        if token.isascii() or len(token) <= 2:
+            terms.append(token)
+        else:
+            terms.extend(token[i : i + 2] for i in range(len(token) - 1))
+    return terms
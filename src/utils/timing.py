@@ -0,0 +1,186 @@
+"""
+Stage timing utility
+
+Records per-stage latency breakdowns in the workflow event. Each stage adds
+a record to event["timings"] keyed by stage name:
+
+    {
+        "start_ms": 1718000000123.4,   # epoch milliseconds
+        "duration_ms": 412.7,          # wall time of the stage
+        "remote_ms": 388.1,            # time inside AWS API calls
+        "remote_calls": 2,             # AWS API calls made
+        "retries": 0                   # botocore retry attempts
+    }
+
+Remote time is collected by botocore event hooks (instrument_client) and
+attributed to the innermost stage open on the calling thread; calls made on
+other threads (e.g. the async service pool) are not attributed.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+_local = threading.local()
+
+# botocore request-context key holding a call's start time
+_CONTEXT_START_KEY = "stage_timing_start"
+
+
+@contextmanager
+def stage_timer(event: Dict[str, Any], stage: str) -> Iterator[Dict[str, Any]]:
+    """
+    Time a stage and add its record to event["timings"]
+
+    The timings dict is replaced, not mutated, so events copied for
+    concurrent stages do not share it.
+
+    Args:
+        event: Workflow event
+        stage: Stage name (e.g. "kb_query")
+
+    Yields:
+        The stage's timing record (filled in when the block exits)
+    """
+    record = {
+        "start_ms": round(time.time() * 1000, 1),
+        "duration_ms": 0.0,
+        "remote_ms": 0.0,
+        "remote_calls": 0,
+        "retries": 0,
+    }
+    outer = getattr(_local, "record", None)
+    _local.record = record
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        _local.record = outer
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        record["remote_ms"] = round(record["remote_ms"], 2)
+        event["timings"] = {**event.get("timings", {}), stage: record}
+
+
+def merge_timings(*events: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Combine the timings of events produced by concurrent stages
+
+    Args:
+        *events: Events with optional 'timings'
+
+    Returns:
+        Dict of timing records by stage name
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for event in events:
+        merged.update(event.get("timings", {}))
+    return merged
+
+
+def busy_ms(records: List[Dict[str, Any]]) -> float:
+    """
+    Wall time covered by at least one of the records
+
+    Overlapping stages (e.g. the parallel input stage) are counted once.
+
+    Args:
+        records: Timing records
+
+    Returns:
+        float: Milliseconds
+    """
+    intervals: List[Tuple[float, float]] = sorted(
+        (r["start_ms"], r["start_ms"] + r["duration_ms"]) for r in records
+    )
+    total = 0.0
+    current_start = current_end = None
+    for start, end in intervals:
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return round(total, 2)
+
+
+def instrument_client(client: Any) -> Any:
+    """
+    Register hooks that add each API call's time and retries to the open stage
+
+    Args:
+        client: boto3 client
+
+    Returns:
+        The same client
+    """
+    events = client.meta.events
+    events.register("before-parameter-build", _before_call)
+    events.register("after-call", _after_call)
+    events.register("after-call-error", _after_call_error)
+    return client
+
+
+def _before_call(context: Dict[str, Any], **kwargs: Any) -> None:
+    """
+    botocore hook at the start of an API call
+
+    Registered on before-parameter-build rather than before-call, which
+    handlers returning a canned response (e.g. Stubber) short-circuit.
+    """
+    context[_CONTEXT_START_KEY] = time.perf_counter()
+
+
+def _after_call(context: Dict[str, Any], parsed: Dict[str, Any], **kwargs: Any) -> None:
+    """botocore after-call hook"""
+    retries = parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+    _record_call(context, retries)
+
+
+def _after_call_error(
+    context: Dict[str, Any], exception: Exception, **kwargs: Any
+) -> None:
+    """botocore after-call-error hook (the call raised after its retries)"""
+    response = getattr(exception, "response", None) or {}
+    retries = response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+    _record_call(context, retries)
+
+
+def _record_call(context: Dict[str, Any], retries: int) -> None:
+    """Add one API call to the stage open on this thread"""
+    record = getattr(_local, "record", None)
+    start = context.pop(_CONTEXT_START_KEY, None)
+    if record is None or start is None:
+        return
+    record["remote_ms"] += (time.perf_counter() - start) * 1000
+    record["remote_calls"] += 1
+    record["retries"] += retries
+
+
+def timed_stage(stage: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator adding a stage's timing record to a task handler's output event
+
+    Args:
+        stage: Stage name
+
+    Returns:
+        Decorator for lambda_handler(event, context)
+    """
+
+    def decorator(handler: Callable) -> Callable:
+        @functools.wraps(handler)
+        def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+            timed = {"timings": event.get("timings", {})}
+            with stage_timer(timed, stage):
+                result = handler(event, context)
+            result["timings"] = timed["timings"]
+            return result
+
+        return wrapper
+
+    return decorator
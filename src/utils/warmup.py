@@ -0,0 +1,134 @@
+"""
+Init phase and warm-up events
+
+A container's first request builds what later requests reuse: AWS clients
+and service objects, pydantic validators (model schemas are built on first
+use, see src/models) and the pre-rendered prompt template. Each handler
+declares that work in an init function and registers it with register_init,
+which runs it once per container:
+
+    module scope     during the Lambda INIT phase (INIT_PRIMING_ENABLED)
+    snapshot hook    with SnapStart, before the snapshot is taken, so the
+                     primed state is restored instead of rebuilt
+
+Scheduled warm-up events ({"warmup": true}, sent by the EventBridge rules
+in terraform/lambda.tf) are answered by warmup_aware handlers without
+running them, after running the init function if it has not run yet.
+"""
+
+import functools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+try:
+    from snapshot_restore_py import register_before_snapshot
+except ImportError:  # Only in SnapStart-capable runtimes
+    register_before_snapshot = None
+
+logger = get_logger(__name__)
+
+WARMUP_EVENT_KEY = "warmup"
+
+_lock = threading.RLock()  # init functions may run other handlers' inits
+_init_ms: Dict[str, float] = {}
+
+
+def is_warmup_event(event: Any) -> bool:
+    """
+    Check whether an event is a scheduled warm-up event
+
+    Args:
+        event: Lambda event
+
+    Returns:
+        bool: True for {"warmup": true}
+    """
+    return isinstance(event, dict) and event.get(WARMUP_EVENT_KEY) is True
+
+
+def prime_models(*models: Any) -> None:
+    """
+    Build the validators and serializers of pydantic models
+
+    Args:
+        *models: Model classes (defer_build models are built here; built
+            models are left as they are)
+    """
+    for model in models:
+        model.model_rebuild()
+
+
+def run_init(init: Callable[[], None]) -> Optional[float]:
+    """
+    Run a handler's init function once per container
+
+    Failures are logged and not recorded, so the next warm-up event retries
+    them; requests build whatever is missing on first use.
+
+    Args:
+        init: Zero-argument init function
+
+    Returns:
+        Duration of the init in milliseconds, or None if it failed
+    """
+    key = f"{init.__module__}.{init.__qualname__}"
+    with _lock:
+        if key in _init_ms:
+            return _init_ms[key]
+
+        start = time.perf_counter()
+        try:
+            init()
+        except Exception as e:
+            logger.warning(f"Init phase failed: {e}", extra={"init": key})
+            return None
+        _init_ms[key] = round((time.perf_counter() - start) * 1000, 2)
+
+    logger.info("Init phase complete", extra={"init": key, "init_ms": _init_ms[key]})
+    return _init_ms[key]
+
+
+def register_init(init: Callable[[], None]) -> None:
+    """
+    Register a handler's init function (call at module scope)
+
+    With SnapStart the function runs in the runtime's before-snapshot hook;
+    otherwise it runs at once if INIT_PRIMING_ENABLED.
+
+    Args:
+        init: Zero-argument init function
+    """
+    snap_start = os.getenv("AWS_LAMBDA_INITIALIZATION_TYPE") == "snap-start"
+    if snap_start and register_before_snapshot is not None:
+        register_before_snapshot(run_init, init)
+    elif settings.INIT_PRIMING_ENABLED:
+        run_init(init)
+
+
+def warmup_aware(init: Callable[[], None]) -> Callable[[Callable], Callable]:
+    """
+    Decorator answering warm-up events without running the handler
+
+    Args:
+        init: The handler's init function (run on a warm-up event if it has
+            not run in this container yet)
+
+    Returns:
+        Decorator for lambda_handler(event, context)
+    """
+
+    def decorator(handler: Callable) -> Callable:
+        @functools.wraps(handler)
+        def wrapper(event: Any, context: Any) -> Any:
+            if is_warmup_event(event):
+                return {"warmup": True, "init_ms": run_init(init)}
+            return handler(event, context)
+
+        return wrapper
+
+    return decorator
@@ -56,6 +56,68 @@ resource "aws_lambda_permission" "api_gateway" {
   source_arn    = "${aws_api_gateway_rest_api.main.execution_arn}/*/*"
 }
 
+# /query/batch resource
+resource "aws_api_gateway_resource" "query_batch" {
+  rest_api_id = aws_api_gateway_rest_api.main.id
+  parent_id   = aws_api_gateway_resource.query.id
+  path_part   = "batch"
+}
+
+# POST /query/batch method
+resource "aws_api_gateway_method" "query_batch_post" {
+  rest_api_id   = aws_api_gateway_rest_api.main.id
+  resource_id   = aws_api_gateway_resource.query_batch.id
+  http_method   = "POST"
+  authorization = "NONE"
+}
+
+resource "aws_api_gateway_integration" "query_batch_lambda" {
+  rest_api_id = aws_api_gateway_rest_api.main.id
+  resource_id = aws_api_gateway_resource.query_batch.id
+  http_method = aws_api_gateway_method.query_batch_post.http_method
+
+  integration_http_method = "POST"
+  type                    = "AWS_PROXY"
+  uri                     = aws_lambda_function.batch_handler.invoke_arn
+}
+
+resource "aws_lambda_permission" "api_gateway_batch" {
+  statement_id  = "AllowAPIGatewayInvoke"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.batch_handler.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_api_gateway_rest_api.main.execution_arn}/*/*"
+}
+
+# /query/{job_id} resource (async jobs)
+resource "aws_api_gateway_resource" "query_job" {
+  rest_api_id = aws_api_gateway_rest_api.main.id
+  parent_id   = aws_api_gateway_resource.query.id
+  path_part   = "{job_id}"
+}
+
+# GET /query/{job_id} method (?wait=N long-polls up to N seconds)
+resource "aws_api_gateway_method" "query_job_get" {
+  rest_api_id   = aws_api_gateway_rest_api.main.id
+  resource_id   = aws_api_gateway_resource.query_job.id
+  http_method   = "GET"
+  authorization = "NONE"
+
+  request_parameters = {
+    "method.request.path.job_id" = true
+  }
+}
+
+resource "aws_api_gateway_integration" "query_job_lambda" {
+  rest_api_id = aws_api_gateway_rest_api.main.id
+  resource_id = aws_api_gateway_resource.query_job.id
+  http_method = aws_api_gateway_method.query_job_get.http_method
+
+  integration_http_method = "POST"
+  type                    = "AWS_PROXY"
+  uri                     = aws_lambda_function.api_handler.invoke_arn
+}
+
 # ==============================================================================
 # CORS Configuration
 # ==============================================================================
@@ -99,6 +161,52 @@ resource "aws_api_gateway_integration_response" "query_options" {
   http_method = aws_api_gateway_method.query_options.http_method
   status_code = aws_api_gateway_method_response.query_options.status_code
 
+  response_parameters = {
+    "method.response.header.Access-Control-Allow-Headers" = "'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,X-Debug-Timings,Prefer'"
+    "method.response.header.Access-Control-Allow-Methods" = "'POST,OPTIONS'"
+    "method.response.header.Access-Control-Allow-Origin"  = "'*'"
+  }
+}
+
+# OPTIONS method for CORS (/query/batch)
+resource "aws_api_gateway_method" "query_batch_options" {
+  rest_api_id   = aws_api_gateway_rest_api.main.id
+  resource_id   = aws_api_gateway_resource.query_batch.id
+  http_method   = "OPTIONS"
+  authorization = "NONE"
+}
+
+resource "aws_api_gateway_integration" "query_batch_options" {
+  rest_api_id = aws_api_gateway_rest_api.main.id
+  resource_id = aws_api_gateway_resource.query_batch.id
+  http_method = aws_api_gateway_method.query_batch_options.http_method
+
+  type = "MOCK"
+
+  request_templates = {
+    "application/json" = "{\"statusCode\": 200}"
+  }
+}
+
+resource "aws_api_gateway_method_response" "query_batch_options" {
+  rest_api_id = aws_api_gateway_rest_api.main.id
+  resource_id = aws_api_gateway_resource.query_batch.id
+  http_method = aws_api_gateway_method.query_batch_options.http_method
+  status_code = "200"
+
+  response_parameters = {
+    "method.response.header.Access-Control-Allow-Headers" = true
+    "method.response.header.Access-Control-Allow-Methods" = true
+    "method.response.header.Access-Control-Allow-Origin"  = true
+  }
+}
+
+resource "aws_api_gateway_integration_response" "query_batch_options" {
+  rest_api_id = aws_api_gateway_rest_api.main.id
+  resource_id = aws_api_gateway_resource.query_batch.id
+  http_method = aws_api_gateway_method.query_batch_options.http_method
+  status_code = aws_api_gateway_method_response.query_batch_options.status_code
+
   response_parameters = {
     "method.response.header.Access-Control-Allow-Headers" = "'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token'"
     "method.response.header.Access-Control-Allow-Methods" = "'POST,OPTIONS'"
@@ -115,7 +223,10 @@ resource "aws_api_gateway_deployment" "main" {
 
   depends_on = [
     aws_api_gateway_integration.query_lambda,
-    aws_api_gateway_integration.query_options
+    aws_api_gateway_integration.query_options,
+    aws_api_gateway_integration.query_batch_lambda,
+    aws_api_gateway_integration.query_batch_options,
+    aws_api_gateway_integration.query_job_lambda
   ]
 
   triggers = {
@@ -123,6 +234,14 @@ resource "aws_api_gateway_deployment" "main" {
       aws_api_gateway_resource.query.id,
       aws_api_gateway_method.query_post.id,
       aws_api_gateway_integration.query_lambda.id,
+      aws_api_gateway_resource.query_batch.id,
+      aws_api_gateway_method.query_batch_post.id,
+      aws_api_gateway_integration.query_batch_lambda.id,
+      aws_api_gateway_method.query_batch_options.id,
+      aws_api_gateway_integration.query_batch_options.id,
+      aws_api_gateway_resource.query_job.id,
+      aws_api_gateway_method.query_job_get.id,
+      aws_api_gateway_integration.query_job_lambda.id,
     ]))
   }
 
@@ -150,6 +269,16 @@ output "api_gateway_url" {
   value       = "${aws_api_gateway_stage.main.invoke_url}/query"
 }
 
+output "batch_api_url" {
+  description = "API Gateway invoke URL of the batch endpoint"
+  value       = "${aws_api_gateway_stage.main.invoke_url}/query/batch"
+}
+
+output "job_api_url" {
+  description = "API Gateway invoke URL of async job results (GET, append the job ID)"
+  value       = "${aws_api_gateway_stage.main.invoke_url}/query/"
+}
+
 output "api_gateway_id" {
   description = "API Gateway REST API ID"
   value       = aws_api_gateway_rest_api.main.id
@@ -50,6 +50,24 @@ resource "aws_cloudwatch_log_group" "lambda_cache_response" {
   }
 }
 
+resource "aws_cloudwatch_log_group" "lambda_stream_handler" {
+  name              = "/aws/lambda/${var.project_name}-stream-handler-${var.environment}"
+  retention_in_days = var.log_retention_days
+
+  tags = {
+    Name = "${var.project_name}-stream-handler-logs"
+  }
+}
+
+resource "aws_cloudwatch_log_group" "lambda_batch_handler" {
+  name              = "/aws/lambda/${var.project_name}-batch-handler-${var.environment}"
+  retention_in_days = var.log_retention_days
+
+  tags = {
+    Name = "${var.project_name}-batch-handler-logs"
+  }
+}
+
 # Step Functions log group
 resource "aws_cloudwatch_log_group" "step_functions" {
   name              = "/aws/vendedlogs/states/${var.project_name}-rag-workflow-${var.environment}"
@@ -94,6 +112,8 @@ output "log_group_names" {
     kb_query          = aws_cloudwatch_log_group.lambda_kb_query.name
     bedrock_invoke    = aws_cloudwatch_log_group.lambda_bedrock_invoke.name
     cache_response    = aws_cloudwatch_log_group.lambda_cache_response.name
+    stream_handler    = aws_cloudwatch_log_group.lambda_stream_handler.name
+    batch_handler     = aws_cloudwatch_log_group.lambda_batch_handler.name
     step_functions    = aws_cloudwatch_log_group.step_functions.name
   }
 }
@@ -63,6 +63,10 @@ resource "aws_iam_role_policy" "lambda_dynamodb" {
         Action = [
           "dynamodb:GetItem",
           "dynamodb:PutItem",
+          "dynamodb:UpdateItem",
+          "dynamodb:DeleteItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem",
           "dynamodb:Query",
           "dynamodb:Scan"
         ]
@@ -84,10 +88,12 @@ resource "aws_iam_role_policy" "lambda_bedrock" {
         Effect = "Allow"
         Action = [
           "bedrock:InvokeModel",
+          "bedrock:InvokeModelWithResponseStream",
           "bedrock:ApplyGuardrail"
         ]
         Resource = [
           "arn:aws:bedrock:${var.aws_region}::foundation-model/anthropic.claude-3-haiku-20240307-v1:0",
+          "arn:aws:bedrock:${var.aws_region}::foundation-model/amazon.titan-embed-text-v2:0",
           "arn:aws:bedrock:${var.aws_region}:${data.aws_caller_identity.current.account_id}:guardrail/*"
         ]
       },
@@ -116,7 +122,8 @@ resource "aws_iam_role_policy" "api_handler_step_functions" {
       {
         Effect = "Allow"
         Action = [
-          "states:StartExecution"
+          "states:StartExecution",
+          "states:StartSyncExecution"
         ]
         Resource = "arn:aws:states:${var.aws_region}:${data.aws_caller_identity.current.account_id}:stateMachine:${var.project_name}-*"
       },
@@ -131,6 +138,29 @@ resource "aws_iam_role_policy" "api_handler_step_functions" {
   })
 }
 
+# Inline orchestration mode: async jobs and stale-entry refreshes run as
+# asynchronous invocations of the API / batch handler itself (workflow tasks)
+resource "aws_iam_role_policy" "api_handler_workflow_tasks" {
+  name = "api-handler-workflow-tasks"
+  role = aws_iam_role.lambda_execution.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "lambda:InvokeFunction"
+        ]
+        Resource = [
+          aws_lambda_function.api_handler.arn,
+          aws_lambda_function.batch_handler.arn
+        ]
+      }
+    ]
+  })
+}
+
 # ==============================================================================
 # Step Functions Execution Role
 # ==============================================================================
@@ -175,6 +205,25 @@ resource "aws_iam_role_policy" "step_functions_lambda" {
   })
 }
 
+# Step Functions permissions to record async job outcomes (job# items in the cache table)
+resource "aws_iam_role_policy" "step_functions_dynamodb" {
+  name = "step-functions-dynamodb"
+  role = aws_iam_role.step_functions_execution.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:UpdateItem"
+        ]
+        Resource = aws_dynamodb_table.cache.arn
+      }
+    ]
+  })
+}
+
 # Step Functions CloudWatch Logs permissions
 resource "aws_iam_role_policy" "step_functions_logging" {
   name = "step-functions-logging"
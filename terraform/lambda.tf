@@ -5,7 +5,7 @@
  */
 
 # ==============================================================================
-# Lambda Deployment Package (placeholder - will be updated after packaging)
+# Lambda Deployment Packages (build/dist/<handler>.zip, one per function)
 # ==============================================================================
 
 # API Handler Lambda
@@ -15,26 +15,40 @@ resource "aws_lambda_function" "api_handler" {
   handler       = "src.handlers.api_handler.lambda_handler"
   runtime       = "python3.11"
 
-  # Placeholder - will be updated after packaging
-  filename         = "../lambda_deployment.zip"
-  source_code_hash = fileexists("../lambda_deployment.zip") ? filebase64sha256("../lambda_deployment.zip") : ""
+  # Per-handler bundle built by scripts/package_lambdas.sh
+  filename         = "../build/dist/api_handler.zip"
+  source_code_hash = fileexists("../build/dist/api_handler.zip") ? filebase64sha256("../build/dist/api_handler.zip") : ""
 
   timeout     = var.lambda_timeout
   memory_size = var.lambda_memory_size
 
   environment {
     variables = {
-      KB_ID               = var.knowledge_base_id
-      GUARDRAILS_ID       = var.guardrails_id
-      GUARDRAILS_VERSION  = "DRAFT"
-      CACHE_TABLE_NAME    = aws_dynamodb_table.cache.name
-      STATE_MACHINE_ARN   = aws_sfn_state_machine.rag_workflow.arn
-      MODEL_ID            = "anthropic.claude-3-haiku-20240307-v1:0"
-      MAX_TOKENS          = "1024"
-      KB_MAX_RESULTS      = "5"
-      CACHE_TTL_SECONDS   = tostring(var.cache_ttl_seconds)
-      CACHE_ENABLED       = "true"
-      LOG_LEVEL           = "INFO"
+      KB_ID                         = var.knowledge_base_id
+      GUARDRAILS_ID                 = var.guardrails_id
+      GUARDRAILS_VERSION            = var.guardrails_version
+      GUARDRAILS_VERDICT_TABLE_NAME = aws_dynamodb_table.cache.name
+      CACHE_TABLE_NAME              = aws_dynamodb_table.cache.name
+      STATE_MACHINE_ARN             = aws_sfn_state_machine.rag_workflow.arn
+      STATE_MACHINE_TYPE            = var.state_machine_type
+      MODEL_ID                      = "anthropic.claude-3-haiku-20240307-v1:0"
+      MAX_TOKENS                    = "1024"
+      KB_MAX_RESULTS                = "5"
+      KB_INGESTION_VERSION          = var.kb_ingestion_version
+      KB_RETRIEVAL_CACHE_TABLE_NAME = aws_dynamodb_table.cache.name
+      RERANK_ENABLED                = tostring(var.rerank_enabled)
+      CACHE_TTL_SECONDS             = tostring(var.cache_ttl_seconds)
+      CACHE_STALE_GRACE_SECONDS     = tostring(var.cache_stale_grace_seconds)
+      CACHE_ITEM_ENCODING           = var.cache_item_encoding
+      CACHE_ENABLED                 = "true"
+      CACHE_MODE                    = var.cache_mode
+      ORCHESTRATION_MODE            = var.orchestration_mode
+      QUERY_MODE                    = var.query_mode
+      PARALLEL_INPUT_STAGE          = tostring(var.parallel_input_stage)
+      OUTPUT_GUARDRAILS_MODE        = var.output_guardrails_mode
+      SINGLE_FLIGHT_ENABLED         = tostring(var.single_flight_enabled)
+      PYDANTIC_DISABLE_PLUGINS      = "__all__"
+      LOG_LEVEL                     = "INFO"
     }
   }
 
@@ -55,17 +69,18 @@ resource "aws_lambda_function" "guardrails_check" {
   handler       = "src.handlers.guardrails_check.lambda_handler"
   runtime       = "python3.11"
 
-  filename         = "../lambda_deployment.zip"
-  source_code_hash = fileexists("../lambda_deployment.zip") ? filebase64sha256("../lambda_deployment.zip") : ""
+  filename         = "../build/dist/guardrails_check.zip"
+  source_code_hash = fileexists("../build/dist/guardrails_check.zip") ? filebase64sha256("../build/dist/guardrails_check.zip") : ""
 
   timeout     = var.lambda_timeout
   memory_size = var.lambda_memory_size
 
   environment {
     variables = {
-      GUARDRAILS_ID      = var.guardrails_id
-      GUARDRAILS_VERSION = "DRAFT"
-      LOG_LEVEL          = "INFO"
+      GUARDRAILS_ID                 = var.guardrails_id
+      GUARDRAILS_VERSION            = var.guardrails_version
+      GUARDRAILS_VERDICT_TABLE_NAME = aws_dynamodb_table.cache.name
+      LOG_LEVEL                     = "INFO"
     }
   }
 
@@ -83,17 +98,20 @@ resource "aws_lambda_function" "kb_query" {
   handler       = "src.handlers.kb_query.lambda_handler"
   runtime       = "python3.11"
 
-  filename         = "../lambda_deployment.zip"
-  source_code_hash = fileexists("../lambda_deployment.zip") ? filebase64sha256("../lambda_deployment.zip") : ""
+  filename         = "../build/dist/kb_query.zip"
+  source_code_hash = fileexists("../build/dist/kb_query.zip") ? filebase64sha256("../build/dist/kb_query.zip") : ""
 
   timeout     = var.lambda_timeout
   memory_size = var.lambda_memory_size
 
   environment {
     variables = {
-      KB_ID          = var.knowledge_base_id
-      KB_MAX_RESULTS = "5"
-      LOG_LEVEL      = "INFO"
+      KB_ID                         = var.knowledge_base_id
+      KB_MAX_RESULTS                = "5"
+      KB_INGESTION_VERSION          = var.kb_ingestion_version
+      KB_RETRIEVAL_CACHE_TABLE_NAME = aws_dynamodb_table.cache.name
+      RERANK_ENABLED                = tostring(var.rerank_enabled)
+      LOG_LEVEL                     = "INFO"
     }
   }
 
@@ -111,19 +129,21 @@ resource "aws_lambda_function" "bedrock_invoke" {
   handler       = "src.handlers.bedrock_invoke.lambda_handler"
   runtime       = "python3.11"
 
-  filename         = "../lambda_deployment.zip"
-  source_code_hash = fileexists("../lambda_deployment.zip") ? filebase64sha256("../lambda_deployment.zip") : ""
+  filename         = "../build/dist/bedrock_invoke.zip"
+  source_code_hash = fileexists("../build/dist/bedrock_invoke.zip") ? filebase64sha256("../build/dist/bedrock_invoke.zip") : ""
 
   timeout     = var.lambda_timeout
   memory_size = var.lambda_memory_size
 
   environment {
     variables = {
-      MODEL_ID           = "anthropic.claude-3-haiku-20240307-v1:0"
-      MAX_TOKENS         = "1024"
-      GUARDRAILS_ID      = var.guardrails_id
-      GUARDRAILS_VERSION = "DRAFT"
-      LOG_LEVEL          = "INFO"
+      MODEL_ID                      = "anthropic.claude-3-haiku-20240307-v1:0"
+      MAX_TOKENS                    = "1024"
+      GUARDRAILS_ID                 = var.guardrails_id
+      GUARDRAILS_VERSION            = var.guardrails_version
+      GUARDRAILS_VERDICT_TABLE_NAME = aws_dynamodb_table.cache.name
+      OUTPUT_GUARDRAILS_MODE        = var.output_guardrails_mode
+      LOG_LEVEL                     = "INFO"
     }
   }
 
@@ -141,18 +161,21 @@ resource "aws_lambda_function" "cache_response" {
   handler       = "src.handlers.cache_response.lambda_handler"
   runtime       = "python3.11"
 
-  filename         = "../lambda_deployment.zip"
-  source_code_hash = fileexists("../lambda_deployment.zip") ? filebase64sha256("../lambda_deployment.zip") : ""
+  filename         = "../build/dist/cache_response.zip"
+  source_code_hash = fileexists("../build/dist/cache_response.zip") ? filebase64sha256("../build/dist/cache_response.zip") : ""
 
   timeout     = var.lambda_timeout
   memory_size = var.lambda_memory_size
 
   environment {
     variables = {
-      CACHE_TABLE_NAME  = aws_dynamodb_table.cache.name
-      CACHE_TTL_SECONDS = tostring(var.cache_ttl_seconds)
-      CACHE_ENABLED     = "true"
-      LOG_LEVEL         = "INFO"
+      CACHE_TABLE_NAME          = aws_dynamodb_table.cache.name
+      CACHE_TTL_SECONDS         = tostring(var.cache_ttl_seconds)
+      CACHE_STALE_GRACE_SECONDS = tostring(var.cache_stale_grace_seconds)
+      CACHE_ITEM_ENCODING       = var.cache_item_encoding
+      CACHE_ENABLED             = "true"
+      PYDANTIC_DISABLE_PLUGINS  = "__all__"
+      LOG_LEVEL                 = "INFO"
     }
   }
 
@@ -163,6 +186,176 @@ resource "aws_lambda_function" "cache_response" {
   }
 }
 
+# Batch Handler Lambda (POST /query/batch)
+resource "aws_lambda_function" "batch_handler" {
+  function_name = "${var.project_name}-batch-handler-${var.environment}"
+  role          = aws_iam_role.lambda_execution.arn
+  handler       = "src.handlers.batch_handler.lambda_handler"
+  runtime       = "python3.11"
+
+  # Per-handler bundle built by scripts/package_lambdas.sh
+  filename         = "../build/dist/batch_handler.zip"
+  source_code_hash = fileexists("../build/dist/batch_handler.zip") ? filebase64sha256("../build/dist/batch_handler.zip") : ""
+
+  timeout     = var.lambda_timeout
+  memory_size = var.lambda_memory_size
+
+  environment {
+    variables = {
+      KB_ID                         = var.knowledge_base_id
+      GUARDRAILS_ID                 = var.guardrails_id
+      GUARDRAILS_VERSION            = var.guardrails_version
+      GUARDRAILS_VERDICT_TABLE_NAME = aws_dynamodb_table.cache.name
+      CACHE_TABLE_NAME              = aws_dynamodb_table.cache.name
+      STATE_MACHINE_ARN             = aws_sfn_state_machine.rag_workflow.arn
+      STATE_MACHINE_TYPE            = var.state_machine_type
+      MODEL_ID                      = "anthropic.claude-3-haiku-20240307-v1:0"
+      MAX_TOKENS                    = "1024"
+      KB_MAX_RESULTS                = "5"
+      KB_INGESTION_VERSION          = var.kb_ingestion_version
+      KB_RETRIEVAL_CACHE_TABLE_NAME = aws_dynamodb_table.cache.name
+      RERANK_ENABLED                = tostring(var.rerank_enabled)
+      CACHE_TTL_SECONDS             = tostring(var.cache_ttl_seconds)
+      CACHE_STALE_GRACE_SECONDS     = tostring(var.cache_stale_grace_seconds)
+      CACHE_ITEM_ENCODING           = var.cache_item_encoding
+      CACHE_ENABLED                 = "true"
+      CACHE_MODE                    = var.cache_mode
+      ORCHESTRATION_MODE            = var.orchestration_mode
+      PARALLEL_INPUT_STAGE          = tostring(var.parallel_input_stage)
+      OUTPUT_GUARDRAILS_MODE        = var.output_guardrails_mode
+      BATCH_MAX_CONCURRENCY         = tostring(var.batch_max_concurrency)
+      SINGLE_FLIGHT_ENABLED         = tostring(var.single_flight_enabled)
+      PYDANTIC_DISABLE_PLUGINS      = "__all__"
+      LOG_LEVEL                     = "INFO"
+    }
+  }
+
+  depends_on = [
+    aws_cloudwatch_log_group.lambda_batch_handler,
+    aws_sfn_state_machine.rag_workflow
+  ]
+
+  tags = {
+    Name = "${var.project_name}-batch-handler"
+  }
+}
+
+# Stream Handler Lambda (SSE-formatted answers, exposed via Function URL).
+# The managed Python runtime has no response streaming, so the function runs
+# src/handlers/stream_server.py (run.sh, generated by package_lambdas.sh)
+# behind the Lambda Web Adapter, which streams each frame to the client as it
+# is written.
+resource "aws_lambda_function" "stream_handler" {
+  function_name = "${var.project_name}-stream-handler-${var.environment}"
+  role          = aws_iam_role.lambda_execution.arn
+  handler       = "run.sh"
+  runtime       = "python3.11"
+  layers = [
+    "arn:aws:lambda:${var.aws_region}:753240598075:layer:LambdaAdapterLayerX86:${var.lambda_web_adapter_layer_version}",
+  ]
+
+  filename         = "../build/dist/stream_handler.zip"
+  source_code_hash = fileexists("../build/dist/stream_handler.zip") ? filebase64sha256("../build/dist/stream_handler.zip") : ""
+
+  timeout     = var.lambda_timeout
+  memory_size = var.lambda_memory_size
+
+  environment {
+    variables = {
+      KB_ID                         = var.knowledge_base_id
+      KB_MAX_RESULTS                = "5"
+      KB_INGESTION_VERSION          = var.kb_ingestion_version
+      KB_RETRIEVAL_CACHE_TABLE_NAME = aws_dynamodb_table.cache.name
+      RERANK_ENABLED                = tostring(var.rerank_enabled)
+      GUARDRAILS_ID                 = var.guardrails_id
+      GUARDRAILS_VERSION            = var.guardrails_version
+      GUARDRAILS_VERDICT_TABLE_NAME = aws_dynamodb_table.cache.name
+      MODEL_ID                      = "anthropic.claude-3-haiku-20240307-v1:0"
+      MAX_TOKENS                    = "1024"
+      CACHE_TABLE_NAME              = aws_dynamodb_table.cache.name
+      CACHE_TTL_SECONDS             = tostring(var.cache_ttl_seconds)
+      CACHE_STALE_GRACE_SECONDS     = tostring(var.cache_stale_grace_seconds)
+      CACHE_ITEM_ENCODING           = var.cache_item_encoding
+      CACHE_ENABLED                 = "true"
+      CACHE_MODE                    = var.cache_mode
+      PARALLEL_INPUT_STAGE          = tostring(var.parallel_input_stage)
+      OUTPUT_GUARDRAILS_MODE        = var.output_guardrails_mode
+      PYDANTIC_DISABLE_PLUGINS      = "__all__"
+      LOG_LEVEL                     = "INFO"
+      AWS_LAMBDA_EXEC_WRAPPER       = "/opt/bootstrap"
+      AWS_LWA_INVOKE_MODE           = "response_stream"
+      AWS_LWA_PORT                  = "8080"
+      AWS_LWA_READINESS_CHECK_PATH  = "/health"
+      AWS_LWA_PASS_THROUGH_PATH     = "/events"
+    }
+  }
+
+  depends_on = [aws_cloudwatch_log_group.lambda_stream_handler]
+
+  tags = {
+    Name = "${var.project_name}-stream-handler"
+  }
+}
+
+resource "aws_lambda_function_url" "stream_handler" {
+  function_name      = aws_lambda_function.stream_handler.function_name
+  authorization_type = "NONE"
+  invoke_mode        = "RESPONSE_STREAM"
+
+  cors {
+    allow_origins = ["*"]
+    allow_methods = ["POST"]
+    allow_headers = ["content-type"]
+  }
+}
+
+# ==============================================================================
+# Warm-up Schedule
+# ==============================================================================
+# Sends {"warmup": true} to every function; handlers run their init phase if
+# needed and return without processing (src/utils/warmup.py). One rule per
+# function (EventBridge allows 5 targets per rule).
+
+locals {
+  warmup_functions = {
+    for name, function in {
+      api_handler      = aws_lambda_function.api_handler
+      guardrails_check = aws_lambda_function.guardrails_check
+      kb_query         = aws_lambda_function.kb_query
+      bedrock_invoke   = aws_lambda_function.bedrock_invoke
+      cache_response   = aws_lambda_function.cache_response
+      batch_handler    = aws_lambda_function.batch_handler
+      stream_handler   = aws_lambda_function.stream_handler
+    } : name => function if var.warmup_enabled
+  }
+}
+
+resource "aws_cloudwatch_event_rule" "warmup" {
+  for_each = local.warmup_functions
+
+  name                = "${var.project_name}-warmup-${replace(each.key, "_", "-")}-${var.environment}"
+  description         = "Warm-up event for ${each.value.function_name}"
+  schedule_expression = var.warmup_schedule_expression
+}
+
+resource "aws_cloudwatch_event_target" "warmup" {
+  for_each = local.warmup_functions
+
+  rule  = aws_cloudwatch_event_rule.warmup[each.key].name
+  arn   = each.value.arn
+  input = jsonencode({ warmup = true })
+}
+
+resource "aws_lambda_permission" "warmup" {
+  for_each = local.warmup_functions
+
+  statement_id  = "AllowEventBridgeWarmup"
+  action        = "lambda:InvokeFunction"
+  function_name = each.value.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.warmup[each.key].arn
+}
+
 # ==============================================================================
 # Outputs
 # ==============================================================================
@@ -175,5 +368,12 @@ output "lambda_function_arns" {
     kb_query          = aws_lambda_function.kb_query.arn
     bedrock_invoke    = aws_lambda_function.bedrock_invoke.arn
     cache_response    = aws_lambda_function.cache_response.arn
+    stream_handler    = aws_lambda_function.stream_handler.arn
+    batch_handler     = aws_lambda_function.batch_handler.arn
   }
 }
+
+output "stream_url" {
+  description = "Function URL of the SSE endpoint (buffered response)"
+  value       = aws_lambda_function_url.stream_handler.function_url
+}
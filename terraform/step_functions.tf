@@ -3,24 +3,250 @@
  *
  * Orchestrates the RAG workflow:
  * 1. Guardrails check (input)
- * 2. Knowledge Base query
+ * 2. Knowledge Base query (concurrently with 1 if parallel_input_stage)
  * 3. Bedrock invoke (with output guardrails)
  * 4. Cache response
+ * 5. Record the outcome of async jobs (executions with a non-null job_id)
+ *
+ * Executions started by the API always carry job_id (null for synchronous
+ * requests). var.state_machine_type selects STANDARD (the API polls
+ * DescribeExecution) or EXPRESS (the API waits on StartSyncExecution).
  */
 
+locals {
+  lambda_task_retry = [
+    {
+      ErrorEquals = [
+        "Lambda.ServiceException",
+        "Lambda.AWSLambdaException",
+        "Lambda.SdkClientException"
+      ]
+      IntervalSeconds = 2
+      MaxAttempts     = 3
+      BackoffRate     = 2.0
+    }
+  ]
+
+  # Sequential input stage: GuardrailsCheck, then KnowledgeBaseQuery
+  sequential_input_states = {
+    # Step 1: Check input with Guardrails
+    GuardrailsCheck = {
+      Type     = "Task"
+      Resource = aws_lambda_function.guardrails_check.arn
+      Retry    = local.lambda_task_retry
+      Catch = [
+        {
+          ErrorEquals = ["GuardrailsError"]
+          ResultPath  = "$.guardrails_error"
+          Next        = "GuardrailsBlocked"
+        },
+        {
+          ErrorEquals = ["States.ALL"]
+          ResultPath  = "$.error"
+          Next        = "HandleError"
+        }
+      ]
+      Next = "KnowledgeBaseQuery"
+    }
+
+    # Step 2: Query Knowledge Base
+    KnowledgeBaseQuery = {
+      Type     = "Task"
+      Resource = aws_lambda_function.kb_query.arn
+      Retry    = local.lambda_task_retry
+      Catch = [
+        {
+          ErrorEquals = ["States.ALL"]
+          ResultPath  = "$.kb_error"
+          Next        = "UseEmptyContext"
+        }
+      ]
+      Next = "BedrockInvoke"
+    }
+
+    UseEmptyContext = {
+      Type       = "Pass"
+      ResultPath = "$"
+      Parameters = {
+        "query.$"             = "$.query"
+        "request_id.$"        = "$.request_id"
+        "start_time.$"        = "$.start_time"
+        "job_id.$"            = "$.job_id"
+        "guardrails_passed.$" = "$.guardrails_passed"
+        "guardrails_action.$" = "$.guardrails_action"
+        "context"             = ""
+        "kb_results"          = []
+        "kb_results_count"    = 0
+        "timings.$"           = "$.timings"
+      }
+      Next = "BedrockInvoke"
+    }
+  }
+
+  # Concurrent input stage: input guardrails and KB retrieval run as Parallel
+  # branches. Retrieval is speculative - a guardrails block fails the whole
+  # state and its result is discarded.
+  parallel_input_states = {
+    InputStage = {
+      Type = "Parallel"
+      Branches = [
+        {
+          StartAt = "GuardrailsCheck"
+          States = {
+            GuardrailsCheck = {
+              Type     = "Task"
+              Resource = aws_lambda_function.guardrails_check.arn
+              Retry    = local.lambda_task_retry
+              End      = true
+            }
+          }
+        },
+        {
+          StartAt = "KnowledgeBaseQuery"
+          States = {
+            KnowledgeBaseQuery = {
+              Type     = "Task"
+              Resource = aws_lambda_function.kb_query.arn
+              Retry    = local.lambda_task_retry
+              Catch = [
+                {
+                  ErrorEquals = ["States.ALL"]
+                  ResultPath  = "$.kb_error"
+                  Next        = "UseEmptyContext"
+                }
+              ]
+              End = true
+            }
+
+            UseEmptyContext = {
+              Type       = "Pass"
+              ResultPath = "$"
+              Parameters = {
+                "context"          = ""
+                "kb_results"       = []
+                "kb_results_count" = 0
+                "timings"          = {}
+              }
+              End = true
+            }
+          }
+        }
+      ]
+      Catch = [
+        {
+          ErrorEquals = ["GuardrailsError"]
+          ResultPath  = "$.guardrails_error"
+          Next        = "GuardrailsBlocked"
+        },
+        {
+          ErrorEquals = ["States.ALL"]
+          ResultPath  = "$.error"
+          Next        = "HandleError"
+        }
+      ]
+      Next = "MergeInputStage"
+    }
+
+    # Branch outputs are [guardrails_event, kb_event]; merge into one event.
+    # JsonMerge is shallow, so both branches' stage timings are merged
+    # separately and then set on the event.
+    MergeInputStage = {
+      Type = "Pass"
+      Parameters = {
+        "event.$" = "States.JsonMerge($[0], $[1], false)"
+        "timings" = {
+          "timings.$" = "States.JsonMerge($[0].timings, $[1].timings, false)"
+        }
+      }
+      Next = "MergeInputTimings"
+    }
+
+    MergeInputTimings = {
+      Type = "Pass"
+      Parameters = {
+        "event.$" = "States.JsonMerge($.event, $.timings, false)"
+      }
+      OutputPath = "$.event"
+      Next       = "BedrockInvoke"
+    }
+  }
+
+  # Async jobs: status/result updates of the "job#<job_id>" item in the cache
+  # table (see src/services/job_service.py). A job whose update fails stays
+  # RUNNING until its TTL.
+  job_item_key = {
+    query_hash = {
+      "S.$" = "States.Format('job#{}', $.job_id)"
+    }
+  }
+
+  job_update_retry = [
+    {
+      ErrorEquals     = ["States.TaskFailed"]
+      IntervalSeconds = 1
+      MaxAttempts     = 3
+      BackoffRate     = 2.0
+    }
+  ]
+
+  # Record a failed job, then fail the execution with the original error
+  job_failure_states = {
+    for name, failure in {
+      RecordJobBlocked = { error = "GuardrailsBlocked", next = "Blocked" }
+      RecordJobError   = { error = "WorkflowExecutionError", next = "Failed" }
+    } :
+    name => {
+      Type     = "Task"
+      Resource = "arn:aws:states:::dynamodb:updateItem"
+      Parameters = {
+        TableName        = aws_dynamodb_table.cache.name
+        Key              = local.job_item_key
+        UpdateExpression = "SET #status = :status, #error = :error, completed_at = :completed_at"
+        ExpressionAttributeNames = {
+          "#status" = "status"
+          "#error"  = "error"
+        }
+        ExpressionAttributeValues = {
+          ":status"       = { S = "FAILED" }
+          ":error"        = { S = failure.error }
+          ":completed_at" = { "S.$" = "$$.State.EnteredTime" }
+        }
+      }
+      ResultPath = null
+      Retry      = local.job_update_retry
+      Catch = [
+        {
+          ErrorEquals = ["States.ALL"]
+          ResultPath  = "$.job_error"
+          Next        = failure.next
+        }
+      ]
+      Next = failure.next
+    }
+  }
+
+  # Conditional on object types needs a common type; round-trip through JSON
+  input_states = jsondecode(
+    var.parallel_input_stage ? jsonencode(local.parallel_input_states) : jsonencode(local.sequential_input_states)
+  )
+}
+
 resource "aws_sfn_state_machine" "rag_workflow" {
   name     = "${var.project_name}-rag-workflow-${var.environment}"
   role_arn = aws_iam_role.step_functions_execution.arn
+  type     = var.state_machine_type
 
   definition = jsonencode({
     Comment = "RAG workflow with Bedrock, Knowledge Base, and Guardrails"
-    StartAt = "GuardrailsCheck"
+    StartAt = var.parallel_input_stage ? "InputStage" : "GuardrailsCheck"
 
-    States = {
-      # Step 1: Check input with Guardrails
-      GuardrailsCheck = {
+    States = merge(local.input_states, local.job_failure_states, {
+      # Steps 1-2: sequential (GuardrailsCheck -> KnowledgeBaseQuery) or
+      # concurrent (InputStage) depending on var.parallel_input_stage
+      # Step 3: Invoke Bedrock model (includes output guardrails)
+      BedrockInvoke = {
         Type     = "Task"
-        Resource = aws_lambda_function.guardrails_check.arn
+        Resource = aws_lambda_function.bedrock_invoke.arn
         Retry = [
           {
             ErrorEquals = [
@@ -45,13 +271,13 @@ resource "aws_sfn_state_machine" "rag_workflow" {
             Next        = "HandleError"
           }
         ]
-        Next = "KnowledgeBaseQuery"
+        Next = "CacheResponse"
       }
 
-      # Step 2: Query Knowledge Base
-      KnowledgeBaseQuery = {
+      # Step 4: Cache response
+      CacheResponse = {
         Type     = "Task"
-        Resource = aws_lambda_function.kb_query.arn
+        Resource = aws_lambda_function.cache_response.arn
         Retry = [
           {
             ErrorEquals = [
@@ -64,85 +290,82 @@ resource "aws_sfn_state_machine" "rag_workflow" {
             BackoffRate     = 2.0
           }
         ]
+        # Cache failures are non-critical, continue to success
         Catch = [
           {
             ErrorEquals = ["States.ALL"]
-            ResultPath  = "$.kb_error"
-            Next        = "UseEmptyContext"
+            ResultPath  = "$.cache_error"
+            Next        = "CompleteJob"
           }
         ]
-        Next = "BedrockInvoke"
+        Next = "CompleteJob"
       }
 
-      UseEmptyContext = {
-        Type       = "Pass"
-        ResultPath = "$"
-        Parameters = {
-          "query.$"             = "$.query"
-          "request_id.$"        = "$.request_id"
-          "start_time.$"        = "$.start_time"
-          "guardrails_passed.$" = "$.guardrails_passed"
-          "guardrails_action.$" = "$.guardrails_action"
-          "context"             = ""
-          "kb_results"          = []
-          "kb_results_count"    = 0
-        }
-        Next = "BedrockInvoke"
-      }
-
-      # Step 3: Invoke Bedrock model (includes output guardrails)
-      BedrockInvoke = {
-        Type     = "Task"
-        Resource = aws_lambda_function.bedrock_invoke.arn
-        Retry = [
+      # Step 5: Record the answer of an async job
+      CompleteJob = {
+        Type = "Choice"
+        Choices = [
           {
-            ErrorEquals = [
-              "Lambda.ServiceException",
-              "Lambda.AWSLambdaException",
-              "Lambda.SdkClientException"
-            ]
-            IntervalSeconds = 2
-            MaxAttempts     = 3
-            BackoffRate     = 2.0
-          }
-        ]
-        Catch = [
+            Variable  = "$.job_id"
+            IsPresent = false
+            Next      = "Success"
+          },
           {
-            ErrorEquals = ["GuardrailsError"]
-            ResultPath  = "$.guardrails_error"
-            Next        = "GuardrailsBlocked"
+            Variable = "$.job_id"
+            IsNull   = true
+            Next     = "Success"
           },
           {
-            ErrorEquals = ["States.ALL"]
-            ResultPath  = "$.error"
-            Next        = "HandleError"
+            # CacheResponse failed before adding the sources
+            Variable  = "$.sources"
+            IsPresent = false
+            Next      = "UseEmptySources"
           }
         ]
-        Next = "CacheResponse"
+        Default = "BuildJobResult"
       }
 
-      # Step 4: Cache response
-      CacheResponse = {
+      UseEmptySources = {
+        Type       = "Pass"
+        Result     = []
+        ResultPath = "$.sources"
+        Next       = "BuildJobResult"
+      }
+
+      BuildJobResult = {
+        Type = "Pass"
+        Parameters = {
+          "answer.$"  = "$.answer"
+          "sources.$" = "$.sources"
+        }
+        ResultPath = "$.job_result"
+        Next       = "RecordJobResult"
+      }
+
+      RecordJobResult = {
         Type     = "Task"
-        Resource = aws_lambda_function.cache_response.arn
-        Retry = [
-          {
-            ErrorEquals = [
-              "Lambda.ServiceException",
-              "Lambda.AWSLambdaException",
-              "Lambda.SdkClientException"
-            ]
-            IntervalSeconds = 2
-            MaxAttempts     = 3
-            BackoffRate     = 2.0
+        Resource = "arn:aws:states:::dynamodb:updateItem"
+        Parameters = {
+          TableName        = aws_dynamodb_table.cache.name
+          Key              = local.job_item_key
+          UpdateExpression = "SET #status = :status, #result = :result, completed_at = :completed_at"
+          ExpressionAttributeNames = {
+            "#status" = "status"
+            "#result" = "result"
           }
-        ]
-        # Cache failures are non-critical, continue to success
+          ExpressionAttributeValues = {
+            ":status"       = { S = "SUCCEEDED" }
+            ":result"       = { "S.$" = "States.JsonToString($.job_result)" }
+            ":completed_at" = { "S.$" = "$$.State.EnteredTime" }
+          }
+        }
+        ResultPath = null
+        Retry      = local.job_update_retry
         Catch = [
           {
             ErrorEquals = ["States.ALL"]
-            ResultPath  = "$.cache_error"
-            Next        = "Success"
+            ResultPath  = "$.error"
+            Next        = "HandleError"
           }
         ]
         Next = "Success"
@@ -153,19 +376,54 @@ resource "aws_sfn_state_machine" "rag_workflow" {
         Type = "Succeed"
       }
 
+      # Blocked by guardrails: record the failure of an async job, then fail
       GuardrailsBlocked = {
+        Type = "Choice"
+        Choices = [
+          {
+            Variable  = "$.job_id"
+            IsPresent = false
+            Next      = "Blocked"
+          },
+          {
+            Variable = "$.job_id"
+            IsNull   = true
+            Next     = "Blocked"
+          }
+        ]
+        Default = "RecordJobBlocked"
+      }
+
+      Blocked = {
         Type  = "Fail"
         Cause = "Content blocked by guardrails"
         Error = "GuardrailsBlocked"
       }
 
-      # Error handler
+      # Error handler: record the failure of an async job, then fail
       HandleError = {
-        Type = "Fail"
+        Type = "Choice"
+        Choices = [
+          {
+            Variable  = "$.job_id"
+            IsPresent = false
+            Next      = "Failed"
+          },
+          {
+            Variable = "$.job_id"
+            IsNull   = true
+            Next     = "Failed"
+          }
+        ]
+        Default = "RecordJobError"
+      }
+
+      Failed = {
+        Type  = "Fail"
         Cause = "Workflow failed"
         Error = "WorkflowExecutionError"
       }
-    }
+    })
   })
 
   logging_configuration {
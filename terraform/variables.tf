@@ -28,6 +28,84 @@ variable "cache_ttl_seconds" {
   default     = 86400 # 24 hours
 }
 
+variable "cache_stale_grace_seconds" {
+  description = "Serve expired cached answers for this long while one request refreshes them in the background (0: disabled)"
+  type        = number
+  default     = 3600
+}
+
+variable "cache_item_encoding" {
+  description = "Answer cache item encoding: plain (answer/sources attributes) or compressed (one zlib payload attribute; reads accept both)"
+  type        = string
+  default     = "compressed"
+}
+
+variable "cache_mode" {
+  description = "Answer cache mode: exact (query hash) or semantic (nearest-neighbour match)"
+  type        = string
+  default     = "exact"
+}
+
+variable "orchestration_mode" {
+  description = "RAG workflow orchestration: step_functions (audited state machine) or inline (in-process in api_handler)"
+  type        = string
+  default     = "step_functions"
+}
+
+variable "state_machine_type" {
+  description = "Step Functions workflow type: STANDARD (start + DescribeExecution polling) or EXPRESS (StartSyncExecution, 5 minute limit)"
+  type        = string
+  default     = "STANDARD"
+}
+
+variable "query_mode" {
+  description = "POST /query mode: sync (wait for the answer; async per request with Prefer: respond-async) or async (202 + job ID, result at GET /query/{job_id})"
+  type        = string
+  default     = "sync"
+}
+
+variable "parallel_input_stage" {
+  description = "Run input guardrails and Knowledge Base retrieval concurrently"
+  type        = bool
+  default     = false
+}
+
+variable "output_guardrails_mode" {
+  description = "Output guardrails check mode (full: after generation, incremental: windowed while streaming)"
+  type        = string
+  default     = "full"
+}
+
+variable "lambda_web_adapter_layer_version" {
+  description = "Version of the Lambda Web Adapter layer (LambdaAdapterLayerX86) serving the streaming Function URL"
+  type        = string
+  default     = "24"
+}
+
+variable "batch_max_concurrency" {
+  description = "Concurrent workflow runs per /query/batch request"
+  type        = number
+  default     = 8
+}
+
+variable "single_flight_enabled" {
+  description = "Coalesce identical concurrent cache misses into one workflow run (in-flight lease on the cache item)"
+  type        = bool
+  default     = true
+}
+
+variable "warmup_enabled" {
+  description = "Send scheduled warm-up events ({\"warmup\": true}) to every Lambda function"
+  type        = bool
+  default     = true
+}
+
+variable "warmup_schedule_expression" {
+  description = "EventBridge schedule of the warm-up events"
+  type        = string
+  default     = "rate(5 minutes)"
+}
+
 variable "lambda_timeout" {
   description = "Lambda function timeout in seconds"
   type        = number
@@ -46,8 +124,26 @@ variable "knowledge_base_id" {
   default     = ""
 }
 
+variable "rerank_enabled" {
+  description = "Over-fetch Knowledge Base results and rerank them in-process (BM25 + vector score)"
+  type        = bool
+  default     = false
+}
+
+variable "kb_ingestion_version" {
+  description = "Knowledge Base contents version (e.g. latest ingestion job ID); changing it invalidates cached retrievals"
+  type        = string
+  default     = ""
+}
+
 variable "guardrails_id" {
   description = "Bedrock Guardrails ID (created manually in AWS Console)"
   type        = string
   default     = ""
 }
+
+variable "guardrails_version" {
+  description = "Bedrock Guardrails version (a published version enables the verdict cache; DRAFT is never cached)"
+  type        = string
+  default     = "DRAFT"
+}
@@ -0,0 +1,58 @@
+"""
+Tests for answer generation with incremental output Guardrails
+(src/handlers/bedrock_invoke.py)
+
+AWS is the offline stand-in from benchmarks/aws_stubs.py.
+"""
+
+import pytest
+
+from benchmarks import aws_stubs
+from src.config.settings import settings
+from src.handlers import bedrock_invoke
+from src.services import clients
+
+# Model output paced at 5ms per word, so a blocked window is seen mid-stream
+LATENCIES = {
+    **{name: "0" for name in aws_stubs.DEFAULT_LATENCIES},
+    "invoke_model": "fixed:600",
+}
+
+
+@pytest.fixture
+def bedrock_runtime(monkeypatch):
+    """Fake bedrock-runtime with uncached, windowed output checks"""
+    monkeypatch.setattr(settings, "GUARDRAILS_VERDICT_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "GUARDRAILS_WINDOW_CHARS", 100)
+    monkeypatch.setattr(settings, "GUARDRAILS_OVERLAP_CHARS", 20)
+    fakes = aws_stubs.install(LATENCIES)
+    yield fakes["bedrock-runtime"]
+    clients.reset()
+
+
+def test_completed_stream_reports_model_usage(bedrock_runtime):
+    result, guardrails_result = bedrock_invoke._invoke_with_incremental_guardrails(
+        "prompt", "request"
+    )
+
+    assert guardrails_result["passed"]
+    assert result["stop_reason"] == "end_turn"
+    assert result["output_tokens"] == bedrock_runtime.answer_words
+
+
+def test_aborted_stream_reports_estimated_usage(bedrock_runtime, monkeypatch):
+    monkeypatch.setattr(
+        bedrock_runtime,
+        "apply_guardrail",
+        lambda **kwargs: {"action": "GUARDRAIL_INTERVENED", "assessments": []},
+    )
+
+    result, guardrails_result = bedrock_invoke._invoke_with_incremental_guardrails(
+        "prompt", "request"
+    )
+
+    assert not guardrails_result["passed"]
+    assert result["stop_reason"] == "guardrails_abort"
+    assert result["input_tokens"] > 0
+    assert 0 < result["output_tokens"] < bedrock_runtime.answer_words
+    assert result["tokens_used"] == result["input_tokens"] + result["output_tokens"]
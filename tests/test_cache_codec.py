@@ -0,0 +1,121 @@
+"""
+Tests for the cache item codec (versioned compressed payloads) and for
+reading legacy plain items alongside compressed ones
+
+The cache table is the offline stand-in from benchmarks/aws_stubs.py.
+"""
+
+import zlib
+from decimal import Decimal
+
+import pytest
+
+from benchmarks.aws_stubs import FakeDynamoDBResource, LatencyModel
+from src.config.settings import settings
+from src.services.cache_codec import (
+    CODEC_ZLIB,
+    CODEC_ZSTD,
+    PAYLOAD_ATTRIBUTE,
+    PAYLOAD_FORMAT_VERSION,
+    decode_payload,
+    encode_payload,
+    from_dynamodb,
+    to_dynamodb,
+)
+from src.services.cache_service import CacheService
+from src.utils.error_handler import CacheError
+
+DATA = {
+    "answer": "Amazon Bedrock は生成AIのマネージドサービスです。",
+    "sources": [{"uri": "s3://docs/bedrock.md", "score": 0.87}],
+    "execution_time_ms": 1234,
+}
+
+
+class Binary:
+    """boto3 Binary attribute value (payload bytes under .value)"""
+
+    def __init__(self, value: bytes):
+        self.value = value
+
+
+def test_payload_header_and_round_trip():
+    payload = encode_payload(DATA, CODEC_ZLIB)
+
+    assert payload[0] == PAYLOAD_FORMAT_VERSION
+    assert payload[1] == CODEC_ZLIB
+    assert decode_payload(payload) == DATA
+    assert decode_payload(Binary(payload)) == DATA
+
+
+def test_zstd_round_trip():
+    pytest.importorskip("zstandard")
+    payload = encode_payload(DATA, CODEC_ZSTD)
+    assert payload[1] == CODEC_ZSTD
+    assert decode_payload(payload) == DATA
+
+
+def test_decimals_are_written_as_numbers():
+    payload = encode_payload({"score": Decimal("0.5"), "count": Decimal("3")})
+    assert decode_payload(payload) == {"score": 0.5, "count": 3}
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        b"",
+        bytes((PAYLOAD_FORMAT_VERSION + 1, CODEC_ZLIB)) + zlib.compress(b"{}"),
+        bytes((PAYLOAD_FORMAT_VERSION, 99)) + zlib.compress(b"{}"),
+        bytes((PAYLOAD_FORMAT_VERSION, CODEC_ZLIB)) + b"not zlib",
+    ],
+    ids=["empty", "unknown-version", "unknown-codec", "corrupt"],
+)
+def test_unsupported_payloads_are_rejected(payload):
+    with pytest.raises(CacheError):
+        decode_payload(payload)
+
+
+def test_dynamodb_number_conversion_round_trip():
+    stored = to_dynamodb(DATA)
+    assert stored["sources"][0]["score"] == Decimal("0.87")
+
+    plain = from_dynamodb(stored)
+    assert plain == DATA
+    assert isinstance(plain["execution_time_ms"], int)
+
+
+@pytest.fixture
+def table(monkeypatch):
+    """Shared fake table for services writing plain and compressed items"""
+    monkeypatch.setattr(settings, "L1_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "CACHE_MODE", "exact")
+    return FakeDynamoDBResource(LatencyModel("0"))
+
+
+def _service(dynamodb, item_encoding: str) -> CacheService:
+    return CacheService("cache", dynamodb=dynamodb, item_encoding=item_encoding)
+
+
+def test_legacy_plain_and_compressed_items_read_alike(table):
+    _service(table, "plain").put("legacy query", DATA)
+    _service(table, "compressed").put("new query", DATA)
+
+    items = table.Table("cache").items.values()
+    assert sum(PAYLOAD_ATTRIBUTE in item for item in items) == 1
+
+    reader = _service(table, "compressed")
+    legacy = reader.get("legacy query")
+    new = reader.get("new query")
+    for item in (legacy, new):
+        assert item["answer"] == DATA["answer"]
+        assert item["sources"] == DATA["sources"]
+        assert PAYLOAD_ATTRIBUTE not in item
+
+
+def test_undecodable_payload_is_a_miss(table):
+    writer = _service(table, "compressed")
+    writer.put("query", DATA)
+    for item in table.Table("cache").items.values():
+        item[PAYLOAD_ATTRIBUTE] = b"\xff\x01"
+
+    assert writer.get("query") is None
@@ -0,0 +1,49 @@
+"""
+Tests for document chunking of the local retrieval backend
+"""
+
+import pytest
+
+from src.services.local_retrieval import build_local_index, chunk_text, main
+
+
+def test_short_paragraphs_are_packed_together():
+    text = "First paragraph.\n\nSecond paragraph.\n\n\nThird paragraph."
+    assert chunk_text(text, chunk_chars=40, overlap_chars=5) == [
+        "First paragraph.\n\nSecond paragraph.",
+        "Third paragraph.",
+    ]
+
+
+def test_long_paragraph_is_split_with_overlap():
+    chunks = chunk_text("abcdefghij" * 3, chunk_chars=12, overlap_chars=4)
+
+    assert all(len(chunk) <= 12 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous[-4:] == chunk[:4]
+    assert chunks[-1].endswith("hij")
+
+
+@pytest.mark.parametrize(
+    "chunk_chars, overlap_chars",
+    [(100, 100), (100, 150), (100, -1), (0, 0)],
+)
+def test_invalid_chunk_sizes_are_rejected(chunk_chars, overlap_chars):
+    with pytest.raises(ValueError):
+        chunk_text("x" * 500, chunk_chars=chunk_chars, overlap_chars=overlap_chars)
+
+
+def test_invalid_chunk_sizes_are_rejected_before_indexing(tmp_path):
+    with pytest.raises(ValueError, match="overlap_chars"):
+        build_local_index(
+            str(tmp_path), str(tmp_path / "index"), chunk_chars=100, overlap_chars=100
+        )
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cli_reports_invalid_chunk_sizes(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        main(["build", str(tmp_path), "--chunk-chars", "100", "--overlap-chars", "100"])
+
+    assert exc_info.value.code == 2
+    assert "overlap_chars" in capsys.readouterr().err
@@ -0,0 +1,78 @@
+"""
+Tests for the in-memory LRU cache (eviction order, limits, counters)
+"""
+
+import time
+
+from src.utils.lru_cache import LRUCache, estimate_size
+
+
+def test_evicts_least_recently_used_entry():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_limit_evicts_oldest_entries():
+    cache = LRUCache(max_entries=10, max_bytes=100)
+    cache.put("a", "x", size=40)
+    cache.put("b", "x", size=40)
+
+    cache.put("c", "x", size=40)
+
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 80
+    assert cache.stats()["evictions"] == 1
+
+
+def test_oversized_and_expired_values_are_not_stored():
+    cache = LRUCache(max_bytes=10)
+    assert not cache.put("big", "x", size=11)
+    assert not cache.put("old", "x", expires_at=time.time() - 1)
+    assert len(cache) == 0
+
+
+def test_replacing_a_key_releases_its_bytes():
+    cache = LRUCache()
+    cache.put("a", "x", size=40)
+    cache.put("a", "y", size=10)
+    assert cache.get("a") == "y"
+    assert cache.stats()["bytes"] == 10
+    assert cache.stats()["evictions"] == 0
+
+
+def test_counters():
+    cache = LRUCache()
+    cache.put("a", 1)
+    cache.put("b", 2, expires_at=time.time() + 0.05)
+    cache.get("a")
+    cache.get("missing")
+    time.sleep(0.1)
+    assert cache.get("b") is None
+
+    assert cache.stats() == {
+        "entries": 1,
+        "bytes": estimate_size(1),
+        "hits": 1,
+        "misses": 2,
+        "evictions": 0,
+        "expirations": 1,
+    }
+
+
+def test_clear_keeps_counters():
+    cache = LRUCache()
+    cache.put("a", 1)
+    cache.get("a")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["bytes"] == 0
+    assert cache.stats()["hits"] == 1
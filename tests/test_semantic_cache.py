@@ -0,0 +1,74 @@
+"""
+Tests for the semantic cache (HashingEmbedder matching, index deduplication)
+"""
+
+import pytest
+
+from src.services.semantic_cache import HashingEmbedder, SemanticCache, VectorIndex
+
+THRESHOLD = 0.9
+CACHED_QUERY = "What is Amazon Bedrock?"
+
+
+class CountingEmbedder(HashingEmbedder):
+    """HashingEmbedder counting embed calls (stands in for a paid API)"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def embed(self, text):
+        self.calls += 1
+        return super().embed(text)
+
+
+@pytest.fixture
+def semantic(tmp_path):
+    embedder = CountingEmbedder()
+    index = VectorIndex(str(tmp_path / "index"), embedder.dimension, capacity=4)
+    cache = SemanticCache(embedder, index, threshold=THRESHOLD)
+    cache.add(CACHED_QUERY, "a" * 64)
+    return cache
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "How do I reset my password?",
+        "What is Amazon S3?",
+        "What is the pricing of Amazon Bedrock Knowledge Bases?",
+        "Bedrock",
+    ],
+)
+def test_unrelated_queries_do_not_match(semantic, query):
+    assert semantic.lookup(query) is None
+
+
+@pytest.mark.parametrize(
+    "query", ["what is amazon bedrock", "What is Amazon Bedrock ?"]
+)
+def test_normalized_variants_match(semantic, query):
+    key, similarity = semantic.lookup(query)
+    assert key == "a" * 64
+    assert similarity >= THRESHOLD
+
+
+def test_indexed_query_is_not_embedded_again(semantic):
+    calls = semantic.embedder.calls
+    semantic.add(CACHED_QUERY, "a" * 64)
+    assert semantic.embedder.calls == calls
+    assert semantic.index.count == 1
+
+
+def test_reopened_index_keeps_known_keys(semantic):
+    index = semantic.index
+    index.flush()
+    reopened = VectorIndex(index.path, index.dimension, capacity=4)
+    assert reopened.contains("a" * 64)
+
+
+def test_overwritten_entry_is_forgotten(semantic):
+    for n in range(4):
+        semantic.add(f"query {n}", str(n) * 64)
+    assert not semantic.index.contains("a" * 64)
+    assert semantic.index.count == 4
@@ -0,0 +1,151 @@
+"""
+Tests for single-flight coalescing (CacheService leases, run_workflow_coalesced)
+
+The cache table is the offline stand-in from benchmarks/aws_stubs.py.
+"""
+
+import time
+
+import pytest
+
+from benchmarks.aws_stubs import FakeDynamoDBResource, LatencyModel
+from src.config.settings import settings
+from src.handlers import workflow
+from src.services.cache_service import CacheService
+
+QUERY = "What is Amazon Bedrock?"
+ANSWER = {"answer": "A managed service", "sources": []}
+
+
+@pytest.fixture
+def cache_service(monkeypatch):
+    """CacheService on an empty fake table, used by run_workflow_coalesced"""
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "SINGLE_FLIGHT_ENABLED", True)
+    monkeypatch.setattr(settings, "SINGLE_FLIGHT_POLL_INTERVAL", 0.01)
+    service = CacheService(
+        "cache", dynamodb=FakeDynamoDBResource(LatencyModel("0")), l1=None
+    )
+    monkeypatch.setattr(workflow, "get_cache_service", lambda: service)
+    return service
+
+
+def _execution_input(request_id: str, start_time: float = None) -> dict:
+    return {
+        "query": QUERY,
+        "request_id": request_id,
+        "start_time": time.time() if start_time is None else start_time,
+    }
+
+
+def _succeeded() -> dict:
+    return {"status": "SUCCEEDED", "output": ANSWER, "error": None, "cause": None}
+
+
+def test_acquire_lease_is_exclusive(cache_service):
+    assert cache_service.acquire_lease(QUERY, "owner", 30)
+    assert not cache_service.acquire_lease(QUERY, "other", 30)
+
+
+def test_expired_lease_is_taken_over(cache_service):
+    assert cache_service.acquire_lease(QUERY, "owner", 0)
+    assert cache_service.acquire_lease(QUERY, "other", 30)
+    # The original owner's late release leaves the new lease in place
+    cache_service.release_lease(QUERY, "owner")
+    assert not cache_service.acquire_lease(QUERY, "third", 30)
+
+
+def test_release_lease_frees_the_query(cache_service):
+    assert cache_service.acquire_lease(QUERY, "owner", 30)
+    cache_service.release_lease(QUERY, "owner")
+    assert cache_service.poll_answer(QUERY) == (None, True)
+    assert cache_service.acquire_lease(QUERY, "other", 30)
+
+
+def test_lease_is_acquired_for_answer_in_grace_period(cache_service, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_STALE_GRACE_SECONDS", 300)
+    cache_service.put(QUERY, ANSWER, ttl_seconds=0)
+    # Expired for waiters, although the item stays until its ttl
+    assert cache_service.poll_answer(QUERY) == (None, True)
+    assert cache_service.acquire_lease(QUERY, "owner", 30)
+
+
+def test_release_lease_keeps_the_answer(cache_service):
+    assert cache_service.acquire_lease(QUERY, "owner", 30)
+    cache_service.put(QUERY, ANSWER)
+    cache_service.release_lease(QUERY, "owner")
+    assert cache_service.get(QUERY)["answer"] == ANSWER["answer"]
+
+
+def test_wait_for_answer(cache_service):
+    assert cache_service.acquire_lease(QUERY, "owner", 30)
+    assert cache_service.wait_for_answer(QUERY, 0.05, 0.01) is None
+
+    cache_service.put(QUERY, ANSWER)
+    item = cache_service.wait_for_answer(QUERY, 1, 0.01)
+    assert item["answer"] == ANSWER["answer"]
+
+
+def test_owner_runs_workflow_and_releases_lease(cache_service, monkeypatch):
+    def run_workflow(execution_input):
+        assert cache_service.poll_answer(QUERY) == (None, False)
+        cache_service.put(QUERY, ANSWER)
+        return _succeeded()
+
+    monkeypatch.setattr(workflow, "run_workflow", run_workflow)
+
+    result = workflow.run_workflow_coalesced(_execution_input("owner"))
+
+    assert result["status"] == "SUCCEEDED"
+    assert "coalesced" not in result
+    item, resolved = cache_service.poll_answer(QUERY)
+    assert resolved and item["answer"] == ANSWER["answer"]
+
+
+def test_failed_owner_releases_lease(cache_service, monkeypatch):
+    def run_workflow(execution_input):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(workflow, "run_workflow", run_workflow)
+
+    with pytest.raises(RuntimeError):
+        workflow.run_workflow_coalesced(_execution_input("owner"))
+    assert cache_service.acquire_lease(QUERY, "other", 30)
+
+
+def test_waiter_coalesces_with_owner(cache_service, monkeypatch):
+    monkeypatch.setattr(
+        workflow, "run_workflow", lambda _: pytest.fail("waiter ran the workflow")
+    )
+    assert cache_service.acquire_lease(QUERY, "owner", 30)
+    cache_service.put(QUERY, ANSWER)
+
+    result = workflow.run_workflow_coalesced(_execution_input("waiter"))
+
+    assert result["coalesced"] is True
+    assert result["output"]["answer"] == ANSWER["answer"]
+
+
+def test_waiter_takes_over_released_lease(cache_service, monkeypatch):
+    monkeypatch.setattr(workflow, "run_workflow", lambda _: _succeeded())
+    assert cache_service.acquire_lease(QUERY, "owner", 30)
+    cache_service.release_lease(QUERY, "owner")
+
+    result = workflow.run_workflow_coalesced(_execution_input("waiter"))
+
+    assert result["status"] == "SUCCEEDED"
+    assert "coalesced" not in result
+
+
+def test_wait_is_bounded_by_time_budget(cache_service, monkeypatch):
+    monkeypatch.setattr(settings, "REQUEST_TIME_BUDGET_SECONDS", 0.2)
+    monkeypatch.setattr(
+        workflow, "run_workflow", lambda _: pytest.fail("ran past the budget")
+    )
+    assert cache_service.acquire_lease(QUERY, "owner", 30)
+
+    start = time.time()
+    result = workflow.run_workflow_coalesced(_execution_input("waiter", start))
+
+    assert result["status"] == "TIMEOUT"
+    assert time.time() - start < 1
@@ -0,0 +1,145 @@
+"""
+Tests for the streaming HTTP server (src/handlers/stream_server.py)
+
+AWS is the offline stand-in from benchmarks/aws_stubs.py; the model stream
+is replaced by one that holds the rest of the answer until the test lets it
+continue.
+"""
+
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from benchmarks import aws_stubs
+from src.config.settings import settings
+from src.handlers import stream_server
+from src.services import clients
+
+WORDS_BEFORE_PAUSE = 20
+DELTA_INTERVAL = 0.01  # model pace, lets window checks finish between deltas
+NO_LATENCY = {name: "0" for name in aws_stubs.DEFAULT_LATENCIES}
+
+
+def _chunk(event: dict) -> dict:
+    return {"chunk": {"bytes": json.dumps(event).encode()}}
+
+
+def _delta(text: str) -> dict:
+    return _chunk(
+        {"type": "content_block_delta", "delta": {"type": "text_delta", "text": text}}
+    )
+
+
+class PausedStream:
+    """Model stream that pauses until resume is set"""
+
+    def __init__(self, resume: threading.Event):
+        self.resume = resume
+        self.finished = False
+
+    def __iter__(self):
+        yield _chunk({"type": "message_start", "message": {"usage": {}}})
+        for i in range(WORDS_BEFORE_PAUSE):
+            time.sleep(DELTA_INTERVAL)
+            yield _delta(f"before{i} ")
+        if not self.resume.wait(10):
+            raise RuntimeError("stream was never resumed")
+        for i in range(WORDS_BEFORE_PAUSE):
+            yield _delta(f"after{i} ")
+        self.finished = True
+        yield _chunk(
+            {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn"},
+                "usage": {"output_tokens": 2 * WORDS_BEFORE_PAUSE},
+            }
+        )
+
+    def close(self) -> None:
+        self.resume.set()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Stream server on a free port, with a pausing model stream"""
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "OUTPUT_GUARDRAILS_MODE", "incremental")
+    monkeypatch.setattr(settings, "GUARDRAILS_WINDOW_CHARS", 40)
+    monkeypatch.setattr(settings, "GUARDRAILS_OVERLAP_CHARS", 10)
+    fakes = aws_stubs.install(NO_LATENCY)
+
+    resume = threading.Event()
+    stream = PausedStream(resume)
+    monkeypatch.setattr(
+        fakes["bedrock-runtime"],
+        "invoke_model_with_response_stream",
+        lambda **kwargs: {"body": stream},
+    )
+
+    http_server = stream_server.create_server(port=0)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield http_server, stream
+    resume.set()
+    http_server.shutdown()
+    http_server.server_close()
+    clients.reset()
+
+
+def _post(http_server, path: str, body: dict) -> http.client.HTTPResponse:
+    connection = http.client.HTTPConnection(
+        "127.0.0.1", http_server.server_address[1], timeout=10
+    )
+    connection.request(
+        "POST",
+        path,
+        body=json.dumps(body),
+        headers={"Content-Type": "application/json"},
+    )
+    return connection.getresponse()
+
+
+def _read_frame(response: http.client.HTTPResponse) -> str:
+    lines = []
+    while True:
+        line = response.readline().decode("utf-8")
+        if line in ("\n", ""):
+            return "".join(lines)
+        lines.append(line)
+
+
+def test_first_frame_is_sent_before_generation_finishes(server):
+    http_server, stream = server
+    response = _post(http_server, "/", {"query": "What is Amazon Bedrock?"})
+    assert response.status == 200
+    assert response.getheader("Content-Type") == "text/event-stream"
+
+    first = _read_frame(response)
+    assert first.startswith("event: delta")
+    assert "before0" in first
+    assert not stream.finished  # the model is still holding the rest
+
+    stream.resume.set()
+    frames = [first]
+    while not frames[-1].startswith("event: done"):
+        frames.append(_read_frame(response))
+    done = json.loads(frames[-1].split("data: ", 1)[1])
+    assert "after0" in done["answer"]
+    assert stream.finished
+
+
+def test_invalid_request_gets_error_response(server):
+    http_server, _ = server
+    response = _post(http_server, "/", {"query": ""})
+    assert response.status == 400
+    assert json.loads(response.read())["error"] == "validation_error"
+
+
+def test_warmup_event_is_answered(server):
+    http_server, _ = server
+    response = _post(http_server, stream_server.PASS_THROUGH_PATH, {"warmup": True})
+    assert response.status == 200
+    assert json.loads(response.read())["warmup"] is True